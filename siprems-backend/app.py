@@ -11,9 +11,10 @@ from flask_compress import Compress
 from sqlalchemy import text
 
 from utils.config import get_config
+from utils.json_provider import ORJSONProvider
 from utils.cache_service import init_cache
 from utils.metrics_service import init_metrics, get_metrics_service
-from utils.db_session import init_db_session, get_db_session, get_db_engine
+from utils.db_session import init_db_session, get_db_session, get_db_engine, close_request_session
 from ml_engine import MLEngine
 from services.prediction_service import PredictionService
 from services.chat_service import ChatService
@@ -46,6 +47,7 @@ def create_app(config: Optional[object] = None) -> Flask:
         Exception: If database connection or service initialization fails.
     """
     app = Flask(__name__)
+    app.json = ORJSONProvider(app)
 
     # Load configuration
     if config is None:
@@ -57,6 +59,8 @@ def create_app(config: Optional[object] = None) -> Flask:
     app.db_session_factory = session_factory
     app.get_db_session = get_db_session
     app.get_db_engine = get_db_engine
+    # ORM calls within a request share one session and pooled connection
+    app.teardown_request(close_request_session)
 
     # Initialize response compression
     Compress(app)
@@ -227,4 +231,5 @@ prediction_service: PredictionService = app.prediction_service
 chat_service: ChatService = app.chat_service
 
 if __name__ == "__main__":
-    app.run(host='0.0.0.0', debug=True, port=5000)
+    # Local development only; production is served by gunicorn (see wsgi.py)
+    app.run(host='0.0.0.0', debug=app.config.get('DEBUG', False), port=5000)
@@ -1,5 +1,5 @@
 from celery import Celery
-from celery.signals import task_prerun, task_postrun, task_failure
+from celery.signals import task_prerun, task_postrun, task_failure, worker_process_init
 from utils.config import get_config
 import logging
 
@@ -18,25 +18,43 @@ celery_app.config_from_object(config)
 celery_app.autodiscover_tasks(['tasks'])
 
 
+@worker_process_init.connect
+def init_worker_db(**kw):
+    """
+    Give each worker process one pooled SQLAlchemy engine.
+
+    Tasks reuse its QueuePool connections instead of connecting per call,
+    and the psycopg2 pool inherited from the parent is discarded.
+    """
+    from utils.db import reset_db_pool
+    from utils.db_session import init_db_session
+
+    init_db_session(config)
+    reset_db_pool()
+
+
 # Signal handlers for task lifecycle events
 @task_prerun.connect
 def task_prerun_handler(sender=None, task_id=None, task=None, args=None, kwargs=None, **kw):
     """Handle pre-run task events"""
-    logger.info(f"Task {task.name} [{task_id}] starting")
+    logger.info("Task %s [%s] starting", task.name, task_id)
 
 
 @task_postrun.connect
 def task_postrun_handler(sender=None, task_id=None, task=None, args=None, kwargs=None, retval=None, state=None, **kw):
     """Handle post-run task events"""
-    logger.info(f"Task {task.name} [{task_id}] completed with result: {retval}")
+    # Lazy %-formatting and no retval: forecast results can be large dicts
+    logger.info("Task %s [%s] completed with state %s", task.name, task_id, state)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Task %s [%s] result: %.200r", task.name, task_id, retval)
 
 
 @task_failure.connect
 def task_failure_handler(sender=None, task_id=None, exception=None, args=None, kwargs=None, traceback=None, einfo=None, **kw):
     """Handle task failure events"""
-    logger.error(f"Task {sender.name} [{task_id}] failed with exception: {exception}")
+    logger.error("Task %s [%s] failed with exception: %s", sender.name, task_id, exception)
     if einfo:
-        logger.error(f"Traceback: {einfo}")
+        logger.error("Traceback: %s", einfo)
 
 
 if __name__ == '__main__':
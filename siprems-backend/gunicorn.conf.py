@@ -0,0 +1,36 @@
+"""Gunicorn configuration for the SIPREMS API.
+
+Usage:
+    gunicorn -c gunicorn.conf.py wsgi:application
+"""
+
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+
+# gthread workers let slow requests (Prophet fits, Gemini calls) block a
+# thread instead of the whole worker process.
+worker_class = "gthread"
+workers = int(os.getenv("WORKERS", "4"))
+threads = int(os.getenv("THREADS", "8"))
+
+# Import the app (pandas, Prophet, Stan backend) once in the master so
+# workers share it copy-on-write instead of each re-importing it.
+preload_app = True
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
+
+
+def post_fork(server, worker):
+    """Give each worker its own DB connections instead of the master's."""
+    from utils.db import reset_db_pool
+    from utils.db_session import dispose_engine_after_fork
+
+    dispose_engine_after_fork()
+    reset_db_pool()
@@ -3,6 +3,7 @@ import os
 from app import create_app
 from utils.db_session import get_db_engine
 from models.orm.base import Base
+from utils.partitions import ensure_transaction_partitions
 # Import semua model agar terdeteksi oleh SQLAlchemy
 from models.orm import user, product, transaction, event
 
@@ -20,6 +21,16 @@ def init_database():
             print("Creating tables...")
             Base.metadata.create_all(bind=engine)
             print("✅ Tables created successfully!")
+
+            # Monthly transactions partitions (DEFAULT and the daily_sales_by_product
+            # view come with the table)
+            raw = engine.raw_connection()
+            try:
+                created = ensure_transaction_partitions(raw)
+                raw.commit()
+            finally:
+                raw.close()
+            print(f"✅ Created {len(created)} transactions partition(s)")
             
         except Exception as e:
             print(f"❌ Error creating tables: {e}")
@@ -1,13 +1,29 @@
 import pandas as pd
 import numpy as np
 from prophet import Prophet
-from prophet.serialize import model_to_json, model_from_json
+from prophet.serialize import model_from_json
 import os
 import json
+import glob
+import gzip
+import pickle
+import time
+import hashlib
 import logging
+import multiprocessing
+import threading
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+from cachetools import TTLCache
 from sqlalchemy import text
-from sklearn.metrics import mean_absolute_error, mean_absolute_percentage_error
+from sklearn.metrics import mean_absolute_percentage_error
 from utils.config import get_config
+from utils.cache_service import (
+    HOLIDAYS_CACHE_TTL, HOLIDAYS_MAX_AGE, HOLIDAYS_VERSION_NAME, PRODUCTS_VERSION_NAME,
+    get_cache_service
+)
+from ml_kernels import correction_metrics, holt_winters_fit, log_sigma_filter
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
 
@@ -15,9 +31,396 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
 config = get_config()
 MODELS_DIR = config.MODELS_DIR
 META_DIR = config.MODELS_META_DIR
+FORECAST_CACHE_DIR = config.FORECAST_CACHE_DIR
 
 os.makedirs(MODELS_DIR, exist_ok=True)
 os.makedirs(META_DIR, exist_ok=True)
+os.makedirs(FORECAST_CACHE_DIR, exist_ok=True)
+
+# (version, loaded_at, df) snapshot shared by the API and Celery tasks.
+# Holidays change only when events are created/deleted, which bumps the
+# shared version counter; freshness bounds live in utils.cache_service
+_holidays_cache = (None, 0.0, None)
+_holidays_lock = threading.RLock()
+
+# Deserialized Prophet models keyed by (path, mtime), and finished forecasts
+# keyed by (sku, days, model mtime, history fingerprint). Retraining changes
+# the mtime and new sales change the fingerprint, so stale entries never hit.
+_model_cache = TTLCache(maxsize=64, ttl=3600)
+_meta_cache = TTLCache(maxsize=512, ttl=3600)
+_forecast_cache = TTLCache(maxsize=256, ttl=900)
+_cache_lock = threading.Lock()
+
+# (products version, SKU) -> product_id, so sales queries filter on the
+# indexed product_id directly instead of joining products on every call
+_product_id_cache = TTLCache(maxsize=4096, ttl=3600)
+
+# Parsed daily sales per SKU. Later fetches only pull days on or after the
+# last cached day and splice them in, so history is parsed once.
+_sales_cache = TTLCache(maxsize=512, ttl=1800)
+_SALES_EPOCH = date(1970, 1, 1)
+
+# Daily quantities fit comfortably in int32 and promo is a 0/1 flag; the
+# narrow dtypes halve (or better) the bytes cached and scanned per SKU
+SALES_DTYPES = {'y': np.int32, 'promo': np.int8}
+
+# SKUs without a saved model whose sales span fewer days than this skip
+# Prophet: Holt-Winters when there are at least two weekly seasons of data,
+# otherwise the moving-average forecast
+FAST_PATH_MAX_SPAN_DAYS = 180
+HW_SEASON = 7
+HW_ALPHAS = np.array([0.1, 0.3, 0.5])
+HW_BETAS = np.array([0.01, 0.1])
+HW_GAMMAS = np.array([0.1, 0.3])
+HW_PHI = 0.9
+
+
+def fast_forecast(sales_df, days):
+    """
+    Lightweight forecast: trailing 7-day mean scaled by a weekday factor.
+
+    Returns a DataFrame shaped like MLEngine.predict output (history rows
+    followed by `days` future rows) so callers can use either path.
+    """
+    history = sales_df[['ds', 'y']].copy()
+    history['ds'] = pd.to_datetime(history['ds'])
+    y = history['y'].astype(float)
+
+    overall_mean = y.mean()
+    if overall_mean > 0:
+        weekday_factor = y.groupby(history['ds'].dt.dayofweek).mean() / overall_mean
+    else:
+        weekday_factor = pd.Series(dtype=float)
+    weekday_factor = weekday_factor.reindex(range(7), fill_value=1.0)
+
+    daily_mean = y.tail(7).mean()
+
+    # In-sample fit: mean of the previous 7 days, scaled by weekday
+    trailing = y.shift(1).rolling(7, min_periods=1).mean().fillna(daily_mean)
+    fitted = trailing.values * weekday_factor.values[history['ds'].dt.dayofweek.values]
+
+    future_ds = pd.date_range(history['ds'].iloc[-1] + pd.Timedelta(days=1), periods=days, freq='D')
+    projected = daily_mean * weekday_factor.values[future_ds.dayofweek.values]
+
+    yhat = np.concatenate([fitted, projected])
+    band = 1.96 * float(np.std(y.values - fitted))
+
+    mape = mean_absolute_percentage_error(y.values, fitted)
+    accuracy_score = max(0, 100 * (1 - min(mape, 1.0)))
+
+    forecast = pd.DataFrame({'ds': history['ds'].tolist() + list(future_ds)})
+    forecast['yhat_corrected'] = np.clip(yhat, 0, None)
+    forecast['yhat_lower_corrected'] = np.clip(yhat - band, 0, None)
+    forecast['yhat_upper_corrected'] = np.clip(yhat + band, 0, None)
+    forecast['accuracy_score'] = accuracy_score
+
+    return forecast
+
+
+def holt_winters_forecast(sales_df, days):
+    """
+    Weekly-seasonal Holt-Winters forecast for short histories.
+
+    Days without sales are filled with zero so the series is contiguous.
+    Returns a DataFrame shaped like MLEngine.predict output.
+    """
+    daily = sales_df.set_index(pd.to_datetime(sales_df['ds']))['y'].astype(float)
+    daily = daily.asfreq('D', fill_value=0.0)
+    y = daily.to_numpy(dtype=np.float64)
+
+    fitted, projected, alpha = holt_winters_fit(
+        y, days, HW_SEASON, HW_ALPHAS, HW_BETAS, HW_GAMMAS, HW_PHI
+    )
+
+    resid_std = float(np.std(y[HW_SEASON:] - fitted[HW_SEASON:]))
+    in_sample_band = np.full(len(y), 1.96 * resid_std)
+    # Forecast error grows with the horizon
+    horizon_band = 1.96 * resid_std * np.sqrt(1 + np.arange(days) * alpha ** 2)
+
+    mape = mean_absolute_percentage_error(y[HW_SEASON:], fitted[HW_SEASON:])
+    accuracy_score = max(0, 100 * (1 - min(mape, 1.0)))
+
+    future_ds = pd.date_range(daily.index[-1] + pd.Timedelta(days=1), periods=days, freq='D')
+    yhat = np.concatenate([fitted, projected])
+    band = np.concatenate([in_sample_band, horizon_band])
+
+    forecast = pd.DataFrame({'ds': daily.index.append(future_ds)})
+    forecast['yhat_corrected'] = np.clip(yhat, 0, None)
+    forecast['yhat_lower_corrected'] = np.clip(yhat - band, 0, None)
+    forecast['yhat_upper_corrected'] = np.clip(yhat + band, 0, None)
+    forecast['accuracy_score'] = accuracy_score
+
+    return forecast
+
+
+FORECAST_COLUMNS = ['yhat', 'yhat_lower', 'yhat_upper']
+CORRECTED_COLUMNS = ['yhat_corrected', 'yhat_lower_corrected', 'yhat_upper_corrected']
+
+
+def apply_correction(forecast, correction_factor):
+    """
+    Add the corrected, non-negative forecast columns to a Prophet forecast.
+
+    The three log-scale columns are stacked into one (n, 3) array so the
+    inverse transform, scaling and clamp each run once, in place.
+    """
+    arr = np.expm1(forecast[FORECAST_COLUMNS].to_numpy(dtype=np.float64))
+    arr *= correction_factor
+    np.maximum(arr, 0, out=arr)
+    forecast[CORRECTED_COLUMNS] = arr
+    return forecast
+
+
+def promo_flags(dates, promo_days):
+    """
+    Promo regressor column for `dates` from a sorted array of promo days.
+
+    Both sides are int64 days since epoch, so the join is one vectorized
+    searchsorted instead of a per-row dict lookup.
+
+    Args:
+        dates: datetime-like array or Series (e.g. future['ds'])
+        promo_days: Sorted int64 array of days that had a promotion
+
+    Returns:
+        int8 numpy array, 1 where the date is a promo day
+    """
+    days = np.asarray(dates, dtype='datetime64[D]').view('i8')
+    if len(promo_days) == 0:
+        return np.zeros(len(days), dtype=np.int8)
+    idx = np.searchsorted(promo_days, days)
+    hit = idx < len(promo_days)
+    hit[hit] = promo_days[idx[hit]] == days[hit]
+    return hit.astype(np.int8)
+
+
+def history_promo_days(df_history):
+    """Sorted unique int64 days on which a sales history had a promotion."""
+    promo = df_history['promo'].to_numpy() > 0
+    days = df_history['ds'].to_numpy().astype('datetime64[D]').view('i8')
+    return np.unique(days[promo])
+
+
+def resolve_product_id(product_sku, fetch_id):
+    """
+    Map a SKU to its product_id through a process-wide cache.
+
+    Entries are keyed by the shared products version, which product deletes
+    and SKU renames bump. Without Redis there is no version to follow, so
+    the lookup is not cached.
+
+    Args:
+        product_sku: Product SKU
+        fetch_id: Callable returning the product_id for the SKU, or None
+
+    Returns:
+        product_id, or None if no product has this SKU
+    """
+    version = get_cache_service().get_version(PRODUCTS_VERSION_NAME)
+    if version is None:
+        return fetch_id()
+
+    key = (version, product_sku)
+    with _cache_lock:
+        product_id = _product_id_cache.get(key)
+    if product_id is None:
+        product_id = fetch_id()
+        if product_id is not None:
+            with _cache_lock:
+                _product_id_cache[key] = product_id
+    return product_id
+
+
+def get_shared_holidays(fetch_rows):
+    """
+    Return a copy of the process-wide holidays DataFrame, reloading it when stale.
+
+    The frame is reused until the shared holidays version changes or it
+    is HOLIDAYS_MAX_AGE old (HOLIDAYS_CACHE_TTL without Redis). Only one
+    thread reloads at a time; the others wait and then reuse its result.
+    Callers get their own copy so they can add columns freely.
+
+    Args:
+        fetch_rows: Callable returning (holiday, ds) rows for events
+            included in prediction
+
+    Returns:
+        Holidays DataFrame for Prophet, or None if there are none
+    """
+    global _holidays_cache
+    version = get_cache_service().get_version(HOLIDAYS_VERSION_NAME)
+
+    def is_fresh(snapshot):
+        cached_version, loaded_at, _ = snapshot
+        if not loaded_at:
+            return False
+        age = time.monotonic() - loaded_at
+        if version is not None:
+            return version == cached_version and age < HOLIDAYS_MAX_AGE
+        return age < HOLIDAYS_CACHE_TTL
+
+    def copy_of(df):
+        return None if df is None else df.copy()
+
+    snapshot = _holidays_cache
+    if is_fresh(snapshot):
+        return copy_of(snapshot[2])
+
+    with _holidays_lock:
+        # Another thread may have reloaded while we waited
+        snapshot = _holidays_cache
+        if is_fresh(snapshot):
+            return copy_of(snapshot[2])
+
+        try:
+            rows = fetch_rows()
+        except Exception as e:
+            logging.error(f"Error fetching holidays: {e}")
+            return None
+
+        df = None
+        if rows:
+            holiday, ds = zip(*rows)
+            df = pd.DataFrame({
+                'holiday': list(holiday),
+                'ds': np.array(ds, dtype='datetime64[D]').astype('datetime64[ns]'),
+                'lower_window': -2,
+                'upper_window': 1,
+            })
+
+        _holidays_cache = (version, time.monotonic(), df)
+        return copy_of(df)
+
+
+def in_sample_forecast(model, df_fit):
+    """
+    Point forecast over the training frame, without uncertainty intervals.
+
+    Training only needs yhat, so the 1000-trajectory uncertainty sampling
+    is switched off for this call and restored afterwards; the saved model
+    still produces yhat_lower/yhat_upper at prediction time.
+    """
+    samples = model.uncertainty_samples
+    model.uncertainty_samples = 0
+    try:
+        return model.predict(df_fit[['ds', 'promo']])
+    finally:
+        model.uncertainty_samples = samples
+
+
+def atomic_write(path, write, mode="w"):
+    """
+    Write a file through a temp file in the same directory, then os.replace it.
+
+    Readers and concurrent trainers only ever see a complete file, never a
+    truncated one.
+
+    Args:
+        path: Final file path
+        write: Callable taking the open temp file
+        mode: File mode for the temp file ('w' or 'wb')
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, mode) as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+def model_path_for(product_sku):
+    """
+    Path of the saved model for a SKU.
+
+    Models are gzip-compressed pickles; a legacy Prophet JSON file is
+    used until the SKU is retrained.
+    """
+    path = os.path.join(MODELS_DIR, f"model_{product_sku}.pkl.gz")
+    if not os.path.exists(path):
+        legacy_path = os.path.join(MODELS_DIR, f"model_{product_sku}.json")
+        if os.path.exists(legacy_path):
+            return legacy_path
+    return path
+
+
+def save_model(model, product_sku):
+    """
+    Persist a fitted Prophet model as a gzip-compressed pickle.
+
+    Pickle skips the float-by-float JSON round trip, so loading is much
+    cheaper; level 1 compression keeps writes fast. Only models written by
+    the trainers are ever unpickled.
+
+    Returns:
+        str: Path the model was written to
+    """
+    path = os.path.join(MODELS_DIR, f"model_{product_sku}.pkl.gz")
+
+    def write(f):
+        with gzip.GzipFile(fileobj=f, mode='wb', compresslevel=1) as gz:
+            pickle.dump(model, gz, protocol=5)
+
+    atomic_write(path, write, mode="wb")
+    return path
+
+
+def _forecast_file(product_sku, days, model_path, meta_path):
+    """Disk cache path for a forecast; changes whenever the model or its metadata does."""
+    stamp = f"{os.stat(model_path).st_mtime_ns}_{os.stat(meta_path).st_mtime_ns}"
+    return os.path.join(FORECAST_CACHE_DIR, f"forecast_{product_sku}_{days}_{stamp}.pkl")
+
+
+def read_cached_forecast(path):
+    """Load a forecast written by write_cached_forecast, or None if absent/unreadable."""
+    try:
+        return pd.read_pickle(path)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.warning(f"Ignoring unreadable forecast cache {path}: {e}")
+        return None
+
+
+def write_cached_forecast(path, forecast, product_sku, days):
+    """Persist a forecast and drop older entries for the same SKU and horizon."""
+    try:
+        atomic_write(path, lambda f: forecast.to_pickle(f), mode="wb")
+    except Exception as e:
+        logging.warning(f"Could not cache forecast for {product_sku}: {e}")
+        return
+    pattern = os.path.join(FORECAST_CACHE_DIR, f"forecast_{glob.escape(product_sku)}_{days}_*.pkl")
+    for stale in glob.glob(pattern):
+        if stale != path:
+            with contextlib.suppress(OSError):
+                os.remove(stale)
+
+
+# Per-process state for train_all's worker pool, set by _init_training_worker
+_worker_engine = None
+_worker_holidays = None
+
+
+def _init_training_worker(db_engine_func, holidays):
+    """Process pool initializer: receive the holidays once, drop inherited DB sockets."""
+    global _worker_engine, _worker_holidays
+    try:
+        # Pooled connections came over with the fork; let the worker open its own
+        db_engine_func().dispose(close=False)
+    except Exception:
+        pass
+    _worker_engine = MLEngine(db_engine_func)
+    _worker_holidays = holidays
+
+
+def _train_in_worker(product_sku, sales_df):
+    """Train one SKU inside a pool worker."""
+    return _worker_engine.train_product_model(
+        product_sku, sales_df=sales_df, holidays=_worker_holidays
+    )
+
 
 class MLEngine:
     def __init__(self, db_engine_func):
@@ -28,74 +431,218 @@ class MLEngine:
         Fetch sales data with promo status, aggregated by day.
         Returns DataFrame with ds (date), y (quantity), and promo (status) columns.
         """
+        # Served by the covering (product_id, transaction_date) INCLUDE
+        # (quantity_sold, is_promo) index as an index-only range scan
         query = text("""
             SELECT
+                transaction_date::date as ds,
+                SUM(quantity_sold) as y,
+                MAX(CASE WHEN is_promo THEN 1 ELSE 0 END) as promo
+            FROM transactions
+            WHERE product_id = :product_id
+              AND transaction_date >= :since
+            GROUP BY 1
+            ORDER BY 1
+        """)
+        id_query = text("SELECT product_id FROM products WHERE sku = :sku")
+        try:
+            cached, since = self._cached_sales(product_sku)
+            engine = self.get_db_engine()
+            with engine.connect() as conn:
+                product_id = resolve_product_id(
+                    product_sku,
+                    lambda: conn.execute(id_query, {"sku": product_sku}).scalar()
+                )
+                if product_id is None:
+                    return pd.DataFrame()
+                result = conn.execute(query, {"product_id": product_id, "since": since}).fetchall()
+                return self._merge_sales(product_sku, cached, since, self._sales_frame(result))
+        except Exception as e:
+            logging.error(f"Error fetching sales data for {product_sku}: {e}")
+            return pd.DataFrame()
+
+    def get_sales_data_bulk(self, skus):
+        """
+        Fetch daily sales for many products in a single query.
+
+        Args:
+            skus: Iterable of product SKUs
+
+        Returns:
+            dict: SKU -> DataFrame like get_sales_data (empty for SKUs without sales)
+        """
+        skus = list(dict.fromkeys(skus))
+        if not skus:
+            return {}
+
+        query = text("""
+            SELECT
+                p.sku,
                 DATE(t.transaction_date) as ds,
                 SUM(t.quantity_sold) as y,
                 MAX(CASE WHEN t.is_promo THEN 1 ELSE 0 END) as promo
             FROM transactions t
             JOIN products p ON t.product_id = p.product_id
-            WHERE p.sku = :sku
-            GROUP BY DATE(t.transaction_date)
-            ORDER BY ds ASC
+            WHERE p.sku = ANY(:skus)
+            GROUP BY p.sku, DATE(t.transaction_date)
+            ORDER BY p.sku, ds
         """)
-        try:
-            engine = self.get_db_engine()
-            with engine.connect() as conn:
-                result = conn.execute(query, {"sku": product_sku}).fetchall()
-                df = pd.DataFrame(result) if result else pd.DataFrame()
-
-                if not df.empty:
-                    df['ds'] = pd.to_datetime(df['ds'])
-                    df['y'] = pd.to_numeric(df['y'], errors='coerce').fillna(0).astype(int)
-                    df['promo'] = pd.to_numeric(df['promo'], errors='coerce').fillna(0).astype(int)
+        engine = self.get_db_engine()
+        with engine.connect() as conn:
+            # Typed straight from the cursor columns; y and promo are never NULL
+            chunks = list(pd.read_sql_query(
+                query, conn, params={"skus": skus}, parse_dates=['ds'],
+                dtype=SALES_DTYPES, chunksize=50000
+            ))
+        df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+        sales = {sku: pd.DataFrame() for sku in skus}
+        if df.empty:
+            return sales
+
+        for sku, group in df.groupby('sku', sort=False):
+            frame = group[['ds', 'y', 'promo']].reset_index(drop=True)
+            # Full histories, so they seed the per-SKU cache for predict()
+            sales[sku] = self._merge_sales(sku, None, _SALES_EPOCH, frame)
+        return sales
+
+    def get_prediction_inputs(self, product_sku):
+        """
+        Fetch the product row and its daily sales in a single round trip.
 
-                return df
-        except Exception as e:
-            logging.error(f"Error fetching sales data for {product_sku}: {e}")
+        Returns:
+            tuple: (product dict or None, sales DataFrame like get_sales_data)
+        """
+        query = text("""
+            WITH prod AS (
+                SELECT product_id, name, sku, stock
+                FROM products
+                WHERE sku = :sku
+            ),
+            sales AS (
+                SELECT
+                    DATE(t.transaction_date) as ds,
+                    SUM(t.quantity_sold) as y,
+                    MAX(CASE WHEN t.is_promo THEN 1 ELSE 0 END) as promo
+                FROM transactions t
+                JOIN prod p ON t.product_id = p.product_id
+                WHERE t.transaction_date >= :since
+                GROUP BY DATE(t.transaction_date)
+            )
+            SELECT
+                (SELECT row_to_json(prod) FROM prod) AS product,
+                (SELECT json_agg(sales ORDER BY ds) FROM sales) AS sales
+        """)
+        cached, since = self._cached_sales(product_sku)
+        engine = self.get_db_engine()
+        with engine.connect() as conn:
+            row = conn.execute(query, {"sku": product_sku, "since": since}).one()
+
+        if not row.product:
+            return None, pd.DataFrame()
+
+        delta = self._sales_frame(row.sales or [])
+        return row.product, self._merge_sales(product_sku, cached, since, delta)
+
+    @staticmethod
+    def _cached_sales(product_sku):
+        """Return (cached sales DataFrame or None, first day to re-fetch)."""
+        with _cache_lock:
+            cached = _sales_cache.get(product_sku)
+        if cached is None or cached.empty:
+            return None, _SALES_EPOCH
+        # The last cached day may still be accumulating sales, so re-fetch it
+        return cached, cached['ds'].iloc[-1].date()
+
+    @staticmethod
+    def _merge_sales(product_sku, cached, since, delta):
+        """Splice freshly fetched days onto the cached history and store it."""
+        if cached is None:
+            df = delta
+        else:
+            parts = [cached[cached['ds'] < pd.Timestamp(since)]]
+            if not delta.empty:
+                parts.append(delta)
+            df = pd.concat(parts, ignore_index=True)
+
+        with _cache_lock:
+            _sales_cache[product_sku] = df
+        # Callers add columns and filter rows, so never hand out the cached frame
+        return df.copy()
+
+    @staticmethod
+    def _sales_frame(records):
+        """Build the ds/y/promo sales DataFrame from rows or JSON records."""
+        if not records:
             return pd.DataFrame()
 
+        if isinstance(records[0], dict):
+            records = [(r['ds'], r['y'], r['promo']) for r in records]
+
+        # Build typed columns directly instead of letting pandas infer
+        # object columns row by row; dates and 'YYYY-MM-DD' strings both
+        # parse straight to datetime64[D]
+        n = len(records)
+        ds, y, promo = zip(*records)
+        return pd.DataFrame({
+            'ds': np.array(ds, dtype='datetime64[D]').astype('datetime64[ns]'),
+            'y': np.fromiter((v or 0 for v in y), dtype=SALES_DTYPES['y'], count=n),
+            'promo': np.fromiter((v or 0 for v in promo), dtype=SALES_DTYPES['promo'], count=n),
+        })
+
     def get_holidays(self):
-        """Fetch holiday data from events table."""
+        """Fetch holiday data from events table (cached per process)."""
+        return get_shared_holidays(self._fetch_holiday_rows)
+
+    def _fetch_holiday_rows(self):
+        """Query (holiday, ds) rows for events included in prediction."""
+        # Served by the partial idx_events_predict index; ds is cast to DATE
+        # so the typed datetime64[D] construction never sees timestamps
         query = text("""
-            SELECT event_name as holiday, event_date as ds
+            SELECT event_name as holiday, event_date::date as ds
             FROM events
-            WHERE include_in_prediction = TRUE
+            WHERE include_in_prediction
+            ORDER BY event_date
         """)
-        try:
-            engine = self.get_db_engine()
-            with engine.connect() as conn:
-                result = conn.execute(query).fetchall()
-                df = pd.DataFrame(result) if result else pd.DataFrame()
-                if not df.empty:
-                    df['ds'] = pd.to_datetime(df['ds'])
-                    df['lower_window'] = -2
-                    df['upper_window'] = 1
-                return df if not df.empty else None
-        except Exception as e:
-            logging.error(f"Error fetching holidays: {e}")
-            return None
+        engine = self.get_db_engine()
+        with engine.connect() as conn:
+            return [tuple(row) for row in conn.execute(query).fetchall()]
 
-    def train_product_model(self, product_sku):
+    def train_product_model(self, product_sku, sales_df=None, holidays=None):
         """
         Train model with promo regressor and accuracy metrics.
         Includes log transformation, outlier removal, and correction factor calculation.
+
+        Args:
+            product_sku: SKU of the product to train
+            sales_df: Optional pre-fetched daily sales (e.g. from get_sales_data_bulk)
+            holidays: Optional pre-fetched holidays frame (fetched when None)
         """
-        df = self.get_sales_data(product_sku)
-        holidays = self.get_holidays()
+        df = sales_df if sales_df is not None else self.get_sales_data(product_sku)
+        if holidays is None:
+            holidays = self.get_holidays()
 
         if df.empty or len(df) < 5:
             return {"status": "skipped", "reason": "Not enough data"}
 
-        try:
-            # 1. Log Transform (to stabilize variance)
-            df['y_log'] = np.log1p(df['y'])
+        # Skip the Stan fit entirely when the inputs match the saved model
+        data_hash = self._training_data_hash(df, holidays)
+        unchanged = self._load_unchanged_meta(product_sku, data_hash)
+        if unchanged is not None:
+            logging.info(f"Training data unchanged for {product_sku}, reusing saved model")
+            return {
+                "status": "success",
+                "factor": float(unchanged.get('correction_factor', 1.0)),
+                "accuracy": float(unchanged.get('accuracy_score', 0.0)),
+                "refit": False
+            }
 
-            # 2. Outlier Removal (3.5 sigma)
-            mu = df['y_log'].mean()
-            std = df['y_log'].std()
-            if std > 0:
-                df = df[np.abs(df['y_log'] - mu) <= (3.5 * std)].copy()
+        try:
+            # 1-2. Log transform + 3.5 sigma outlier removal in one kernel
+            y_log, keep = log_sigma_filter(df['y'].to_numpy(dtype=np.float64), 3.5)
+            df['y_log'] = y_log
+            if not keep.all():
+                df = df[keep].copy()
 
             # Ensure we still have minimum data
             if len(df) < 5:
@@ -126,25 +673,23 @@ class MLEngine:
                 model.fit(df_fit)
 
             # 5. Evaluate and calculate correction factor
-            forecast = model.predict(df_fit)
-            y_pred = np.expm1(forecast['yhat'].values)
-            y_true = np.expm1(df_fit['y'].values)
-
-            # Calculate correction factor (median ratio)
-            ratios = y_true / (y_pred + 1e-6)
-            correction_factor = float(np.median(ratios))
-            correction_factor = max(0.85, min(1.15, correction_factor))  # Clamp between 0.85 and 1.15
-
-            # 6. Calculate accuracy metrics
-            mae = mean_absolute_error(y_true, y_pred)
-            mape = mean_absolute_percentage_error(y_true, y_pred)
+            forecast = in_sample_forecast(model, df_fit)
+
+            # 6. Correction factor (median ratio, clamped between 0.85 and 1.15)
+            # and accuracy metrics in one pass
+            correction_factor, mae, mape = correction_metrics(
+                df_fit['y'].to_numpy(dtype=np.float64),
+                forecast['yhat'].to_numpy(dtype=np.float64),
+                0.85, 1.15
+            )
+            correction_factor = float(correction_factor)
+            mae = float(mae)
+            mape = float(mape)
             accuracy_score = max(0, 100 * (1 - min(mape, 1.0)))  # Cap MAPE at 100%
 
             # 7. Save model
             try:
-                model_file = os.path.join(MODELS_DIR, f"model_{product_sku}.json")
-                with open(model_file, "w") as f:
-                    f.write(model_to_json(model))
+                save_model(model, product_sku)
             except Exception as e:
                 logging.error(f"Error saving model for {product_sku}: {e}")
                 raise
@@ -152,13 +697,19 @@ class MLEngine:
             # 8. Save metadata
             try:
                 meta_file = os.path.join(META_DIR, f"meta_{product_sku}.json")
-                with open(meta_file, "w") as f:
-                    json.dump({
-                        "correction_factor": correction_factor,
-                        "mae": float(mae),
-                        "mape_percent": float(mape * 100),
-                        "accuracy_score": float(accuracy_score)
-                    }, f, indent=2)
+                meta = {
+                    "correction_factor": correction_factor,
+                    "mae": float(mae),
+                    "mape_percent": float(mape * 100),
+                    "accuracy_score": float(accuracy_score),
+                    "data_hash": data_hash,
+                    # Days the model saw a promo, so predict() can build
+                    # the future promo column without re-querying sales
+                    "promo_days": (
+                        df.loc[df['promo'] > 0, 'ds'].dt.strftime('%Y-%m-%d').tolist()
+                    )
+                }
+                atomic_write(meta_file, lambda f: json.dump(meta, f, indent=2))
             except Exception as e:
                 logging.error(f"Error saving metadata for {product_sku}: {e}")
                 raise
@@ -175,13 +726,93 @@ class MLEngine:
             logging.error(f"Error training model for {product_sku}: {e}")
             return {"status": "error", "reason": str(e)}
 
-    def predict(self, product_sku, days=7):
+    def train_all(self, skus, workers=None):
+        """
+        Train models for many products off a single bulk sales query.
+
+        Each Stan fit is single-threaded, so SKUs are fanned out over a
+        process pool. Holidays are fetched once here and handed to every
+        worker through the pool initializer. Inside a daemonic process (a
+        Celery prefork worker) no pool can be started, so SKUs are trained
+        one after another there.
+
+        Args:
+            skus: Iterable of product SKUs
+            workers: Worker processes (defaults to os.cpu_count())
+
+        Returns:
+            dict: SKU -> train_product_model result
+        """
+        sales = self.get_sales_data_bulk(skus)
+        holidays = self.get_holidays()
+        workers = min(workers or os.cpu_count() or 1, len(sales))
+
+        # Daemonic processes may not have children (billiard marks Celery's
+        # prefork workers daemonic for stdlib multiprocessing too)
+        if workers <= 1 or multiprocessing.current_process().daemon:
+            return {
+                sku: self.train_product_model(sku, sales_df=df, holidays=holidays)
+                for sku, df in sales.items()
+            }
+
+        results = {}
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_training_worker,
+            initargs=(self.get_db_engine, holidays),
+        ) as executor:
+            futures = {
+                executor.submit(_train_in_worker, sku, df): sku
+                for sku, df in sales.items()
+            }
+            for future in as_completed(futures):
+                sku = futures[future]
+                try:
+                    results[sku] = future.result()
+                except Exception as e:
+                    logging.error(f"Error training model for {sku}: {e}")
+                    results[sku] = {"status": "error", "reason": str(e)}
+
+        return {sku: results[sku] for sku in sales}
+
+    @staticmethod
+    def _training_data_hash(df, holidays):
+        """Hash of everything a fit depends on: daily sales, promo flags and holidays."""
+        h = hashlib.blake2b(digest_size=16)
+        h.update(df['ds'].values.astype('datetime64[ns]').tobytes())
+        h.update(df['y'].to_numpy(dtype=np.int64).tobytes())
+        h.update(df['promo'].to_numpy(dtype=np.int64).tobytes())
+        if holidays is not None:
+            h.update(holidays['ds'].values.astype('datetime64[ns]').tobytes())
+            h.update('\x00'.join(holidays['holiday'].astype(str)).encode('utf-8'))
+        return h.hexdigest()
+
+    @staticmethod
+    def _load_unchanged_meta(product_sku, data_hash):
+        """Return saved metadata if the model on disk was fit on identical data."""
+        model_path = model_path_for(product_sku)
+        meta_path = os.path.join(META_DIR, f"meta_{product_sku}.json")
+        if not (os.path.exists(model_path) and os.path.exists(meta_path)):
+            return None
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+        except Exception:
+            return None
+        return meta if meta.get('data_hash') == data_hash else None
+
+    def predict(self, product_sku, days=7, fast=False, history=None):
         """
         Predict stock levels with future promo handling and correction factor.
 
+        Short histories without a saved model (or fast=True) use Holt-Winters
+        or fast_forecast instead of Prophet.
+
         Args:
             product_sku: Product SKU identifier
             days: Number of days to forecast (default 7)
+            fast: Force the lightweight forecast path
+            history: Sales DataFrame already fetched by the caller (optional)
 
         Returns:
             DataFrame with predictions (yhat_corrected), confidence intervals, and metadata
@@ -189,8 +820,19 @@ class MLEngine:
         Raises:
             Exception: If model cannot be trained or product lacks historical data
         """
+        df_history = history if history is not None else self.get_sales_data(product_sku)
+
+        # Gate on the calendar span, not the row count: sparse sellers have
+        # few sale days over a long history, which Prophet handles fine
+        if len(df_history) >= 5 and (fast or not os.path.exists(model_path_for(product_sku))):
+            span_days = (df_history['ds'].iloc[-1] - df_history['ds'].iloc[0]).days + 1
+            if fast or span_days < FAST_PATH_MAX_SPAN_DAYS:
+                if span_days >= 2 * HW_SEASON:
+                    return holt_winters_forecast(df_history, days)
+                return fast_forecast(df_history, days)
+
         try:
-            model_path = os.path.join(MODELS_DIR, f"model_{product_sku}.json")
+            model_path = model_path_for(product_sku)
             meta_path = os.path.join(META_DIR, f"meta_{product_sku}.json")
 
             # Train model if it doesn't exist
@@ -198,60 +840,115 @@ class MLEngine:
                 res = self.train_product_model(product_sku)
                 if res['status'] != 'success':
                     raise Exception(f"Insufficient data to train model for product {product_sku}. Need at least 5 days of sales history.")
+                model_path = model_path_for(product_sku)
         except Exception as e:
             logging.error(f"Error in predict setup for {product_sku}: {e}")
             raise
 
-        # Load Model
+        # Load Correction Factor & Accuracy (defaults if not found)
+        correction_factor = 1.0
+        accuracy_score = 0.0
+        meta = {}
+
+        try:
+            meta = self._load_meta(meta_path, os.path.getmtime(meta_path))
+            correction_factor = float(meta.get('correction_factor', 1.0))
+            accuracy_score = float(meta.get('accuracy_score', 0.0))
+        except FileNotFoundError:
+            logging.warning(f"Metadata file not found for {product_sku}. Using default correction factor.")
+        except Exception as e:
+            logging.warning(f"Could not load metadata for {product_sku}: {e}. Using defaults.")
+
+        # Load Model (reusing the deserialized copy while the file is unchanged)
+        forecast_file = None
         try:
-            with open(model_path, 'r') as f:
-                model = model_from_json(f.read())
+            model_mtime = os.path.getmtime(model_path)
+            forecast_key = (product_sku, days, model_mtime, self._history_fingerprint(df_history))
+            with _cache_lock:
+                cached_forecast = _forecast_cache.get(forecast_key)
+            if cached_forecast is not None:
+                return cached_forecast.copy()
+
+            # With promo days saved in the metadata the forecast depends only
+            # on the model files, so other workers' forecasts can be reused
+            if meta.get('promo_days') is not None:
+                forecast_file = _forecast_file(product_sku, days, model_path, meta_path)
+                cached_forecast = read_cached_forecast(forecast_file)
+                if cached_forecast is not None:
+                    with _cache_lock:
+                        _forecast_cache[forecast_key] = cached_forecast
+                    return cached_forecast.copy()
+
+            model = self._load_model(model_path, model_mtime)
         except FileNotFoundError:
             raise Exception(f"Model file not found for product {product_sku}")
         except Exception as e:
             logging.error(f"Error loading model for {product_sku}: {e}")
             raise
 
-        # Load Correction Factor & Accuracy (defaults if not found)
-        correction_factor = 1.0
-        accuracy_score = 0.0
-
-        if os.path.exists(meta_path):
-            try:
-                with open(meta_path, 'r') as f:
-                    meta = json.load(f)
-                    correction_factor = float(meta.get('correction_factor', 1.0))
-                    accuracy_score = float(meta.get('accuracy_score', 0.0))
-            except Exception as e:
-                logging.warning(f"Could not load metadata for {product_sku}: {e}. Using defaults.")
-        else:
-            logging.warning(f"Metadata file not found for {product_sku}. Using default correction factor.")
-
         # Create future dataframe
         future = model.make_future_dataframe(periods=days)
 
-        # Handle promo status for future dates
-        df_history = self.get_sales_data(product_sku)
-        if not df_history.empty and 'promo' in df_history.columns:
-            promo_map = dict(zip(df_history['ds'], df_history['promo']))
-            future['promo'] = future['ds'].map(promo_map).fillna(0)
+        # Handle promo status for future dates: prefer the promo days saved
+        # with the model, fall back to the fetched history for older models
+        if meta.get('promo_days') is not None:
+            promo_days = np.unique(np.array(meta['promo_days'], dtype='datetime64[D]').view('i8'))
+            future['promo'] = promo_flags(future['ds'], promo_days)
+        elif not df_history.empty and 'promo' in df_history.columns:
+            future['promo'] = promo_flags(future['ds'], history_promo_days(df_history))
         else:
             future['promo'] = 0
 
         # Run prediction
         forecast = model.predict(future)
 
-        # Apply correction factor and inverse log transform
-        forecast['yhat_corrected'] = np.expm1(forecast['yhat'].values) * correction_factor
-        forecast['yhat_lower_corrected'] = np.expm1(forecast['yhat_lower'].values) * correction_factor
-        forecast['yhat_upper_corrected'] = np.expm1(forecast['yhat_upper'].values) * correction_factor
-
-        # Ensure no negative values
-        cols = ['yhat_corrected', 'yhat_lower_corrected', 'yhat_upper_corrected']
-        for col in cols:
-            forecast[col] = forecast[col].clip(lower=0)
+        # Apply correction factor and inverse log transform (no negative values)
+        apply_correction(forecast, correction_factor)
 
         # Add accuracy for frontend display
         forecast['accuracy_score'] = accuracy_score
 
+        with _cache_lock:
+            _forecast_cache[forecast_key] = forecast.copy()
+        if forecast_file is not None:
+            write_cached_forecast(forecast_file, forecast, product_sku, days)
+
         return forecast
+
+    @staticmethod
+    def _load_model(model_path, model_mtime):
+        """Deserialize a Prophet model, cached per (path, mtime)."""
+        key = (model_path, model_mtime)
+        with _cache_lock:
+            model = _model_cache.get(key)
+        if model is None:
+            if model_path.endswith('.json'):
+                # Legacy Prophet JSON written before models were pickled
+                with open(model_path, 'r') as f:
+                    model = model_from_json(f.read())
+            else:
+                with gzip.open(model_path, 'rb') as f:
+                    model = pickle.load(f)
+            with _cache_lock:
+                _model_cache[key] = model
+        return model
+
+    @staticmethod
+    def _load_meta(meta_path, meta_mtime):
+        """Parse a model's metadata JSON, cached per (path, mtime)."""
+        key = (meta_path, meta_mtime)
+        with _cache_lock:
+            meta = _meta_cache.get(key)
+        if meta is None:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            with _cache_lock:
+                _meta_cache[key] = meta
+        return meta
+
+    @staticmethod
+    def _history_fingerprint(df_history):
+        """Cheap fingerprint that changes whenever new sales are recorded."""
+        if df_history.empty:
+            return (0, None, 0)
+        return (len(df_history), df_history['ds'].iloc[-1], int(df_history['y'].sum()))
@@ -0,0 +1,232 @@
+"""
+Numeric kernels for lightweight forecasting.
+
+The kernels are compiled with numba when it is installed. Without it the
+element-wise loops would run as interpreted Python, so the public kernels
+fall back to vectorized numpy versions instead.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:  # numba is optional
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit."""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def holt_winters_additive(y, horizon, season, alpha, beta, gamma, phi):
+    """
+    Additive Holt-Winters (damped trend) smoothing.
+
+    Args:
+        y: float64 array of a contiguous daily series (len >= 2 * season)
+        horizon: Number of steps to forecast
+        season: Season length in steps (7 for weekly)
+        alpha, beta, gamma: Level, trend and seasonal smoothing factors
+        phi: Trend damping factor (1.0 = no damping)
+
+    Returns:
+        tuple: (one-step-ahead in-sample fit, forecast of length horizon)
+    """
+    n = y.shape[0]
+    first = y[:season].mean()
+    second = y[season:2 * season].mean()
+    level = first
+    trend = (second - first) / season
+    seasonal = y[:season] - first
+
+    fitted = np.empty(n)
+    for t in range(n):
+        s = seasonal[t % season]
+        fitted[t] = level + phi * trend + s
+        prev_level = level
+        level = alpha * (y[t] - s) + (1.0 - alpha) * (prev_level + phi * trend)
+        trend = beta * (level - prev_level) + (1.0 - beta) * phi * trend
+        seasonal[t % season] = gamma * (y[t] - level) + (1.0 - gamma) * s
+
+    forecast = np.empty(horizon)
+    damped = 0.0
+    for h in range(horizon):
+        damped += phi ** (h + 1)
+        forecast[h] = level + damped * trend + seasonal[(n + h) % season]
+
+    return fitted, forecast
+
+
+@njit(cache=True)
+def holt_winters_fit(y, horizon, season, alphas, betas, gammas, phi):
+    """
+    Grid-search smoothing factors by in-sample SSE and forecast with the best.
+
+    Returns:
+        tuple: (fitted, forecast, best alpha)
+    """
+    best_sse = np.inf
+    best_alpha = alphas[0]
+    best_beta = betas[0]
+    best_gamma = gammas[0]
+    for a in alphas:
+        for b in betas:
+            for g in gammas:
+                fitted, _ = holt_winters_additive(y, 0, season, a, b, g, phi)
+                # Skip the first season, where the fit is just initialization
+                sse = ((y[season:] - fitted[season:]) ** 2).sum()
+                if sse < best_sse:
+                    best_sse = sse
+                    best_alpha = a
+                    best_beta = b
+                    best_gamma = g
+
+    fitted, forecast = holt_winters_additive(
+        y, horizon, season, best_alpha, best_beta, best_gamma, phi
+    )
+    return fitted, forecast, best_alpha
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def log_sigma_filter(y, n_sigma):
+    """
+    log1p-transform a series and flag points within n_sigma of the mean.
+
+    Fuses the transform, mean/std (ddof=1, like pandas) and the sigma test
+    into two passes over the data.
+
+    Args:
+        y: float64 array of daily quantities
+        n_sigma: Outlier threshold in standard deviations of log1p(y)
+
+    Returns:
+        tuple: (log1p(y), boolean keep mask; all True when std is 0)
+    """
+    n = y.shape[0]
+    y_log = np.empty(n)
+    total = 0.0
+    for i in range(n):
+        v = np.log1p(y[i])
+        y_log[i] = v
+        total += v
+    mu = total / n
+
+    sq = 0.0
+    for i in range(n):
+        d = y_log[i] - mu
+        sq += d * d
+    std = np.sqrt(sq / (n - 1)) if n > 1 else 0.0
+
+    keep = np.ones(n, dtype=np.bool_)
+    if std > 0:
+        limit = n_sigma * std
+        for i in range(n):
+            keep[i] = abs(y_log[i] - mu) <= limit
+    return y_log, keep
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def correction_metrics(y_true_log, y_pred_log, factor_min, factor_max):
+    """
+    Correction factor and error metrics on the original (expm1) scale.
+
+    Args:
+        y_true_log: float64 array of log1p actuals
+        y_pred_log: float64 array of log1p in-sample predictions
+        factor_min, factor_max: Bounds the correction factor is clamped to
+
+    Returns:
+        tuple: (clamped median actual/predicted ratio, MAE, MAPE as a fraction)
+    """
+    n = y_true_log.shape[0]
+    ratios = np.empty(n)
+    abs_err = 0.0
+    pct_err = 0.0
+    eps = np.finfo(np.float64).eps
+    for i in range(n):
+        actual = np.expm1(y_true_log[i])
+        pred = np.expm1(y_pred_log[i])
+        ratios[i] = actual / (pred + 1e-6)
+        err = abs(actual - pred)
+        abs_err += err
+        # Same denominator guard as sklearn's mean_absolute_percentage_error
+        pct_err += err / max(abs(actual), eps)
+
+    # Median by selection (O(n)) rather than a full sort: after partitioning
+    # at k everything left of k is <= the k-th value, so the lower middle
+    # value for even n is just the max of that half
+    k = n // 2
+    part = np.partition(ratios, k)
+    median = part[k]
+    if n % 2 == 0:
+        median = 0.5 * (part[:k].max() + median)
+    factor = min(max(median, factor_min), factor_max)
+    return factor, abs_err / n, pct_err / n
+
+
+def _log_sigma_filter_numpy(y, n_sigma):
+    """Vectorized log_sigma_filter for when numba is not installed."""
+    y_log = np.log1p(y)
+    n = y_log.shape[0]
+    std = y_log.std(ddof=1) if n > 1 else 0.0
+    if std > 0:
+        keep = np.abs(y_log - y_log.mean()) <= n_sigma * std
+    else:
+        keep = np.ones(n, dtype=np.bool_)
+    return y_log, keep
+
+
+def _correction_metrics_numpy(y_true_log, y_pred_log, factor_min, factor_max):
+    """Vectorized correction_metrics for when numba is not installed."""
+    actual = np.expm1(y_true_log)
+    pred = np.expm1(y_pred_log)
+    abs_err = np.abs(actual - pred)
+    eps = np.finfo(np.float64).eps
+    factor = min(max(float(np.median(actual / (pred + 1e-6))), factor_min), factor_max)
+    mape = float((abs_err / np.maximum(np.abs(actual), eps)).mean())
+    return factor, float(abs_err.mean()), mape
+
+
+def _holt_winters_fit_numpy(y, horizon, season, alphas, betas, gammas, phi):
+    """
+    Vectorized holt_winters_fit for when numba is not installed.
+
+    Runs every (alpha, beta, gamma) combination in lock step, so the Python
+    loop is over time steps only rather than grid size times time steps.
+    """
+    a, b, g = (grid.ravel() for grid in np.meshgrid(alphas, betas, gammas, indexing='ij'))
+    n = y.shape[0]
+    first = y[:season].mean()
+    second = y[season:2 * season].mean()
+    level = np.full(a.shape[0], first)
+    trend = np.full(a.shape[0], (second - first) / season)
+    seasonal = np.tile(y[:season] - first, (a.shape[0], 1))
+
+    fitted = np.empty((a.shape[0], n))
+    for t in range(n):
+        i = t % season
+        s = seasonal[:, i].copy()
+        fitted[:, t] = level + phi * trend + s
+        prev_level = level
+        level = a * (y[t] - s) + (1.0 - a) * (prev_level + phi * trend)
+        trend = b * (level - prev_level) + (1.0 - b) * phi * trend
+        seasonal[:, i] = g * (y[t] - level) + (1.0 - g) * s
+
+    # argmin keeps the first minimum, like the strict < of the jitted loop
+    sse = ((y[season:] - fitted[:, season:]) ** 2).sum(axis=1)
+    best = int(np.argmin(sse))
+
+    steps = np.arange(horizon)
+    damped = np.cumsum(phi ** (steps + 1.0))
+    forecast = level[best] + damped * trend[best] + seasonal[best, (n + steps) % season]
+    return fitted[best], forecast, a[best]
+
+
+if not HAVE_NUMBA:
+    holt_winters_fit = _holt_winters_fit_numpy
+    log_sigma_filter = _log_sigma_filter_numpy
+    correction_metrics = _correction_metrics_numpy
@@ -1,14 +1,103 @@
 """Event data access layer using SQLAlchemy ORM."""
 
-from typing import List, Optional, Dict, Any
-
-from sqlalchemy import and_
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterator, List, Optional, Dict, Any
+
+from cachetools import TTLCache
+from sqlalchemy import and_, func, insert, lambda_stmt, select
 from sqlalchemy.orm import Session
 
 from models.orm.event import Event
+from utils.cache_service import (
+    HOLIDAYS_CACHE_TTL,
+    HOLIDAYS_MAX_AGE,
+    HOLIDAYS_VERSION_NAME,
+    get_cache_service,
+)
 from utils.db_session import get_db_session
 
 
+@dataclass(slots=True)
+class EventDTO:
+    """
+    One event row for list endpoints: the calendar's event shape. Event.to_dict()
+    additionally has created_at, which no list consumer reads.
+
+    Built straight from result tuples: no per-row dict or ORM instance
+    state, and orjson serializes it (dates included) without to_dict().
+    """
+
+    event_id: int
+    event_name: str
+    event_date: date
+    type: str
+    description: Optional[str]
+    include_in_prediction: bool
+
+
+# Prediction holidays keyed by the shared holidays version, which event
+# writes bump. Same freshness rules as ml_engine.get_shared_holidays: an
+# entry is reloaded after HOLIDAYS_MAX_AGE (HOLIDAYS_CACHE_TTL without Redis)
+_holiday_cache = TTLCache(maxsize=4, ttl=HOLIDAYS_MAX_AGE)
+_holiday_cache_lock = threading.Lock()
+
+
+def _event_by_id(event_id: int):
+    """Cached SELECT of one Event entity; event_id becomes a bound parameter."""
+    return lambda_stmt(lambda: select(Event).where(Event.event_id == event_id))
+
+
+def _all_events():
+    """Cached SELECT of the listed columns for every event, newest first."""
+    return lambda_stmt(
+        lambda: select(
+            Event.event_id,
+            Event.event_name,
+            Event.event_date,
+            Event.type,
+            Event.description,
+            Event.include_in_prediction,
+        ).order_by(Event.event_date.desc())
+    )
+
+
+def _events_of_type(event_type: str):
+    """Cached SELECT of the listed columns for one event type, newest first."""
+    return lambda_stmt(
+        lambda: select(
+            Event.event_id,
+            Event.event_name,
+            Event.event_date,
+            Event.type,
+            Event.description,
+            Event.include_in_prediction,
+        )
+        .where(Event.type == event_type)
+        .order_by(Event.event_date.desc())
+    )
+
+
+def _type_fingerprint(event_type: str):
+    """Cached SELECT of row count and newest id/date for one event type."""
+    return lambda_stmt(
+        lambda: select(
+            func.count(),
+            func.max(Event.event_id),
+            func.max(Event.event_date),
+        ).where(Event.type == event_type)
+    )
+
+
+def _clear_holiday_cache() -> None:
+    """Drop this process's cached prediction holidays after an event write."""
+    with _holiday_cache_lock:
+        _holiday_cache.clear()
+
+
 class EventModel:
     """
     Data access layer for event operations.
@@ -18,19 +107,46 @@ class EventModel:
     """
 
     @staticmethod
-    def get_all_events() -> List[Dict[str, Any]]:
+    def get_all_events() -> List[EventDTO]:
         """
         Retrieve all events ordered by date in descending order.
 
         Returns:
-            List of event dictionaries.
+            List of EventDTO rows.
 
         Raises:
             Exception: Database operation errors.
         """
         with get_db_session() as session:
-            events = session.query(Event).order_by(Event.event_date.desc()).all()
-            return [event.to_dict() for event in events]
+            events = session.execute(_all_events()).all()
+        return [EventDTO(*row) for row in events]
+
+    @staticmethod
+    def iter_all_events(batch_size: int = 500) -> Iterator[EventDTO]:
+        """
+        Stream all events, newest first, without materializing the list.
+
+        Uses a server-side (named) cursor via stream_results, fetching
+        batch_size rows per round trip. The session is held open until the
+        iterator is exhausted.
+
+        Args:
+            batch_size: Rows fetched from PostgreSQL at a time. Defaults to 500.
+
+        Yields:
+            EventDTO rows, as returned by get_all_events.
+
+        Raises:
+            Exception: Database operation errors.
+        """
+        with get_db_session() as session:
+            rows = session.execute(
+                _all_events(),
+                execution_options={"stream_results": True, "yield_per": batch_size},
+            )
+            for partition in rows.partitions():
+                for row in partition:
+                    yield EventDTO(*row)
 
     @staticmethod
     def get_event_by_id(event_id: int) -> Optional[Dict[str, Any]]:
@@ -47,7 +163,7 @@ class EventModel:
             Exception: Database operation errors.
         """
         with get_db_session() as session:
-            event = session.query(Event).filter(Event.event_id == event_id).first()
+            event = session.execute(_event_by_id(event_id)).scalars().first()
             return event.to_dict() if event else None
 
     @staticmethod
@@ -93,7 +209,51 @@ class EventModel:
             )
             session.add(event)
             session.flush()
-            return event.to_dict()
+            result = event.to_dict()
+
+        _clear_holiday_cache()
+        return result
+
+    @staticmethod
+    def create_events_bulk(rows: List[Dict[str, Any]]) -> int:
+        """
+        Insert many events in one executemany round trip.
+
+        Args:
+            rows: Dictionaries with event_name, event_date and optional
+                type, description and include_in_prediction keys.
+
+        Returns:
+            Number of events inserted.
+
+        Raises:
+            Exception: Database operation errors.
+        """
+        from datetime import datetime
+
+        valid_types = ["promotion", "holiday", "store-closed"]
+        params = []
+        for row in rows:
+            event_date = row["event_date"]
+            if isinstance(event_date, str):
+                event_date = datetime.fromisoformat(event_date)
+            event_type = row.get("type", "promotion")
+            params.append({
+                "event_name": row["event_name"],
+                "event_date": event_date,
+                "type": event_type if event_type in valid_types else "promotion",
+                "description": row.get("description"),
+                "include_in_prediction": row.get("include_in_prediction", True),
+            })
+
+        if not params:
+            return 0
+
+        with get_db_session() as session:
+            session.execute(insert(Event), params)
+
+        _clear_holiday_cache()
+        return len(params)
 
     @staticmethod
     def delete_event(event_id: int) -> Optional[Dict[str, Any]]:
@@ -112,7 +272,7 @@ class EventModel:
             Exception: Database operation errors.
         """
         with get_db_session() as session:
-            event = session.query(Event).filter(Event.event_id == event_id).first()
+            event = session.execute(_event_by_id(event_id)).scalars().first()
 
             if not event:
                 return None
@@ -122,7 +282,9 @@ class EventModel:
 
             result = event.to_dict()
             session.delete(event)
-            return result
+
+        _clear_holiday_cache()
+        return result
 
     @staticmethod
     def get_holidays_for_prediction() -> List[Dict[str, Any]]:
@@ -137,61 +299,85 @@ class EventModel:
         Raises:
             Exception: Database operation errors.
         """
-        with get_db_session() as session:
-            events = (
-                session.query(
-                    Event.event_name.label("holiday"),
-                    Event.event_date.label("ds"),
-                )
-                .filter(Event.include_in_prediction == True)
-                .order_by(Event.event_date.asc())
-                .all()
+        key = ("holidays_v1", get_cache_service().get_version(HOLIDAYS_VERSION_NAME))
+        with _holiday_cache_lock:
+            cached = _holiday_cache.get(key)
+        if cached is not None:
+            loaded_at, holidays = cached
+            max_age = HOLIDAYS_MAX_AGE if key[1] is not None else HOLIDAYS_CACHE_TTL
+            if time.monotonic() - loaded_at < max_age:
+                return list(holidays)
+
+        stmt = lambda_stmt(
+            lambda: select(
+                Event.event_name.label("holiday"),
+                Event.event_date.label("ds"),
             )
-
-            return [
-                {
-                    "holiday": event[0],
-                    "ds": event[1].isoformat() if event[1] else None,
-                }
-                for event in events
-            ]
+            .where(Event.include_in_prediction)
+            .order_by(Event.event_date.asc())
+        )
+        with get_db_session() as session:
+            events = session.execute(stmt).all()
+
+        holidays = [
+            {
+                "holiday": event[0],
+                "ds": event[1].isoformat() if event[1] else None,
+            }
+            for event in events
+        ]
+        with _holiday_cache_lock:
+            _holiday_cache[key] = (time.monotonic(), holidays)
+        return list(holidays)
 
     @staticmethod
-    def get_custom_events() -> List[Dict[str, Any]]:
+    def get_custom_events() -> List[EventDTO]:
         """
         Retrieve only custom user-created events.
 
         Returns:
-            List of custom event dictionaries ordered by date.
+            List of custom EventDTO rows ordered by date.
 
         Raises:
             Exception: Database operation errors.
         """
         with get_db_session() as session:
-            events = (
-                session.query(Event)
-                .filter(Event.type == "custom")
-                .order_by(Event.event_date.desc())
-                .all()
-            )
-            return [event.to_dict() for event in events]
+            events = session.execute(_events_of_type("custom")).all()
+        return [EventDTO(*row) for row in events]
 
     @staticmethod
-    def get_holidays() -> List[Dict[str, Any]]:
+    def get_etag(event_type: str = "holiday") -> str:
+        """
+        Validator for the events of one type, without reading the rows.
+
+        Events are only ever inserted or deleted, and ids only grow, so
+        the count and the highest id change whenever the list does.
+
+        Args:
+            event_type: Event type the list is filtered on. Defaults to 'holiday'.
+
+        Returns:
+            Opaque ETag value.
+
+        Raises:
+            Exception: Database operation errors.
+        """
+        with get_db_session() as session:
+            count, max_id, max_date = session.execute(_type_fingerprint(event_type)).one()
+        fingerprint = f"{event_type}:{count}:{max_id}:{max_date}".encode()
+        return hashlib.blake2s(fingerprint, digest_size=16).hexdigest()
+
+    @staticmethod
+    def get_holidays() -> List[EventDTO]:
         """
         Retrieve only holiday events.
 
         Returns:
-            List of holiday event dictionaries ordered by date.
+            List of holiday EventDTO rows ordered by date.
 
         Raises:
             Exception: Database operation errors.
         """
         with get_db_session() as session:
-            events = (
-                session.query(Event)
-                .filter(Event.type == "holiday")
-                .order_by(Event.event_date.desc())
-                .all()
-            )
-            return [event.to_dict() for event in events]
+            events = session.execute(_events_of_type("holiday")).all()
+        return [EventDTO(*row) for row in events]
@@ -1,9 +1,32 @@
-"""SQLAlchemy ORM models for SIPREMS backend."""
+"""SQLAlchemy ORM models for SIPREMS backend.
+
+Every model module shares the single ``Base`` from ``models.orm.base``.
+Model classes are re-exported lazily (PEP 562), so importing one model
+does not import and map all of them.
+"""
+
+from importlib import import_module
 
 from models.orm.base import Base
-from models.orm.user import User
-from models.orm.product import Product
-from models.orm.transaction import Transaction
-from models.orm.event import Event
+
+_LAZY_EXPORTS = {
+    "User": "models.orm.user",
+    "Product": "models.orm.product",
+    "Transaction": "models.orm.transaction",
+    "Event": "models.orm.event",
+}
 
 __all__ = ["Base", "User", "Product", "Transaction", "Event"]
+
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(__all__)
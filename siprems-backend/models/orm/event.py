@@ -1,9 +1,8 @@
 """Event ORM model for holidays and special events tracking."""
 
-from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Index
+from sqlalchemy import DDL, Column, Integer, String, Text, DateTime, Boolean, Index, event, func
 from models.orm.base import Base
 
 
@@ -15,25 +14,39 @@ class Event(Base):
         event_id: Unique event identifier (primary key).
         event_name: Name of the event (e.g., "Christmas", "Black Friday").
         event_date: Date when the event occurs.
-        type: Event type - 'holiday' or 'custom'.
+        type: Event type - 'holiday' or 'custom' (partition key).
         description: Detailed description of the event.
         include_in_prediction: Whether this event should be included in ML prediction models.
         created_at: Event creation timestamp.
     """
 
     __tablename__ = "events"
+    # Server-generated timestamps come back via RETURNING, not a reload
+    __mapper_args__ = {"eager_defaults": True}
 
-    event_id = Column(Integer, primary_key=True, index=True)
+    # Part of a composite key, so the serial default must be explicit or
+    # SQLAlchemy stops treating event_id as the generated column
+    event_id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     event_name = Column(String(255), nullable=False)
     event_date = Column(DateTime, nullable=False, index=True)
-    type = Column(String(20), nullable=False, index=True, default="promotion")
+    # Partition key, so PostgreSQL requires it in the primary key
+    type = Column(String(20), primary_key=True, default="promotion")
     description = Column(Text, nullable=True)
     include_in_prediction = Column(Boolean, default=True, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
+    # LIST-partitioned by type: per-type reads (holidays, custom events)
+    # are pruned to one partition and need no index on type
     __table_args__ = (
-        Index("idx_type_date", "type", "event_date"),
-        Index("idx_include_prediction", "include_in_prediction"),
+        # Partial index: the holidays query only ever reads included events
+        Index(
+            "idx_events_predict",
+            "event_date",
+            # Bare column (not IS TRUE) so it matches `WHERE include_in_prediction`
+            postgresql_where=include_in_prediction,
+            postgresql_include=["event_name"],
+        ),
+        {"postgresql_partition_by": "LIST (type)"},
     )
 
     def __repr__(self) -> str:
@@ -59,3 +72,13 @@ class Event(Base):
             "include_in_prediction": self.include_in_prediction,
             "created_at": self.created_at.isoformat() if self.created_at else None,
         }
+
+
+# Same partitions as schema.sql; without them create_all leaves a
+# partitioned table that rejects every insert
+for _statement in (
+    "CREATE TABLE events_holiday PARTITION OF events FOR VALUES IN ('holiday')",
+    "CREATE TABLE events_custom PARTITION OF events FOR VALUES IN ('custom')",
+    "CREATE TABLE events_default PARTITION OF events DEFAULT",
+):
+    event.listen(Event.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
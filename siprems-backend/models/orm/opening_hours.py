@@ -1,12 +1,53 @@
 """Opening Hours ORM model for store operating hours."""
 
-from datetime import datetime, time
 from typing import Optional
 
-from sqlalchemy import Column, Integer, String, Boolean, Time, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, SmallInteger, Boolean, DateTime, ForeignKey, Index, func
 from models.orm.base import Base
 
 
+# day_of_week is stored as an index into this tuple (0=Monday)
+DAYS_OF_WEEK = (
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+    "Sunday",
+)
+_DAY_INDEX = {name: index for index, name in enumerate(DAYS_OF_WEEK)}
+
+
+def day_index(day: str) -> int:
+    """Stored day_of_week for a day name (case-insensitive)."""
+    try:
+        return _DAY_INDEX[day.capitalize()]
+    except (AttributeError, KeyError):
+        raise ValueError(f"Invalid day of week: {day!r}") from None
+
+
+def minutes_from_hhmm(value: Optional[str]) -> Optional[int]:
+    """Minutes since midnight for an "HH:MM" string (None stays None)."""
+    if value is None:
+        return None
+    try:
+        hours, minutes = value.split(":")
+        hours, minutes = int(hours), int(minutes)
+    except (AttributeError, ValueError):
+        raise ValueError(f"Invalid time (expected HH:MM): {value!r}") from None
+    if not (0 <= minutes < 60 and 0 <= hours * 60 + minutes <= 1440):
+        raise ValueError(f"Invalid time (expected HH:MM): {value!r}")
+    return hours * 60 + minutes
+
+
+def hhmm_from_minutes(value: Optional[int]) -> Optional[str]:
+    """"HH:MM" string for minutes since midnight (None stays None)."""
+    if value is None:
+        return None
+    return f"{value // 60:02d}:{value % 60:02d}"
+
+
 class OpeningHours(Base):
     """
     Opening Hours model for managing store's daily operating hours.
@@ -15,43 +56,54 @@ class OpeningHours(Base):
         opening_hours_id: Unique identifier (primary key).
         store_id: Associated store ID (foreign key reference).
         day_of_week: Day of week (0=Monday, 6=Sunday).
-        open_time: Opening time (HH:MM format as time type).
-        close_time: Closing time (HH:MM format as time type).
+        open_time: Opening time in minutes since midnight.
+        close_time: Closing time in minutes since midnight.
         is_closed: Boolean indicating if store is closed on this day.
         created_at: Record creation timestamp.
         updated_at: Last update timestamp.
     """
 
     __tablename__ = "opening_hours"
+    # Server-generated timestamps come back via RETURNING, not a reload
+    __mapper_args__ = {"eager_defaults": True}
 
     opening_hours_id = Column(Integer, primary_key=True, index=True)
     store_id = Column(Integer, ForeignKey("stores.store_id"), nullable=False, index=True)
-    day_of_week = Column(String(10), nullable=False)
-    open_time = Column(String(5), nullable=True)
-    close_time = Column(String(5), nullable=True)
+    # Small integers rather than "Monday"/"HH:MM" strings; the helpers above
+    # validate and convert at the API boundary
+    day_of_week = Column(SmallInteger, nullable=False)
+    open_time = Column(SmallInteger, nullable=True)
+    close_time = Column(SmallInteger, nullable=True)
     is_closed = Column(Boolean, default=False, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+    __table_args__ = (
+        # Per-day lookups
+        Index("idx_opening_hours_store_day", "store_id", "day_of_week"),
+    )
 
     def __repr__(self) -> str:
         """String representation of OpeningHours."""
-        status = "Closed" if self.is_closed else f"{self.open_time}-{self.close_time}"
-        return f"<OpeningHours(store_id={self.store_id}, {self.day_of_week}: {status})>"
+        if self.is_closed:
+            status = "Closed"
+        else:
+            status = f"{hhmm_from_minutes(self.open_time)}-{hhmm_from_minutes(self.close_time)}"
+        return f"<OpeningHours(store_id={self.store_id}, {DAYS_OF_WEEK[self.day_of_week]}: {status})>"
 
     def to_dict(self) -> dict:
-        """
-        Convert opening hours to dictionary.
-
-        Returns:
-            Dictionary representation of opening hours data.
-        """
+        """Convert opening hours to dictionary (day name and HH:MM times)."""
+        created_at = self.created_at
+        updated_at = self.updated_at
         return {
             "opening_hours_id": self.opening_hours_id,
             "store_id": self.store_id,
-            "day_of_week": self.day_of_week,
-            "open_time": self.open_time,
-            "close_time": self.close_time,
+            "day_of_week": DAYS_OF_WEEK[self.day_of_week],
+            "open_time": hhmm_from_minutes(self.open_time),
+            "close_time": hhmm_from_minutes(self.close_time),
             "is_closed": self.is_closed,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "created_at": created_at.isoformat() if created_at is not None else None,
+            "updated_at": updated_at.isoformat() if updated_at is not None else None,
         }
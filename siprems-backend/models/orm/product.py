@@ -1,9 +1,8 @@
 """Product ORM model for inventory management."""
 
-from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Index, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index, Text, func
 from models.orm.base import Base
 
 
@@ -25,6 +24,8 @@ class Product(Base):
     """
 
     __tablename__ = "products"
+    # Server-generated timestamps come back via RETURNING, not a reload
+    __mapper_args__ = {"eager_defaults": True}
 
     product_id = Column(Integer, primary_key=True, index=True)
     sku = Column(String(50), unique=True, nullable=False, index=True)
@@ -35,10 +36,12 @@ class Product(Base):
     price = Column(Float, nullable=False)
     stock = Column(Integer, default=0, nullable=False)
     description = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     __table_args__ = (
         Index("idx_category_stock", "category", "stock"),
+        # Lowest-stock top-k (dashboard) and low-stock counts read this in order
+        Index("idx_products_stock", "stock", postgresql_include=["name"]),
     )
 
     def __repr__(self) -> str:
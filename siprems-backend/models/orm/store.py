@@ -1,9 +1,8 @@
 """Store ORM model for store configuration and management."""
 
-from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, func
 from models.orm.base import Base
 
 
@@ -21,13 +20,17 @@ class Store(Base):
     """
 
     __tablename__ = "stores"
+    # Server-generated timestamps come back via RETURNING, not a reload
+    __mapper_args__ = {"eager_defaults": True}
 
     store_id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, nullable=False, index=True)
     name = Column(String(255), nullable=False)
     address = Column(String(500), nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
 
     def __repr__(self) -> str:
         """String representation of Store."""
@@ -1,9 +1,10 @@
 """Transaction ORM model for sales and inventory tracking."""
 
-from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Column, Integer, Float, DateTime, Boolean, ForeignKey, Index
+from sqlalchemy import (
+    DDL, Column, Integer, Float, DateTime, Boolean, ForeignKey, Index, event, func
+)
 from sqlalchemy.orm import relationship
 from models.orm.base import Base
 
@@ -22,17 +23,39 @@ class Transaction(Base):
     """
 
     __tablename__ = "transactions"
+    # Server-generated timestamps come back via RETURNING, not a reload
+    __mapper_args__ = {"eager_defaults": True}
 
-    transaction_id = Column(Integer, primary_key=True, index=True)
+    # Part of a composite key, so the serial default must be explicit or
+    # SQLAlchemy stops treating transaction_id as the generated column
+    transaction_id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     product_id = Column(Integer, ForeignKey("products.product_id"), nullable=False)
     quantity_sold = Column(Integer, nullable=False)
     price_per_unit = Column(Float, nullable=False)
     is_promo = Column(Boolean, default=False, nullable=False)
-    transaction_date = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Partition key, so PostgreSQL requires it in the primary key
+    transaction_date = Column(
+        DateTime(timezone=True), primary_key=True, server_default=func.now(), nullable=False
+    )
 
     __table_args__ = (
-        Index("idx_product_date", "product_id", "transaction_date"),
-        Index("idx_transaction_date", "transaction_date"),
+        Index(
+            "idx_transactions_product_date",
+            "product_id",
+            "transaction_date",
+            postgresql_include=["quantity_sold", "is_promo"],
+        ),
+        # BRIN: rows arrive in date order, so a few block ranges summarize
+        # the whole table; B-tree indexes above still serve equality lookups
+        Index(
+            "idx_transaction_date",
+            "transaction_date",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 32},
+        ),
+        # RANGE-partitioned by month like schema.sql; monthly partitions come
+        # from utils.partitions, the DEFAULT one is created with the table
+        {"postgresql_partition_by": "RANGE (transaction_date)"},
     )
 
     def __repr__(self) -> str:
@@ -59,3 +82,33 @@ class Transaction(Base):
                 self.transaction_date.isoformat() if self.transaction_date else None
             ),
         }
+
+
+event.listen(
+    Transaction.__table__,
+    "after_create",
+    DDL("CREATE TABLE transactions_default PARTITION OF transactions DEFAULT").execute_if(
+        dialect="postgresql"
+    ),
+)
+
+# Pre-aggregated daily sales read by the Celery trainers (SALES_MATVIEW_ENABLED)
+# and refreshed by tasks.ml_tasks.refresh_sales_view; same definition as schema.sql
+event.listen(
+    Transaction.__table__,
+    "after_create",
+    DDL(
+        "CREATE MATERIALIZED VIEW daily_sales_by_product AS "
+        "SELECT product_id, transaction_date::date AS ds, SUM(quantity_sold) AS y, "
+        "MAX(CASE WHEN is_promo THEN 1 ELSE 0 END) AS promo "
+        "FROM transactions GROUP BY product_id, transaction_date::date"
+    ).execute_if(dialect="postgresql"),
+)
+# Unique index: required for REFRESH ... CONCURRENTLY
+event.listen(
+    Transaction.__table__,
+    "after_create",
+    DDL(
+        "CREATE UNIQUE INDEX idx_daily_sales_product_ds ON daily_sales_by_product(product_id, ds)"
+    ).execute_if(dialect="postgresql"),
+)
@@ -1,7 +1,6 @@
-from datetime import datetime
 from typing import Optional, Dict, Any
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, bindparam, lambda_stmt, select, update, func
 from models.orm.base import Base
 from utils.db_session import get_db_session
 
@@ -12,14 +11,18 @@ class User(Base):
     """
 
     __tablename__ = "users"
+    # Server-generated timestamps come back via RETURNING, not a reload
+    __mapper_args__ = {"eager_defaults": True}
 
     user_id = Column(Integer, primary_key=True, index=True)
     email = Column(String(255), unique=True, nullable=False, index=True)
     full_name = Column(String(255), nullable=False)
     password_hash = Column(String(255), nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
 
     def __repr__(self) -> str:
         return f"<User(user_id={self.user_id}, email='{self.email}')>"
@@ -41,7 +44,10 @@ class User(Base):
     def user_exists(email: str) -> bool:
         """Check if a user exists by email."""
         with get_db_session() as session:
-            return session.query(User).filter(User.email == email).first() is not None
+            stmt = lambda_stmt(
+                lambda: select(User.user_id).where(User.email == email).limit(1)
+            )
+            return session.execute(stmt).first() is not None
 
     @staticmethod
     def create_user(email: str, full_name: str, password_hash: str) -> Dict[str, Any]:
@@ -52,8 +58,6 @@ class User(Base):
                 full_name=full_name,
                 password_hash=password_hash,
                 is_active=True,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow()
             )
             session.add(new_user)
             session.commit()
@@ -65,35 +69,62 @@ class User(Base):
     def get_user_by_email(email: str) -> Optional[Dict[str, Any]]:
         """Get full user data including password_hash for authentication."""
         with get_db_session() as session:
-            user = session.query(User).filter(User.email == email).first()
-            if user:
-                data = user.to_dict()
-                data['password_hash'] = user.password_hash  # Penting untuk login!
-                return data
-            return None
+            return fetch_user_auth(session, email)
 
     @staticmethod
     def get_user_by_id(user_id: int) -> Optional[Dict[str, Any]]:
         """Get user data by ID."""
         with get_db_session() as session:
-            user = session.query(User).filter(User.user_id == user_id).first()
+            user = session.get(User, user_id)
             return user.to_dict() if user else None
 
     @staticmethod
     def update_user_last_login(user_id: int) -> None:
         """Update user's last login timestamp."""
         with get_db_session() as session:
-            user = session.query(User).filter(User.user_id == user_id).first()
-            if user:
-                user.updated_at = datetime.utcnow()
-                session.commit()
+            update_user_columns(session, user_id)
 
     @staticmethod
     def update_user_password(user_id: int, new_password_hash: str) -> None:
         """Update user's password."""
         with get_db_session() as session:
-            user = session.query(User).filter(User.user_id == user_id).first()
-            if user:
-                user.password_hash = new_password_hash
-                user.updated_at = datetime.utcnow()
-                session.commit()
+            update_user_columns(session, user_id, password_hash=new_password_hash)
+
+
+# Login lookup as a plain Core select built once: rows come back as
+# mappings without constructing and identity-mapping a User instance
+USER_AUTH_BY_EMAIL = select(
+    User.user_id,
+    User.email,
+    User.full_name,
+    User.is_active,
+    User.created_at,
+    User.updated_at,
+    User.password_hash,
+).where(User.email == bindparam("email"))
+
+
+def fetch_user_auth(session, email: str) -> Optional[Dict[str, Any]]:
+    """User dictionary (as to_dict) plus password_hash for email, or None."""
+    row = session.execute(USER_AUTH_BY_EMAIL, {"email": email}).mappings().first()
+    if row is None:
+        return None
+    data = dict(row)
+    for key in ("created_at", "updated_at"):
+        value = data[key]
+        data[key] = value.isoformat() if value is not None else None
+    return data
+
+
+def update_user_columns(session, user_id: int, **values: Any) -> None:
+    """
+    Set columns on one user and bump updated_at in a single UPDATE.
+
+    Nothing is loaded first, so a missing user_id is simply a no-op.
+    """
+    session.execute(
+        update(User)
+        .where(User.user_id == user_id)
+        .values(updated_at=func.now(), **values)
+        .execution_options(synchronize_session=False)
+    )
@@ -2,13 +2,45 @@
 
 from typing import List, Optional, Dict, Any
 
-from sqlalchemy import func
+from sqlalchemy import bindparam, func, select
 from sqlalchemy.orm import Session
 
 from models.orm.product import Product
+from utils.cache_service import (
+    PRODUCTS_VERSION_NAME,
+    cached_result,
+    get_cache_service,
+    bumps_version,
+)
 from utils.db_session import get_db_session
 
 
+# Reads below are memoized in Redis under this prefix (keyed by method,
+# version and arguments); every product or stock write bumps the version
+PRODUCT_CACHE_PREFIX = "product_model"
+PRODUCT_CACHE_VERSION_NAME = "product_model"
+
+# Built once: the SQL compilation cache key is identical on every call and
+# only the bound sku changes (lookups by primary key use Session.get)
+_PRODUCT_BY_SKU = select(Product).where(Product.sku == bindparam("sku"))
+
+
+# Column order matches Product.to_dict()
+_PRODUCT_KEYS = (
+    "product_id",
+    "sku",
+    "name",
+    "category",
+    "variation",
+    "cost_price",
+    "price",
+    "stock",
+    "description",
+    "created_at",
+)
+_PRODUCT_CREATED_AT = _PRODUCT_KEYS.index("created_at")
+
+
 class ProductModel:
     """
     Data access layer for product operations.
@@ -18,6 +50,11 @@ class ProductModel:
     """
 
     @staticmethod
+    @cached_result(
+        ttl_policy='short_lived',
+        key_prefix=f"{PRODUCT_CACHE_PREFIX}:get_all_products",
+        version_name=PRODUCT_CACHE_VERSION_NAME,
+    )
     def get_all_products(
         limit: Optional[int] = None, offset: int = 0
     ) -> List[Dict[str, Any]]:
@@ -37,15 +74,32 @@ class ProductModel:
             Exception: Database operation errors.
         """
         with get_db_session() as session:
-            query = session.query(Product).order_by(Product.created_at.desc())
+            # Select the named columns only: plain row tuples, no ORM
+            # instances or identity-map bookkeeping per product
+            query = (
+                session.query(*(getattr(Product, key) for key in _PRODUCT_KEYS))
+                .order_by(Product.created_at.desc())
+            )
 
             if limit:
                 query = query.limit(limit).offset(offset)
 
             products = query.all()
-            return [product.to_dict() for product in products]
+            if not products:
+                return []
+
+            columns = list(zip(*products))
+            columns[_PRODUCT_CREATED_AT] = [
+                d.isoformat() if d else None for d in columns[_PRODUCT_CREATED_AT]
+            ]
+            return [dict(zip(_PRODUCT_KEYS, row)) for row in zip(*columns)]
 
     @staticmethod
+    @cached_result(
+        ttl_policy='short_lived',
+        key_prefix=f"{PRODUCT_CACHE_PREFIX}:get_product_by_sku",
+        version_name=PRODUCT_CACHE_VERSION_NAME,
+    )
     def get_product_by_sku(sku: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve a single product by SKU.
@@ -60,10 +114,15 @@ class ProductModel:
             Exception: Database operation errors.
         """
         with get_db_session() as session:
-            product = session.query(Product).filter(Product.sku == sku).first()
+            product = session.execute(_PRODUCT_BY_SKU, {"sku": sku}).scalar_one_or_none()
             return product.to_dict() if product else None
 
     @staticmethod
+    @cached_result(
+        ttl_policy='short_lived',
+        key_prefix=f"{PRODUCT_CACHE_PREFIX}:get_product_by_id",
+        version_name=PRODUCT_CACHE_VERSION_NAME,
+    )
     def get_product_by_id(product_id: int) -> Optional[Dict[str, Any]]:
         """
         Retrieve a single product by ID.
@@ -78,12 +137,11 @@ class ProductModel:
             Exception: Database operation errors.
         """
         with get_db_session() as session:
-            product = (
-                session.query(Product).filter(Product.product_id == product_id).first()
-            )
+            product = session.get(Product, product_id)
             return product.to_dict() if product else None
 
     @staticmethod
+    @bumps_version(PRODUCT_CACHE_VERSION_NAME)
     def create_product(
         name: str,
         category: str,
@@ -130,6 +188,7 @@ class ProductModel:
             return result
 
     @staticmethod
+    @bumps_version(PRODUCT_CACHE_VERSION_NAME)
     def update_product(
         sku: str,
         name: str,
@@ -162,7 +221,7 @@ class ProductModel:
             Exception: Database operation errors.
         """
         with get_db_session() as session:
-            product = session.query(Product).filter(Product.sku == sku).first()
+            product = session.execute(_PRODUCT_BY_SKU, {"sku": sku}).scalar_one_or_none()
 
             if not product:
                 return None
@@ -181,9 +240,14 @@ class ProductModel:
 
             session.flush()
             result = product.to_dict()
-            return result
+
+        if new_sku and new_sku != sku:
+            # The old SKU no longer maps to this product_id anywhere
+            get_cache_service().bump_version(PRODUCTS_VERSION_NAME)
+        return result
 
     @staticmethod
+    @bumps_version(PRODUCT_CACHE_VERSION_NAME)
     def delete_product(sku: str) -> Optional[Dict[str, Any]]:
         """
         Delete a product by SKU.
@@ -198,16 +262,24 @@ class ProductModel:
             Exception: Database operation errors.
         """
         with get_db_session() as session:
-            product = session.query(Product).filter(Product.sku == sku).first()
+            product = session.execute(_PRODUCT_BY_SKU, {"sku": sku}).scalar_one_or_none()
 
             if not product:
                 return None
 
             result = product.to_dict()
             session.delete(product)
-            return result
+
+        # Drop cached SKU -> product_id mappings (ml_engine.resolve_product_id)
+        get_cache_service().bump_version(PRODUCTS_VERSION_NAME)
+        return result
 
     @staticmethod
+    @cached_result(
+        ttl_policy='short_lived',
+        key_prefix=f"{PRODUCT_CACHE_PREFIX}:get_low_stock_items",
+        version_name=PRODUCT_CACHE_VERSION_NAME,
+    )
     def get_low_stock_items(threshold: int = 5) -> List[Dict[str, Any]]:
         """
         Retrieve products with stock below a threshold.
@@ -231,6 +303,40 @@ class ProductModel:
             return [product.to_dict() for product in products]
 
     @staticmethod
+    @cached_result(
+        ttl_policy='short_lived',
+        key_prefix=f"{PRODUCT_CACHE_PREFIX}:get_low_stock_count",
+        version_name=PRODUCT_CACHE_VERSION_NAME,
+    )
+    def get_low_stock_count(threshold: int = 5) -> int:
+        """
+        Count products with stock below a threshold.
+
+        Aggregates in PostgreSQL so only a single scalar crosses the wire.
+
+        Args:
+            threshold: Stock level threshold. Defaults to 5.
+
+        Returns:
+            Number of low-stock products.
+
+        Raises:
+            Exception: Database operation errors.
+        """
+        with get_db_session() as session:
+            count = (
+                session.query(func.count(Product.product_id))
+                .filter(Product.stock <= threshold)
+                .scalar()
+            )
+            return count or 0
+
+    @staticmethod
+    @cached_result(
+        ttl_policy='short_lived',
+        key_prefix=f"{PRODUCT_CACHE_PREFIX}:get_product_count",
+        version_name=PRODUCT_CACHE_VERSION_NAME,
+    )
     def get_product_count() -> int:
         """
         Get total count of products in the inventory.
@@ -246,6 +352,7 @@ class ProductModel:
             return count or 0
 
     @staticmethod
+    @bumps_version(PRODUCT_CACHE_VERSION_NAME)
     def update_product_stock(product_id: int, quantity_change: int) -> Optional[Dict[str, Any]]:
         """
         Update product stock by a quantity delta.
@@ -263,9 +370,7 @@ class ProductModel:
             Exception: Database operation errors.
         """
         with get_db_session() as session:
-            product = (
-                session.query(Product).filter(Product.product_id == product_id).first()
-            )
+            product = session.get(Product, product_id)
 
             if not product:
                 return None
@@ -275,6 +380,11 @@ class ProductModel:
             return product.to_dict()
 
     @staticmethod
+    @cached_result(
+        ttl_policy='short_lived',
+        key_prefix=f"{PRODUCT_CACHE_PREFIX}:get_total_inventory_value",
+        version_name=PRODUCT_CACHE_VERSION_NAME,
+    )
     def get_total_inventory_value() -> float:
         """
         Calculate total monetary value of all inventory.
@@ -292,6 +402,11 @@ class ProductModel:
             return float(result) if result else 0.0
 
     @staticmethod
+    @cached_result(
+        ttl_policy='short_lived',
+        key_prefix=f"{PRODUCT_CACHE_PREFIX}:get_products_by_category",
+        version_name=PRODUCT_CACHE_VERSION_NAME,
+    )
     def get_products_by_category(category: str, limit: int = 100) -> List[Dict[str, Any]]:
         """
         Retrieve products filtered by category.
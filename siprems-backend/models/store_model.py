@@ -1,15 +1,32 @@
 """Store data access layer using SQLAlchemy ORM."""
 
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from typing import List, Optional, Dict, Any, Tuple
 
+from sqlalchemy import bindparam, func, select
 from sqlalchemy.orm import Session
 
 from models.orm.store import Store
-from models.orm.opening_hours import OpeningHours
+from models.orm.opening_hours import (
+    DAYS_OF_WEEK,
+    OpeningHours,
+    day_index,
+    hhmm_from_minutes,
+    minutes_from_hhmm,
+)
 from utils.db_session import get_db_session
 
 
+# Built once: the SQL compilation cache key is identical on every call and
+# only the bound values change (lookups by primary key use Session.get)
+_STORE_BY_USER = select(Store).where(Store.user_id == bindparam("user_id")).limit(1)
+_HOURS_BY_STORE = select(OpeningHours).where(
+    OpeningHours.store_id == bindparam("store_id")
+)
+_HOURS_BY_STORE_DAY = _HOURS_BY_STORE.where(
+    OpeningHours.day_of_week == bindparam("day_of_week")
+)
+
+
 class StoreModel:
     """
     Data access layer for store operations.
@@ -60,7 +77,7 @@ class StoreModel:
             Exception: Database operation errors.
         """
         with get_db_session() as session:
-            store = session.query(Store).filter(Store.store_id == store_id).first()
+            store = session.get(Store, store_id)
             return store.to_dict() if store else None
 
     @staticmethod
@@ -78,7 +95,7 @@ class StoreModel:
             Exception: Database operation errors.
         """
         with get_db_session() as session:
-            store = session.query(Store).filter(Store.user_id == user_id).first()
+            store = session.execute(_STORE_BY_USER, {"user_id": user_id}).scalars().first()
             return store.to_dict() if store else None
 
     @staticmethod
@@ -98,7 +115,7 @@ class StoreModel:
             Exception: Database operation errors.
         """
         with get_db_session() as session:
-            store = session.query(Store).filter(Store.store_id == store_id).first()
+            store = session.get(Store, store_id)
 
             if not store:
                 return None
@@ -108,7 +125,7 @@ class StoreModel:
             if address is not None:
                 store.address = address
             
-            store.updated_at = datetime.utcnow()
+            store.updated_at = func.now()
             session.flush()
             result = store.to_dict()
             return result
@@ -128,7 +145,7 @@ class StoreModel:
             Exception: Database operation errors.
         """
         with get_db_session() as session:
-            store = session.query(Store).filter(Store.store_id == store_id).first()
+            store = session.get(Store, store_id)
 
             if not store:
                 return False
@@ -136,6 +153,67 @@ class StoreModel:
             session.delete(store)
             return True
 
+    @staticmethod
+    def parse_opening_hours(opening_hours: Dict[str, Dict[str, Any]]) -> List[Tuple[int, Optional[int], Optional[int], bool]]:
+        """
+        Validate an opening hours payload and convert it to stored values.
+
+        Args:
+            opening_hours: Dictionary mapping day names to hour data
+                          Format: {"Monday": {"open": "09:00", "close": "18:00", "closed": false}}
+
+        Returns:
+            List of (day_of_week, open_minutes, close_minutes, is_closed) tuples.
+
+        Raises:
+            ValueError: If the payload, a day or a time is not valid.
+        """
+        if not isinstance(opening_hours, dict):
+            raise ValueError("Opening hours must be an object keyed by day name")
+
+        rows = []
+        for day, hours_data in opening_hours.items():
+            if not isinstance(hours_data, dict):
+                raise ValueError(f"Opening hours for {day!r} must be an object")
+            is_closed = bool(hours_data.get("closed", False))
+            rows.append((
+                day_index(day),
+                None if is_closed else minutes_from_hhmm(hours_data.get("open", "00:00")),
+                None if is_closed else minutes_from_hhmm(hours_data.get("close", "00:00")),
+                is_closed,
+            ))
+        return rows
+
+    @staticmethod
+    def _upsert_opening_hours(
+        session: Session,
+        store_id: int,
+        day_of_week: int,
+        open_minutes: Optional[int],
+        close_minutes: Optional[int],
+        is_closed: bool,
+    ) -> OpeningHours:
+        """Insert or update one day's row in the given session."""
+        existing = session.execute(
+            _HOURS_BY_STORE_DAY, {"store_id": store_id, "day_of_week": day_of_week}
+        ).scalars().first()
+
+        if existing:
+            existing.open_time = open_minutes
+            existing.close_time = close_minutes
+            existing.is_closed = is_closed
+            return existing
+
+        hours = OpeningHours(
+            store_id=store_id,
+            day_of_week=day_of_week,
+            open_time=open_minutes,
+            close_time=close_minutes,
+            is_closed=is_closed,
+        )
+        session.add(hours)
+        return hours
+
     @staticmethod
     def set_opening_hours(store_id: int, day: str, open_time: str, close_time: str, is_closed: bool = False) -> Dict[str, Any]:
         """
@@ -152,34 +230,66 @@ class StoreModel:
             Created or updated opening hours dictionary.
 
         Raises:
+            ValueError: If day or a time is not valid.
             Exception: Database operation errors.
         """
+        ((day_of_week, open_minutes, close_minutes, is_closed),) = StoreModel.parse_opening_hours(
+            {day: {"open": open_time, "close": close_time, "closed": is_closed}}
+        )
+
         with get_db_session() as session:
-            existing = session.query(OpeningHours).filter(
-                OpeningHours.store_id == store_id,
-                OpeningHours.day_of_week == day
-            ).first()
-
-            if existing:
-                existing.open_time = open_time if not is_closed else None
-                existing.close_time = close_time if not is_closed else None
-                existing.is_closed = is_closed
-                existing.updated_at = datetime.utcnow()
-                session.flush()
-                result = existing.to_dict()
-            else:
-                hours = OpeningHours(
-                    store_id=store_id,
-                    day_of_week=day,
-                    open_time=open_time if not is_closed else None,
-                    close_time=close_time if not is_closed else None,
-                    is_closed=is_closed,
-                )
-                session.add(hours)
-                session.flush()
-                result = hours.to_dict()
+            hours = StoreModel._upsert_opening_hours(
+                session, store_id, day_of_week, open_minutes, close_minutes, is_closed
+            )
+            session.flush()
+            return hours.to_dict()
 
-            return result
+    @staticmethod
+    def save_settings(
+        store_id: int,
+        name: Optional[str] = None,
+        address: Optional[str] = None,
+        opening_hours: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Update store info and opening hours in a single transaction.
+
+        The whole opening hours payload is validated before anything is
+        written, so a bad day or time leaves the store untouched.
+
+        Args:
+            store_id: Store ID.
+            name: Updated store name (optional).
+            address: Updated store address (optional).
+            opening_hours: Opening hours dictionary (optional).
+
+        Returns:
+            Updated store dictionary or None if not found.
+
+        Raises:
+            ValueError: If the opening hours payload is not valid.
+            Exception: Database operation errors.
+        """
+        rows = StoreModel.parse_opening_hours(opening_hours) if opening_hours else []
+
+        with get_db_session() as session:
+            store = session.get(Store, store_id)
+
+            if not store:
+                return None
+
+            if name is not None or address is not None:
+                if name is not None:
+                    store.name = name
+                if address is not None:
+                    store.address = address
+                store.updated_at = func.now()
+
+            for row in rows:
+                StoreModel._upsert_opening_hours(session, store_id, *row)
+
+            session.flush()
+            return store.to_dict()
 
     @staticmethod
     def get_opening_hours(store_id: int) -> Dict[str, Dict[str, Any]]:
@@ -196,15 +306,15 @@ class StoreModel:
             Exception: Database operation errors.
         """
         with get_db_session() as session:
-            hours = session.query(OpeningHours).filter(
-                OpeningHours.store_id == store_id
-            ).all()
+            hours = session.execute(
+                _HOURS_BY_STORE, {"store_id": store_id}
+            ).scalars().all()
 
             result = {}
             for hour in hours:
-                result[hour.day_of_week] = {
-                    "open": hour.open_time,
-                    "close": hour.close_time,
+                result[DAYS_OF_WEEK[hour.day_of_week]] = {
+                    "open": hhmm_from_minutes(hour.open_time),
+                    "close": hhmm_from_minutes(hour.close_time),
                     "closed": hour.is_closed,
                 }
 
@@ -223,12 +333,13 @@ class StoreModel:
             Opening hours dictionary or None if not found.
 
         Raises:
+            ValueError: If day is not a valid day name.
             Exception: Database operation errors.
         """
+        day_of_week = day_index(day)
         with get_db_session() as session:
-            hour = session.query(OpeningHours).filter(
-                OpeningHours.store_id == store_id,
-                OpeningHours.day_of_week == day
-            ).first()
+            hour = session.execute(
+                _HOURS_BY_STORE_DAY, {"store_id": store_id, "day_of_week": day_of_week}
+            ).scalars().first()
 
             return hour.to_dict() if hour else None
@@ -1,16 +1,35 @@
 """Transaction data access layer using SQLAlchemy ORM."""
 
 from datetime import datetime, timezone
-from typing import List, Optional, Dict, Any
+from typing import Iterator, List, Optional, Dict, Any
 
-from sqlalchemy import func, and_, text
+from psycopg2.extras import execute_values
+from sqlalchemy import func, and_, select, text
 from sqlalchemy.orm import Session
 
 from models.orm.transaction import Transaction
 from models.orm.product import Product
+from models.product_model import PRODUCT_CACHE_VERSION_NAME
+from utils.cache_service import bumps_version
 from utils.db_session import get_db_session
 
 
+_TRANSACTION_LIST_KEYS = (
+    "transaction_id",
+    "transaction_date",
+    "product_name",
+    "sku",
+    "quantity_sold",
+    "price_per_unit",
+    "is_promo",
+)
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    """ISO-format a datetime, passing None through."""
+    return value.isoformat() if value else None
+
+
 class TransactionModel:
     """
     Data access layer for transaction operations.
@@ -54,18 +73,88 @@ class TransactionModel:
                 .all()
             )
 
-            return [
-                {
-                    "transaction_id": t[0],
-                    "transaction_date": t[1].isoformat() if t[1] else None,
-                    "product_name": t[2],
-                    "sku": t[3],
-                    "quantity_sold": t[4],
-                    "price_per_unit": t[5],
-                    "is_promo": t[6],
-                }
-                for t in transactions
-            ]
+            if not transactions:
+                return []
+
+            # Work column-wise: format the date column in one pass, then
+            # zip rows back together instead of indexing every tuple
+            columns = list(zip(*transactions))
+            columns[1] = [_isoformat(d) for d in columns[1]]
+            return [dict(zip(_TRANSACTION_LIST_KEYS, row)) for row in zip(*columns)]
+
+    @staticmethod
+    def get_all_transactions_json(limit: int = 100, offset: int = 0) -> str:
+        """
+        Retrieve recent transactions as a ready-to-send JSON array string.
+
+        PostgreSQL builds the JSON with json_agg/row_to_json (timestamps come
+        out ISO 8601), so no per-row Python objects are created and the
+        response does not need to be re-encoded.
+
+        Args:
+            limit: Maximum number of transactions to return. Defaults to 100.
+            offset: Number of transactions to skip (for pagination).
+
+        Returns:
+            JSON array text with the same keys as get_all_transactions.
+
+        Raises:
+            Exception: Database operation errors.
+        """
+        query = text("""
+            SELECT COALESCE(json_agg(row_to_json(x)), '[]'::json)::text
+            FROM (
+                SELECT t.transaction_id, t.transaction_date,
+                       p.name AS product_name, p.sku,
+                       t.quantity_sold, t.price_per_unit, t.is_promo
+                FROM transactions t
+                JOIN products p ON p.product_id = t.product_id
+                ORDER BY t.transaction_date DESC
+                LIMIT :limit OFFSET :offset
+            ) x
+        """)
+
+        with get_db_session() as session:
+            return session.execute(query, {"limit": limit, "offset": offset}).scalar()
+
+    @staticmethod
+    def iter_transactions(batch_size: int = 2000) -> Iterator[Dict[str, Any]]:
+        """
+        Stream every transaction, newest first, with product details.
+
+        Uses a server-side (named) cursor via stream_results, fetching
+        batch_size rows per round trip, so memory stays flat for exports of
+        any size. The session is held open until the iterator is exhausted.
+
+        Args:
+            batch_size: Rows fetched from PostgreSQL at a time. Defaults to 2000.
+
+        Yields:
+            Transaction dictionaries with the keys of get_all_transactions.
+
+        Raises:
+            Exception: Database operation errors.
+        """
+        with get_db_session() as session:
+            rows = session.execute(
+                select(
+                    Transaction.transaction_id,
+                    Transaction.transaction_date,
+                    Product.name.label("product_name"),
+                    Product.sku,
+                    Transaction.quantity_sold,
+                    Transaction.price_per_unit,
+                    Transaction.is_promo,
+                )
+                .join(Product, Transaction.product_id == Product.product_id)
+                .order_by(Transaction.transaction_date.desc())
+                .execution_options(stream_results=True, yield_per=batch_size)
+            )
+            for partition in rows.partitions():
+                for row in partition:
+                    result = dict(zip(_TRANSACTION_LIST_KEYS, row))
+                    result["transaction_date"] = _isoformat(result["transaction_date"])
+                    yield result
 
     @staticmethod
     def get_transaction_by_id(transaction_id: int) -> Optional[Dict[str, Any]]:
@@ -143,6 +232,208 @@ class TransactionModel:
             session.flush()
             return transaction.to_dict()
 
+    @staticmethod
+    @bumps_version(PRODUCT_CACHE_VERSION_NAME)
+    def record_sale(
+        sku: str, quantity_sold: int, is_promo: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Record a sale and decrement stock in a single SQL statement.
+
+        One data-modifying CTE resolves the SKU, decrements stock (only if
+        enough is available) and inserts the transaction, so the common
+        path is a single round trip and stock can never go negative.
+
+        Args:
+            sku: Stock Keeping Unit of the product sold.
+            quantity_sold: Quantity of product in transaction.
+            is_promo: Whether this is a promotional transaction. Defaults to False.
+
+        Returns:
+            Created transaction dictionary with product_name and product_sku,
+            or None if the product does not exist.
+
+        Raises:
+            ValueError: If the product does not have enough stock.
+            Exception: Database operation errors.
+        """
+        query = text("""
+            WITH p AS (
+                UPDATE products
+                SET stock = stock - :qty
+                WHERE sku = :sku AND stock >= :qty
+                RETURNING product_id, name, sku, price
+            ),
+            ins AS (
+                INSERT INTO transactions
+                    (product_id, quantity_sold, price_per_unit, is_promo, transaction_date)
+                SELECT product_id, :qty, price, :is_promo, :now FROM p
+                RETURNING transaction_id, product_id, quantity_sold,
+                          price_per_unit, is_promo, transaction_date
+            )
+            SELECT ins.*, p.name AS product_name, p.sku AS product_sku
+            FROM ins JOIN p ON p.product_id = ins.product_id
+        """)
+
+        with get_db_session() as session:
+            row = session.execute(query, {
+                "sku": sku,
+                "qty": quantity_sold,
+                "is_promo": is_promo,
+                "now": datetime.now(timezone.utc),
+            }).mappings().first()
+
+            if row is None:
+                # Nothing written: tell "unknown SKU" apart from "not enough stock"
+                stock = session.query(Product.stock).filter(Product.sku == sku).scalar()
+                if stock is None:
+                    return None
+                raise ValueError(
+                    f"Insufficient stock. Available: {stock}, Requested: {quantity_sold}"
+                )
+
+            result = dict(row)
+            result["transaction_date"] = (
+                row["transaction_date"].isoformat() if row["transaction_date"] else None
+            )
+            return result
+
+    @staticmethod
+    @bumps_version(PRODUCT_CACHE_VERSION_NAME)
+    def record_sales_bulk(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Record several sales (e.g. a checkout cart) in one atomic statement.
+
+        The cart is sent as a single multi-row VALUES list via
+        psycopg2.extras.execute_values; one data-modifying CTE decrements
+        stock for every SKU (only where enough is available) and inserts
+        all transaction rows. If any SKU is unknown or short on stock the
+        whole cart is rolled back.
+
+        Args:
+            items: Dicts with 'sku', 'quantity' and optional 'is_promo'.
+
+        Returns:
+            Created transaction dictionaries with product_name and
+            product_sku, in cart order.
+
+        Raises:
+            ValueError: If a product does not exist or lacks stock.
+            Exception: Database operation errors.
+        """
+        if not items:
+            return []
+
+        rows = [
+            (i, item["sku"], int(item["quantity"]), bool(item.get("is_promo", False)))
+            for i, item in enumerate(items)
+        ]
+        query = """
+            WITH cart (line, sku, qty, is_promo) AS (VALUES %s),
+            wanted AS (
+                SELECT sku, SUM(qty) AS qty FROM cart GROUP BY sku
+            ),
+            p AS (
+                UPDATE products
+                SET stock = products.stock - wanted.qty
+                FROM wanted
+                WHERE products.sku = wanted.sku AND products.stock >= wanted.qty
+                RETURNING products.product_id, products.name, products.sku, products.price
+            ),
+            ins AS (
+                INSERT INTO transactions
+                    (product_id, quantity_sold, price_per_unit, is_promo, transaction_date)
+                SELECT p.product_id, cart.qty, p.price, cart.is_promo, now()
+                FROM cart JOIN p ON p.sku = cart.sku
+                ORDER BY cart.line
+                RETURNING transaction_id, product_id, quantity_sold,
+                          price_per_unit, is_promo, transaction_date
+            )
+            SELECT ins.*, p.name AS product_name, p.sku AS product_sku
+            FROM ins JOIN p ON p.product_id = ins.product_id
+            ORDER BY ins.transaction_id
+        """
+        template = "(%s::int, %s::varchar, %s::int, %s::boolean)"
+        wanted = {}
+        for _, sku, qty, _ in rows:
+            wanted[sku] = wanted.get(sku, 0) + qty
+
+        with get_db_session() as session:
+            cursor = session.connection().connection.cursor()
+            try:
+                created = execute_values(
+                    cursor,
+                    query,
+                    rows,
+                    template=template,
+                    page_size=len(rows),
+                    fetch=True,
+                )
+                columns = [col[0] for col in cursor.description]
+            finally:
+                cursor.close()
+
+            if len(created) != len(rows):
+                # Something was short: undo the partial cart and explain why
+                session.rollback()
+                stocks = dict(
+                    session.query(Product.sku, Product.stock)
+                    .filter(Product.sku.in_(list(wanted)))
+                    .all()
+                )
+                for sku, qty in wanted.items():
+                    if sku not in stocks:
+                        raise ValueError(f"Product with SKU {sku} not found")
+                    if stocks[sku] < qty:
+                        raise ValueError(
+                            f"Insufficient stock for {sku}. "
+                            f"Available: {stocks[sku]}, Requested: {qty}"
+                        )
+                raise ValueError("Checkout could not be completed")
+
+            results = [dict(zip(columns, row)) for row in created]
+            for result in results:
+                result["transaction_date"] = _isoformat(result["transaction_date"])
+            return results
+
+    @staticmethod
+    def get_last_transaction_dates(skus: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Get the latest transaction timestamp for each SKU.
+
+        Uses one LATERAL index probe per product on (product_id,
+        transaction_date), so it stays cheap enough to run before every
+        prediction cache lookup.
+
+        Args:
+            skus: Product Stock Keeping Units.
+
+        Returns:
+            Dictionary of SKU to ISO timestamp (None if never sold). Unknown
+            SKUs are omitted.
+
+        Raises:
+            Exception: Database operation errors.
+        """
+        if not skus:
+            return {}
+
+        query = text("""
+            SELECT p.sku, last.transaction_date
+            FROM products p
+            LEFT JOIN LATERAL (
+                SELECT transaction_date FROM transactions t
+                WHERE t.product_id = p.product_id
+                ORDER BY transaction_date DESC
+                LIMIT 1
+            ) last ON TRUE
+            WHERE p.sku = ANY(:skus)
+        """)
+
+        with get_db_session() as session:
+            rows = session.execute(query, {"skus": list(skus)}).all()
+            return {sku: _isoformat(last) for sku, last in rows}
+
     @staticmethod
     def get_daily_transaction_count() -> int:
         """
@@ -155,10 +446,14 @@ class TransactionModel:
             Exception: Database operation errors.
         """
         with get_db_session() as session:
+            # Half-open range on the raw column so indexes and partition
+            # pruning apply (DATE(transaction_date) would defeat both)
             count = (
                 session.query(func.count(Transaction.transaction_id))
                 .filter(
-                    func.date(Transaction.transaction_date) == func.current_date()
+                    Transaction.transaction_date >= func.current_date(),
+                    Transaction.transaction_date
+                    < func.current_date() + text("INTERVAL '1 day'"),
                 )
                 .scalar()
             )
@@ -240,6 +535,94 @@ class TransactionModel:
                 for product in products
             ]
 
+    @staticmethod
+    def get_dashboard_summary(
+        days: int = 7, limit: int = 5, low_stock_threshold: int = 5
+    ) -> Dict[str, Any]:
+        """
+        Get every dashboard figure in a single round trip.
+
+        The cards (today's transaction count, product count, low-stock
+        count), the sales trend and the lowest-stock comparison are computed
+        as CTEs and aggregated into one JSON object by PostgreSQL. The trend
+        is zero-filled with generate_series so days without sales still show.
+
+        Args:
+            days: Number of days in the sales trend. Defaults to 7.
+            limit: Number of products in the stock comparison. Defaults to 5.
+            low_stock_threshold: Stock level counted as low. Defaults to 5.
+
+        Returns:
+            Dictionary with daily_transactions, active_products,
+            low_stock_items, sales_trend and stock_comparison.
+
+        Raises:
+            Exception: Database operation errors.
+        """
+        query = text("""
+            WITH cards AS (
+                SELECT
+                    (SELECT COUNT(*) FROM transactions
+                     WHERE transaction_date >= CURRENT_DATE
+                       AND transaction_date < CURRENT_DATE + INTERVAL '1 day'
+                    ) AS daily_transactions,
+                    COUNT(*) AS active_products,
+                    COUNT(*) FILTER (WHERE stock <= :threshold) AS low_stock_items
+                FROM products
+            ),
+            daily AS (
+                SELECT DATE(transaction_date) AS day, SUM(quantity_sold) AS sales
+                FROM transactions
+                WHERE transaction_date >= CURRENT_DATE - (:days - 1) * INTERVAL '1 day'
+                  AND transaction_date < CURRENT_DATE + INTERVAL '1 day'
+                GROUP BY DATE(transaction_date)
+            ),
+            trend AS (
+                SELECT g.day::date AS day, COALESCE(daily.sales, 0) AS sales
+                FROM generate_series(
+                    CURRENT_DATE - (:days - 1) * INTERVAL '1 day',
+                    CURRENT_DATE,
+                    INTERVAL '1 day'
+                ) AS g(day)
+                LEFT JOIN daily ON daily.day = g.day::date
+            ),
+            stock AS (
+                SELECT name, stock FROM products
+                ORDER BY stock ASC
+                LIMIT :limit
+            )
+            SELECT json_build_object(
+                'daily_transactions', cards.daily_transactions,
+                'active_products', cards.active_products,
+                'low_stock_items', cards.low_stock_items,
+                'sales_trend', COALESCE((
+                    SELECT json_agg(
+                        json_build_object('date', to_char(day, 'Dy'), 'sales', sales)
+                        ORDER BY day
+                    )
+                    FROM trend
+                ), '[]'::json),
+                'stock_comparison', COALESCE((
+                    SELECT json_agg(
+                        json_build_object(
+                            'product', name,
+                            'current', stock,
+                            'optimal', GREATEST(stock + 20, 40)
+                        )
+                        ORDER BY stock
+                    )
+                    FROM stock
+                ), '[]'::json)
+            ) AS stats
+            FROM cards
+        """)
+
+        with get_db_session() as session:
+            return session.execute(
+                query,
+                {"days": days, "limit": limit, "threshold": low_stock_threshold},
+            ).scalar()
+
     @staticmethod
     def get_transactions_by_product_sku(sku: str, limit: int = 100) -> List[Dict[str, Any]]:
         """
@@ -1,11 +1,10 @@
 """User data access layer using SQLAlchemy ORM."""
 
-from datetime import datetime
 from typing import Optional, Dict, Any
 
 from sqlalchemy.orm import Session
 
-from models.orm.user import User
+from models.orm.user import User, fetch_user_auth, update_user_columns
 from utils.db_session import get_db_session
 
 
@@ -62,14 +61,7 @@ class UserModel:
             Exception: Database operation errors.
         """
         with get_db_session() as session:
-            user = session.query(User).filter(User.email == email).first()
-
-            if not user:
-                return None
-
-            user_dict = user.to_dict()
-            user_dict["password_hash"] = user.password_hash
-            return user_dict
+            return fetch_user_auth(session, email)
 
     @staticmethod
     def get_user_by_id(user_id: int) -> Optional[Dict[str, Any]]:
@@ -88,7 +80,7 @@ class UserModel:
             Exception: Database operation errors.
         """
         with get_db_session() as session:
-            user = session.query(User).filter(User.user_id == user_id).first()
+            user = session.get(User, user_id)
             return user.to_dict() if user else None
 
     @staticmethod
@@ -123,11 +115,7 @@ class UserModel:
             Exception: Database operation errors.
         """
         with get_db_session() as session:
-            user = session.query(User).filter(User.user_id == user_id).first()
-
-            if user:
-                user.updated_at = datetime.utcnow()
-                session.flush()
+            update_user_columns(session, user_id)
 
     @staticmethod
     def update_user_password(user_id: int, password_hash: str) -> None:
@@ -145,12 +133,7 @@ class UserModel:
             Exception: Database operation errors.
         """
         with get_db_session() as session:
-            user = session.query(User).filter(User.user_id == user_id).first()
-
-            if user:
-                user.password_hash = password_hash
-                user.updated_at = datetime.utcnow()
-                session.flush()
+            update_user_columns(session, user_id, password_hash=password_hash)
 
     @staticmethod
     def deactivate_user(user_id: int) -> None:
@@ -169,12 +152,7 @@ class UserModel:
             Exception: Database operation errors.
         """
         with get_db_session() as session:
-            user = session.query(User).filter(User.user_id == user_id).first()
-
-            if user:
-                user.is_active = False
-                user.updated_at = datetime.utcnow()
-                session.flush()
+            update_user_columns(session, user_id, is_active=False)
 
     @staticmethod
     def activate_user(user_id: int) -> None:
@@ -193,9 +171,4 @@ class UserModel:
             Exception: Database operation errors.
         """
         with get_db_session() as session:
-            user = session.query(User).filter(User.user_id == user_id).first()
-
-            if user:
-                user.is_active = True
-                user.updated_at = datetime.utcnow()
-                session.flush()
+            update_user_columns(session, user_id, is_active=True)
@@ -5,6 +5,8 @@ import uuid
 
 chat_bp = Blueprint('chat', __name__)
 
+MISSING_USER_ERROR = {'error': 'Token does not identify a user'}
+
 @chat_bp.route('', methods=['POST'])
 @require_auth
 @track_http_request()
@@ -18,9 +20,14 @@ def chat_with_ai():
         }), 503
 
     try:
+        # Scope history to the authenticated user only, so one user can
+        # never read or write another user's sessions
+        user_id = getattr(request, 'user_id', None)
+        if user_id is None:
+            return jsonify(MISSING_USER_ERROR), 401
+
         data = request.get_json()
         message = data.get('message', '').strip()
-        user_id = data.get('user_id')  # Optional: from request
         session_id = data.get('session_id')  # Optional: from request
 
         if not message:
@@ -55,7 +62,9 @@ def chat_with_ai():
 def get_chat_history(session_id):
     """Get conversation history for a session"""
     try:
-        user_id = request.args.get('user_id')
+        user_id = getattr(request, 'user_id', None)
+        if user_id is None:
+            return jsonify(MISSING_USER_ERROR), 401
         chat_service = current_app.chat_service
 
         history = chat_service.get_conversation_history(user_id, session_id)
@@ -74,7 +83,9 @@ def get_chat_history(session_id):
 def clear_chat_session(session_id):
     """Clear conversation history for a session"""
     try:
-        user_id = request.args.get('user_id')
+        user_id = getattr(request, 'user_id', None)
+        if user_id is None:
+            return jsonify(MISSING_USER_ERROR), 401
         chat_service = current_app.chat_service
 
         success = chat_service.clear_session(user_id, session_id)
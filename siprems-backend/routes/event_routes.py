@@ -1,20 +1,61 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from services.event_service import EventService
 from utils.jwt_handler import require_auth
 from utils.validators import EventSchema, validate_request_data
+from utils.cache_service import get_cache_service, generate_cache_key
+from utils.http_cache import microcache, invalidate_microcache, etag_response
+from ml_engine import HOLIDAYS_VERSION_NAME
 
 event_bp = Blueprint('events', __name__)
 
 @event_bp.route('', methods=['GET'])
 @require_auth
+@microcache(ttl=15)
 def get_events():
-    """Get all events"""
+    """Get all events with caching"""
     try:
+        # Try to get from cache
+        cache_service = get_cache_service()
+        cache_key = generate_cache_key(prefix='event_list')
+
+        cached_result = cache_service.get(cache_key)
+        if cached_result is not None:
+            return jsonify(cached_result), 200
+
         events = EventService.get_all_events()
+
+        # Cache the result; event writes invalidate it
+        cache_service.set(cache_key, events, ttl=cache_service.TTL_POLICIES.get('event_list', 7200))
+
         return jsonify(events), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@event_bp.route('/holidays', methods=['GET'])
+@require_auth
+def get_holidays():
+    """Get holiday events; unchanged lists revalidate with a 304"""
+    try:
+        return etag_response(EventService.get_holidays_etag(), EventService.get_holidays)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@event_bp.route('/export', methods=['GET'])
+@require_auth
+def export_events():
+    """Stream every event as a JSON array"""
+    encoder = current_app.json
+
+    def generate():
+        # Rows arrive from a server-side cursor in batches and are written
+        # out as they come, so neither side builds the full list
+        yield '['
+        for i, event in enumerate(EventService.iter_all_events()):
+            yield (',' if i else '') + encoder.dumps(event)
+        yield ']'
+
+    return Response(stream_with_context(generate()), status=200, mimetype='application/json')
+
 @event_bp.route('', methods=['POST'])
 @require_auth
 def add_event():
@@ -26,6 +67,13 @@ def add_event():
             return jsonify({'error': 'Validation failed', 'details': errors}), 400
 
         event = EventService.create_event(validated_data)
+
+        # Invalidate cached events and holidays in every process
+        cache_service = get_cache_service()
+        cache_service.delete_pattern('event_list*')
+        cache_service.bump_version(HOLIDAYS_VERSION_NAME)
+        invalidate_microcache()
+
         return jsonify(event), 201
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
@@ -50,6 +98,13 @@ def delete_event(event_id):
     """Delete an event"""
     try:
         EventService.delete_event(event_id)
+
+        # Invalidate cached events and holidays in every process
+        cache_service = get_cache_service()
+        cache_service.delete_pattern('event_list*')
+        cache_service.bump_version(HOLIDAYS_VERSION_NAME)
+        invalidate_microcache()
+
         return jsonify({'message': 'Event deleted successfully'}), 200
     except ValueError as e:
         return jsonify({'error': str(e)}), 404
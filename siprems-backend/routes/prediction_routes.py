@@ -2,29 +2,68 @@ from flask import Blueprint, request, jsonify, current_app
 from utils.jwt_handler import require_auth
 from utils.cache_service import get_cache_service, generate_cache_key
 from utils.metrics_service import track_http_request
+from utils.db_session import without_request_session
 from tasks.ml_tasks import predict_stock_task
 from services.task_service import TaskService
+from models.transaction_model import TransactionModel
 
 prediction_bp = Blueprint('predictions', __name__)
 
+
+def _prediction_cache_key(sku, days, fast, last_sale):
+    """
+    Cache key for a prediction result.
+
+    Includes the SKU's latest transaction timestamp, so a new sale changes
+    the key and the stale forecast is simply never read again.
+    """
+    return generate_cache_key(sku, days=days, fast=fast, last=last_sale, prefix='prediction')
+
 @prediction_bp.route('', methods=['POST'])
 @require_auth
 @track_http_request()
+@without_request_session
 def predict_stock():
-    """Predict stock levels for a product (synchronous) with caching"""
+    """
+    Predict stock levels for a product with caching.
+
+    Runs synchronously by default. Clients that send `Prefer: respond-async`
+    get a cache hit immediately, or a 202 with a task_id to poll at
+    /api/predict/task/<task_id> while a Celery worker runs the forecast.
+    """
     try:
         data = request.get_json()
         product_sku = data.get('product_sku')
         forecast_days = int(data.get('days', 7))
+        fast = bool(data.get('fast', False))
+        respond_async = 'respond-async' in request.headers.get('Prefer', '')
 
         # Try to get from cache first
         cache_service = get_cache_service()
-        cache_key = generate_cache_key(product_sku, days=forecast_days, prefix='prediction')
+        last_sale = TransactionModel.get_last_transaction_dates([product_sku]).get(product_sku)
+        cache_key = _prediction_cache_key(product_sku, forecast_days, fast, last_sale)
 
         cached_result = cache_service.get(cache_key)
         if cached_result:
             return jsonify(cached_result), 200
 
+        if respond_async:
+            if not product_sku:
+                return jsonify({'error': 'Product SKU is required'}), 400
+            if forecast_days < 1 or forecast_days > 365:
+                return jsonify({'error': 'Days must be between 1 and 365'}), 400
+
+            # Free this worker: the forecast runs on a Celery worker instead,
+            # which fills the same cache key the sync path would have
+            task = predict_stock_task.delay(product_sku, forecast_days, fast, cache_key)
+            return jsonify({
+                'task_id': task.id,
+                'status': 'submitted',
+                'status_url': f'/api/predict/task/{task.id}',
+                'product_sku': product_sku,
+                'forecast_days': forecast_days
+            }), 202, {'Preference-Applied': 'respond-async'}
+
         # Not in cache, compute result
         prediction_service = current_app.prediction_service
         result = prediction_service.predict_stock(data)
@@ -39,6 +78,58 @@ def predict_stock():
         return jsonify({'error': str(e)}), 500
 
 
+@prediction_bp.route('/batch', methods=['POST'])
+@require_auth
+@track_http_request()
+@without_request_session
+def predict_stock_batch():
+    """Predict stock levels for several products in parallel (synchronous) with caching"""
+    try:
+        data = request.get_json() or {}
+        skus = data.get('skus')
+        forecast_days = int(data.get('days', 7))
+        fast = bool(data.get('fast', False))
+
+        if not isinstance(skus, list) or not skus:
+            return jsonify({'error': 'skus must be a non-empty list'}), 400
+        if len(skus) > 50:
+            return jsonify({'error': 'At most 50 SKUs per batch'}), 400
+        if forecast_days < 1 or forecast_days > 365:
+            return jsonify({'error': 'Days must be between 1 and 365'}), 400
+
+        # Serve what we can from cache, compute the rest together
+        cache_service = get_cache_service()
+        ttl = cache_service.TTL_POLICIES.get('prediction_result', 7200)
+        last_sales = TransactionModel.get_last_transaction_dates(list(dict.fromkeys(skus)))
+        results = {}
+        missing = []
+        for sku in dict.fromkeys(skus):
+            cached_result = cache_service.get(
+                _prediction_cache_key(sku, forecast_days, fast, last_sales.get(sku))
+            )
+            if cached_result:
+                results[sku] = cached_result
+            else:
+                missing.append(sku)
+
+        prediction_service = current_app.prediction_service
+        computed = prediction_service.predict_batch(missing, days=forecast_days, fast=fast)
+        for sku, result in computed.items():
+            if 'error' not in result:
+                cache_service.set(
+                    _prediction_cache_key(sku, forecast_days, fast, last_sales.get(sku)),
+                    result,
+                    ttl=ttl
+                )
+            results[sku] = result
+
+        return jsonify({'results': results}), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @prediction_bp.route('/async', methods=['POST'])
 @require_auth
 def predict_stock_async():
@@ -51,12 +142,16 @@ def predict_stock_async():
 
         product_sku = data['product_sku']
         forecast_days = int(data.get('days', 7))
+        fast = bool(data.get('fast', False))
 
         if forecast_days < 1 or forecast_days > 365:
             return jsonify({'error': 'Days must be between 1 and 365'}), 400
 
+        last_sale = TransactionModel.get_last_transaction_dates([product_sku]).get(product_sku)
+        cache_key = _prediction_cache_key(product_sku, forecast_days, fast, last_sale)
+
         # Submit async task
-        task = predict_stock_task.delay(product_sku, forecast_days)
+        task = predict_stock_task.delay(product_sku, forecast_days, fast, cache_key)
 
         return jsonify({
             'task_id': task.id,
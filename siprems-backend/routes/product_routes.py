@@ -4,11 +4,13 @@ from utils.jwt_handler import require_auth
 from utils.validators import ProductSchema, validate_request_data
 from utils.cache_service import get_cache_service, generate_cache_key
 from utils.metrics_service import track_http_request
+from utils.http_cache import microcache, invalidate_microcache
 
 product_bp = Blueprint('products', __name__)
 
 @product_bp.route('', methods=['GET'])
 @require_auth
+@microcache(ttl=10)
 @track_http_request()
 def get_products():
     """Get all products with caching"""
@@ -47,6 +49,8 @@ def add_product():
         cache_service = get_cache_service()
         cache_service.delete_pattern('product_list*')
         cache_service.delete_pattern('product_stats*')
+        cache_service.delete_pattern('dashboard_stats*')
+        invalidate_microcache()
 
         return jsonify(product), 201
     except ValueError as e:
@@ -97,6 +101,8 @@ def update_product(sku):
         cache_service.delete(generate_cache_key(sku, prefix='product_info'))
         cache_service.delete_pattern('product_list*')
         cache_service.delete_pattern('product_stats*')
+        cache_service.delete_pattern('dashboard_stats*')
+        invalidate_microcache()
         cache_service.delete_pattern('prediction*')
 
         return jsonify(product), 200
@@ -117,6 +123,8 @@ def delete_product(sku):
         cache_service.delete(generate_cache_key(sku, prefix='product_info'))
         cache_service.delete_pattern('product_list*')
         cache_service.delete_pattern('product_stats*')
+        cache_service.delete_pattern('dashboard_stats*')
+        invalidate_microcache()
         cache_service.delete_pattern('prediction*')
 
         return jsonify({'message': 'Product deleted successfully'}), 200
@@ -103,6 +103,8 @@ def update_operating_hours():
             return jsonify({'error': 'Store not found'}), 404
 
         return jsonify(settings), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -130,5 +132,7 @@ def save_all_settings():
             return jsonify({'error': 'Store not found'}), 404
 
         return jsonify(settings), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
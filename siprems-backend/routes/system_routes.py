@@ -1,28 +1,48 @@
-from flask import Blueprint, jsonify, current_app
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, jsonify, current_app, request
 from services.transaction_service import TransactionService
-from services.product_service import ProductService
 from utils.db import db_query
+from utils.db_session import statement_cache_stats
 from utils.jwt_handler import require_auth
+from utils.http_cache import microcache
+from utils.cache_service import get_cache_service, generate_cache_key
 
 system_bp = Blueprint('system', __name__)
 
+# Upper bound on sub-requests fused into one /batch call
+BATCH_MAX_REQUESTS = 10
+
 @system_bp.route('/dashboard-stats', methods=['GET'])
 @require_auth
+@microcache(ttl=10)
 def get_dashboard_stats():
-    """Get dashboard statistics"""
+    """Get dashboard statistics with caching"""
     try:
+        # Try to get from cache
+        cache_service = get_cache_service()
+        cache_key = generate_cache_key(prefix='dashboard_stats')
+
+        cached_result = cache_service.get(cache_key)
+        if cached_result:
+            return jsonify(cached_result), 200
+
+        # Cards, trend and stock comparison come back in one query
         stats = TransactionService.get_dashboard_stats()
-        product_stats = ProductService.get_inventory_stats()
 
-        return jsonify({
+        result = {
             'cards': {
                 'daily_transactions': stats['daily_transactions'],
-                'active_products': product_stats['active_products'],
-                'low_stock_items': product_stats['low_stock_items']
+                'active_products': stats['active_products'],
+                'low_stock_items': stats['low_stock_items']
             },
             'salesTrend': stats['sales_trend'],
             'stockComparison': stats['stock_comparison']
-        }), 200
+        }
+
+        # Cache the result; transaction and product writes invalidate it
+        cache_service.set(cache_key, result, ttl=cache_service.TTL_POLICIES.get('dashboard_stats', 300))
+
+        return jsonify(result), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -30,14 +50,63 @@ def get_dashboard_stats():
 def get_system_status():
     """Get system status"""
     try:
-        db_query("SELECT 1", fetch_all=False)
+        db_query("SELECT 1", fetch_all=False, read_only=True)
         db_status = "Connected"
     except Exception:
         db_status = "Disconnected"
 
-    return jsonify({
+    status = {
         'version': '2.0.0',
         'last_updated': 'Refactored with Blueprint Architecture',
         'ai_model': 'Prophet v1.1 (Python)',
         'database_status': db_status
-    }), 200
+    }
+    if current_app.config.get('DB_CACHE_STATS'):
+        status['statement_cache'] = statement_cache_stats()
+    return jsonify(status), 200
+
+@system_bp.route('/batch', methods=['POST'])
+@require_auth
+def batch_get():
+    """
+    Fuse several GET API calls into one round trip.
+
+    Body: {"requests": ["/api/products", "/api/system/dashboard-stats", ...]}
+    Returns: {"responses": {path: {"status": int, "body": json}}}
+    """
+    try:
+        data = request.get_json() or {}
+        paths = data.get('requests')
+
+        if not isinstance(paths, list) or not paths:
+            return jsonify({'error': 'requests must be a non-empty list of paths'}), 400
+        if len(paths) > BATCH_MAX_REQUESTS:
+            return jsonify({'error': f'At most {BATCH_MAX_REQUESTS} requests per batch'}), 400
+        for path in paths:
+            if not isinstance(path, str) or not path.startswith('/api/') or path.startswith(request.path):
+                return jsonify({'error': f'Invalid batch path: {path}'}), 400
+
+        app = current_app._get_current_object()
+        # Sub-requests keep the caller's identity (auth, rate-limit key) and
+        # are treated as HTTPS like the outer request behind the proxy
+        headers = {'Authorization': request.headers.get('Authorization', '')}
+        environ = {'REMOTE_ADDR': request.remote_addr}
+
+        def dispatch(path):
+            # One client per sub-request: each runs in its own app context and
+            # checks out its own pooled DB connection
+            response = app.test_client().get(
+                path, headers=headers, environ_overrides=environ, base_url='https://localhost'
+            )
+            return path, {
+                'status': response.status_code,
+                'body': response.get_json(silent=True),
+            }
+
+        unique_paths = list(dict.fromkeys(paths))
+        with ThreadPoolExecutor(max_workers=len(unique_paths)) as executor:
+            responses = dict(executor.map(dispatch, unique_paths))
+
+        return jsonify({'responses': responses}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,23 +1,43 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from services.transaction_service import TransactionService
 from utils.jwt_handler import require_auth
 from utils.validators import TransactionSchema, validate_request_data
+from utils.http_cache import microcache, invalidate_microcache
+from utils.cache_service import get_cache_service
 
 transaction_bp = Blueprint('transactions', __name__)
 
 @transaction_bp.route('', methods=['GET'])
 @require_auth
+@microcache(ttl=15)
 def get_transactions():
     """Get recent transactions"""
     try:
         limit = request.args.get('limit', 100, type=int)
         if limit > 1000:
             limit = 1000
-        transactions = TransactionService.get_all_transactions(limit)
-        return jsonify(transactions), 200
+        # JSON is produced by PostgreSQL; pass it through untouched
+        body = TransactionService.get_all_transactions_json(limit)
+        return Response(body, status=200, mimetype='application/json')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@transaction_bp.route('/export', methods=['GET'])
+@require_auth
+def export_transactions():
+    """Stream every transaction as a JSON array"""
+    encoder = current_app.json
+
+    def generate():
+        # Rows arrive from a server-side cursor in batches and are written
+        # out as they come, so neither side builds the full list
+        yield '['
+        for i, transaction in enumerate(TransactionService.iter_transactions()):
+            yield (',' if i else '') + encoder.dumps(transaction)
+        yield ']'
+
+    return Response(stream_with_context(generate()), status=200, mimetype='application/json')
+
 @transaction_bp.route('', methods=['POST'])
 @require_auth
 def add_transaction():
@@ -29,6 +49,11 @@ def add_transaction():
             return jsonify({'error': 'Validation failed', 'details': errors}), 400
 
         transaction = TransactionService.create_transaction(validated_data)
+
+        # Stock and dashboard figures changed
+        invalidate_microcache()
+        get_cache_service().delete_pattern('dashboard_stats*')
+
         return jsonify(transaction), 201
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
@@ -61,22 +86,25 @@ def checkout():
         if not items or len(items) == 0:
             return jsonify({'error': 'Cart cannot be empty'}), 400
 
-        # Create transactions for each item in the cart
-        transactions = []
+        cart = []
         for item in items:
             product_id = item.get('product_id') or item.get('product', {}).get('id')
             quantity = item.get('quantity', 0)
-            price = item.get('product', {}).get('sellingPrice', 0)
 
             if quantity <= 0:
                 return jsonify({'error': f'Invalid quantity for product'}), 400
 
-            transaction_data = {
+            cart.append({
                 'product_sku': product_id,
                 'quantity': quantity,
-            }
-            transaction = TransactionService.create_transaction(transaction_data)
-            transactions.append(transaction)
+            })
+
+        # Record the whole cart in one round trip; a short item fails it all
+        transactions = TransactionService.create_transactions_bulk(cart)
+
+        # Stock and dashboard figures changed
+        invalidate_microcache()
+        get_cache_service().delete_pattern('dashboard_stats*')
 
         subtotal = data.get('subtotal', 0)
         tax = data.get('tax', 0)
@@ -1,4 +1,5 @@
 -- Drop tables if they exist (for testing)
+DROP MATERIALIZED VIEW IF EXISTS daily_sales_by_product;
 DROP TABLE IF EXISTS transactions;
 DROP TABLE IF EXISTS products;
 DROP TABLE IF EXISTS events;
@@ -35,21 +36,49 @@ CREATE TABLE products (
 );
 
 -- Tabel untuk Transaksi / Penjualan
+-- Range-partitioned by month so date-bounded queries only touch the
+-- partitions they need (the partition key must be part of the primary key)
 CREATE TABLE transactions (
-    transaction_id SERIAL PRIMARY KEY,
+    transaction_id SERIAL,
     product_id INT NOT NULL,
     quantity_sold INT NOT NULL,
     price_per_unit NUMERIC(10, 2) NOT NULL,
-    transaction_date TIMESTAMP WITH TIME ZONE NOT NULL,
+    transaction_date TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
     is_promo BOOLEAN DEFAULT FALSE, 
     
+    PRIMARY KEY (transaction_id, transaction_date),
     -- Membuat relasi ke tabel products
     FOREIGN KEY (product_id) REFERENCES products(product_id) ON DELETE RESTRICT
-);
+) PARTITION BY RANGE (transaction_date);
+
+-- Monthly partitions from 2020 through next year; anything outside lands
+-- in the default partition. Later months are created ahead of time by the
+-- create_transaction_partitions Celery beat task (or by hand with
+-- `python -m utils.partitions`), which also moves rows out of DEFAULT; see
+-- utils/partitions.py for the detach/create/move/attach procedure.
+DO $$
+DECLARE
+    month_start DATE := DATE '2020-01-01';
+    last_month DATE := (date_trunc('year', CURRENT_DATE) + INTERVAL '2 years')::date;
+BEGIN
+    WHILE month_start < last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE transactions_%s PARTITION OF transactions FOR VALUES FROM (%L) TO (%L)',
+            to_char(month_start, 'YYYY_MM'),
+            month_start,
+            (month_start + INTERVAL '1 month')::date
+        );
+        month_start := (month_start + INTERVAL '1 month')::date;
+    END LOOP;
+END $$;
+
+CREATE TABLE transactions_default PARTITION OF transactions DEFAULT;
 
 -- Tabel untuk Acara & Hari Libur
+-- List-partitioned by type: holiday and custom lookups each read only their
+-- own partition (the partition key must be part of every unique key)
 CREATE TABLE events (
-    event_id SERIAL PRIMARY KEY,
+    event_id SERIAL,
     event_name VARCHAR(255) NOT NULL,
     event_date DATE NOT NULL,
     type event_type NOT NULL,
@@ -57,20 +86,44 @@ CREATE TABLE events (
     include_in_prediction BOOLEAN DEFAULT TRUE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     
-    UNIQUE(event_name, event_date)
-);
+    PRIMARY KEY (event_id, type),
+    UNIQUE(event_name, event_date, type)
+) PARTITION BY LIST (type);
+
+CREATE TABLE events_holiday PARTITION OF events FOR VALUES IN ('holiday');
+CREATE TABLE events_custom PARTITION OF events FOR VALUES IN ('custom');
+CREATE TABLE events_default PARTITION OF events DEFAULT;
 
 -- Membuat index pada tanggal transaksi untuk mempercepat query
-CREATE INDEX idx_transaction_date ON transactions(transaction_date);
+-- BRIN: rows arrive in date order, so a tiny block-range index covers range scans
+CREATE INDEX idx_transaction_date ON transactions USING BRIN (transaction_date) WITH (pages_per_range = 32);
 CREATE INDEX idx_product_id ON transactions(product_id);
 
 -- Additional indexes for query optimization
 CREATE INDEX idx_products_sku ON products(sku);
 CREATE INDEX idx_products_category ON products(category);
-CREATE INDEX idx_transactions_product_date ON transactions(product_id, transaction_date);
+-- Lowest-stock top-k for the dashboard becomes an index-only ordered scan
+CREATE INDEX idx_products_stock ON products(stock) INCLUDE (name);
+-- Covering index: per-product sales aggregation is an index-only range scan
+CREATE INDEX idx_transactions_product_date ON transactions(product_id, transaction_date) INCLUDE (quantity_sold, is_promo);
 CREATE INDEX idx_transactions_is_promo ON transactions(is_promo);
 CREATE INDEX idx_transactions_date_range ON transactions(transaction_date DESC);
 CREATE INDEX idx_events_date ON events(event_date);
-CREATE INDEX idx_events_type ON events(type);
+-- Partial covering index for the holidays query (WHERE include_in_prediction)
+CREATE INDEX idx_events_predict ON events(event_date) INCLUDE (event_name) WHERE include_in_prediction;
 CREATE INDEX idx_users_created_at ON users(created_at);
 CREATE INDEX idx_transactions_quantity_date ON transactions(quantity_sold, transaction_date) WHERE quantity_sold > 0;
+
+-- Pre-aggregated daily sales per product for model training, refreshed
+-- by the Celery beat task tasks.ml_tasks.refresh_sales_view
+CREATE MATERIALIZED VIEW daily_sales_by_product AS
+SELECT
+    product_id,
+    transaction_date::date AS ds,
+    SUM(quantity_sold) AS y,
+    MAX(CASE WHEN is_promo THEN 1 ELSE 0 END) AS promo
+FROM transactions
+GROUP BY product_id, transaction_date::date;
+
+-- Unique index: required for REFRESH ... CONCURRENTLY and serves per-product reads
+CREATE UNIQUE INDEX idx_daily_sales_product_ds ON daily_sales_by_product(product_id, ds);
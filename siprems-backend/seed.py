@@ -72,7 +72,7 @@ def seed_data():
                     """
                     INSERT INTO events (event_date, event_name, type, include_in_prediction)
                     VALUES (%s, %s, %s, %s)
-                    ON CONFLICT (event_name, event_date) DO NOTHING
+                    ON CONFLICT (event_name, event_date, type) DO NOTHING
                     """,
                     (row['Datum'], 'Kieler Woche Festival', 'custom', True) 
                     # Note: 'type' diisi 'custom' sesuai ENUM di schema
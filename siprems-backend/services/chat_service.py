@@ -10,6 +10,11 @@ logger = logging.getLogger(__name__)
 class ChatService:
     """Stateless chat service with Redis-backed conversation history"""
     
+    # Keep the last N user/model exchanges so prompt size stays bounded
+    MAX_HISTORY_TURNS = 10
+    # Conversation history TTL in Redis (seconds)
+    HISTORY_TTL = 86400
+    
     def __init__(self, config):
         """Initialize chat service with configuration"""
         self.config = config
@@ -82,8 +87,9 @@ class ChatService:
             history: List of conversation turns
         """
         key = self._get_conversation_key(user_id, session_id)
-        # Store with 24-hour TTL
-        self.cache_service.set(key, history, ttl=86400)
+        # Each exchange is a user entry plus a model entry
+        history = history[-2 * self.MAX_HISTORY_TURNS:]
+        self.cache_service.set(key, history, ttl=self.HISTORY_TTL)
     
     def send_message(self, message: str, user_id: str = None, session_id: str = None) -> str:
         """
@@ -115,11 +121,14 @@ class ChatService:
             # Load conversation history from Redis
             history = self._get_conversation_history(user_id, session_id)
             
-            # Create chat session with history
-            chat = self.model.start_chat(history=history)
+            # Per-request chat session rebuilt from this user's trimmed history
+            chat = self.model.start_chat(history=history[-2 * self.MAX_HISTORY_TURNS:])
             
-            # Send message and get response
-            response = chat.send_message(message)
+            # Send message and get response (bounded, so the thread is freed)
+            response = chat.send_message(
+                message,
+                request_options={'timeout': getattr(self.config, 'GEMINI_REQUEST_TIMEOUT', 30)}
+            )
             response_text = response.text
             
             # Add user message and response to history
@@ -6,9 +6,24 @@ class EventService:
     @staticmethod
     def get_all_events():
         """Get all events"""
-        # Data dari Model sudah berupa dict dengan format yang benar
+        # Data dari Model berupa EventDTO yang langsung diserialisasi orjson
         return EventModel.get_all_events()
     
+    @staticmethod
+    def get_holidays():
+        """Get holiday events"""
+        return EventModel.get_holidays()
+    
+    @staticmethod
+    def get_holidays_etag():
+        """Get a cheap validator that changes whenever the holiday list does"""
+        return EventModel.get_etag('holiday')
+    
+    @staticmethod
+    def iter_all_events():
+        """Stream all events (for exports) without loading them at once"""
+        return EventModel.iter_all_events()
+    
     @staticmethod
     def get_event_by_id(event_id):
         """Get a specific event"""
@@ -1,6 +1,8 @@
 import pandas as pd
+import numpy as np
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from models.product_model import ProductModel
 from models.transaction_model import TransactionModel
@@ -17,6 +19,12 @@ class PredictionService:
         'national-day': {'name': 'National Day', 'month': 9, 'day': 23},
     }
 
+    # month * 100 + day -> holiday name, built once so lookups are O(1)
+    _HOLIDAY_BY_MMDD = {
+        info['month'] * 100 + info['day']: info['name'] for info in HOLIDAYS.values()
+    }
+    _HOLIDAY_KEYS = np.fromiter(_HOLIDAY_BY_MMDD.keys(), dtype=np.int64)
+
     def __init__(self, ml_engine):
         """Initialize with ML engine instance"""
         self.ml_engine = ml_engine
@@ -37,53 +45,56 @@ class PredictionService:
         
         product_sku = data['product_sku']
         forecast_days = int(data.get('days', 7))
+        fast = bool(data.get('fast', False))
         
-        # Validate product exists
-        product_info = ProductModel.get_product_by_sku(product_sku)
+        # Product row and sales history come back in one round trip
+        product_info, actual_df = self.ml_engine.get_prediction_inputs(product_sku)
         if not product_info:
             raise ValueError(f"Product with SKU {product_sku} not found")
         
         # Run prediction using ML Engine
-        forecast = self.ml_engine.predict(product_sku, days=forecast_days)
+        forecast = self.ml_engine.predict(
+            product_sku, days=forecast_days, fast=fast, history=actual_df
+        )
         
         # Ensure ds column is datetime
         forecast['ds'] = pd.to_datetime(forecast['ds'])
         
-        # Get actual historical data
-        actual_df = self.ml_engine.get_sales_data(product_sku)
-        if not actual_df.empty:
-            actual_df['ds'] = pd.to_datetime(actual_df['ds'])
-        
         # Determine earliest date for chart
         if not actual_df.empty:
             earliest_actual = actual_df['ds'].min()
         else:
             earliest_actual = forecast['ds'].min() - pd.Timedelta(days=30)
         
-        # Build chart data
-        chart_df = forecast[forecast['ds'] >= earliest_actual].copy()
+        # Build chart data (forecast ds is sorted, so slice from the first index)
+        forecast_ds = forecast['ds'].to_numpy()
+        chart_df = forecast.iloc[np.searchsorted(forecast_ds, np.datetime64(earliest_actual)):]
+        historical = self._align_actuals(chart_df['ds'].to_numpy(), actual_df)
         
-        # Create mapping of actual values by date
-        actual_map = {}
-        if not actual_df.empty:
-            actual_map = {
-                d.strftime('%Y-%m-%d'): val 
-                for d, val in zip(actual_df['ds'], actual_df['y'])
-            }
-        
-        chart_data = []
-        for _, row in chart_df.iterrows():
-            date_str = row['ds'].strftime('%Y-%m-%d')
-            actual_val = actual_map.get(date_str, None)
+        # Pull whole columns out once instead of boxing every cell via iterrows
+        dates = chart_df['ds'].dt.strftime('%Y-%m-%d').tolist()
+        predicted = chart_df['yhat_corrected'].to_numpy(dtype=float).tolist()
+        lower = chart_df['yhat_lower_corrected'].to_numpy(dtype=float).tolist()
+        upper = chart_df['yhat_upper_corrected'].to_numpy(dtype=float).tolist()
 
-            is_holiday, holiday_name = self._check_holiday(row['ds'])
+        # Flag holidays for the whole column at once on integer MMDD keys
+        mmdd = (chart_df['ds'].dt.month * 100 + chart_df['ds'].dt.day).to_numpy()
+        holiday_mask = np.isin(mmdd, self._HOLIDAY_KEYS)
+        holiday_names = [
+            self._HOLIDAY_BY_MMDD[key] if hit else ''
+            for key, hit in zip(mmdd.tolist(), holiday_mask.tolist())
+        ]
 
+        chart_data = []
+        for date_str, actual, pred, low, up, is_holiday, holiday_name in zip(
+            dates, historical, predicted, lower, upper, holiday_mask.tolist(), holiday_names
+        ):
             chart_data.append({
                 'date': date_str,
-                'historical': actual_val,
-                'predicted': float(row['yhat_corrected']),
-                'lower': float(row['yhat_lower_corrected']),
-                'upper': float(row['yhat_upper_corrected']),
+                'historical': actual,
+                'predicted': pred,
+                'lower': low,
+                'upper': up,
                 'isHoliday': is_holiday,
                 'holidayName': holiday_name
             })
@@ -92,24 +103,10 @@ class PredictionService:
             raise ValueError("No forecast data could be generated")
         
         # Generate restock recommendations
-        future_forecast = forecast.tail(forecast_days)
-        total_predicted_sales = future_forecast['yhat_corrected'].sum()
-
-        # Calculate buffer based on forecast window
-        buffer_percent = 1.2 if forecast_days <= 7 else 1.1
-        predicted_demand = int(round(total_predicted_sales))
         current_stock = int(product_info['stock'])
-
-        gap = predicted_demand - current_stock
-        recommended_restock = max(0, gap)
-
-        if gap > 0:
-            if gap > current_stock:
-                urgency = "high"
-            else:
-                urgency = "medium"
-        else:
-            urgency = "low"
+        predicted_demand, recommended_restock, urgency = self._restock_recommendation(
+            forecast['yhat_corrected'].to_numpy()[-forecast_days:], current_stock
+        )
 
         recommendations = [{
             'productId': product_info.get('product_id', ''),
@@ -120,8 +117,11 @@ class PredictionService:
             'urgency': urgency
         }]
         
-        # Get model accuracy from metadata
-        accuracy_score = self._get_model_accuracy(product_sku)
+        # Use the accuracy reported by whichever forecast path ran
+        if 'accuracy_score' in forecast.columns:
+            accuracy_score = float(forecast['accuracy_score'].iloc[0])
+        else:
+            accuracy_score = self._get_model_accuracy(product_sku)
         
         return {
             'chartData': chart_data,
@@ -129,6 +129,82 @@ class PredictionService:
             'accuracy': round(accuracy_score, 1)
         }
     
+    def predict_batch(self, skus, days=7, fast=False, max_workers=8):
+        """
+        Predict several products concurrently.
+        
+        Args:
+            skus: List of product SKUs
+            days: Number of days to forecast
+            fast: Force the lightweight forecast path
+            max_workers: Upper bound on worker threads
+        
+        Returns:
+            dict mapping SKU to its predict_stock result, or {'error': ...}
+        """
+        def run(sku):
+            try:
+                return sku, self.predict_stock({'product_sku': sku, 'days': days, 'fast': fast})
+            except Exception as e:
+                return sku, {'error': str(e)}
+
+        if not skus:
+            return {}
+
+        # Model predict is numpy-bound and DB calls block on I/O, so threads
+        # overlap well without pickling models into other processes
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(skus))) as executor:
+            return dict(executor.map(run, skus))
+    
+    @staticmethod
+    def _restock_recommendation(future_yhat, current_stock):
+        """
+        Demand, restock quantity and urgency from the future forecast values.
+
+        Args:
+            future_yhat: numpy array of corrected daily forecasts
+            current_stock: Units currently in stock
+
+        Returns:
+            tuple: (predicted_demand, recommended_restock, urgency)
+        """
+        predicted_demand = int(np.rint(future_yhat.sum()))
+        gap = predicted_demand - current_stock
+
+        if gap <= 0:
+            urgency = "low"
+        elif gap > current_stock:
+            urgency = "high"
+        else:
+            urgency = "medium"
+
+        return predicted_demand, max(0, gap), urgency
+
+    @staticmethod
+    def _align_actuals(chart_ds, actual_df):
+        """
+        Line actual sales up with the chart dates.
+
+        Both date arrays are sorted, so a searchsorted merge replaces the
+        per-row dict lookup.
+
+        Returns:
+            list: actual quantity per chart date, None where there was no sale
+        """
+        historical = [None] * len(chart_ds)
+        if actual_df.empty or not len(chart_ds):
+            return historical
+
+        actual_ds = actual_df['ds'].to_numpy()
+        idx = np.searchsorted(chart_ds, actual_ds)
+        in_range = idx < len(chart_ds)
+        matched = np.zeros(len(actual_ds), dtype=bool)
+        matched[in_range] = chart_ds[idx[in_range]] == actual_ds[in_range]
+
+        for i, y in zip(idx[matched].tolist(), actual_df['y'].to_numpy()[matched].tolist()):
+            historical[i] = y
+        return historical
+
     def _check_holiday(self, date):
         """
         Check if a date matches any known holiday.
@@ -139,10 +215,10 @@ class PredictionService:
         Returns:
             tuple: (is_holiday: bool, holiday_name: str)
         """
-        for holiday_key, holiday_info in self.HOLIDAYS.items():
-            if date.month == holiday_info['month'] and date.day == holiday_info['day']:
-                return True, holiday_info['name']
-        return False, ''
+        holiday_name = self._HOLIDAY_BY_MMDD.get(date.month * 100 + date.day)
+        if holiday_name is None:
+            return False, ''
+        return True, holiday_name
 
     @staticmethod
     def _get_model_accuracy(product_sku):
@@ -164,13 +240,5 @@ class PredictionService:
     def train_all_models(self):
         """Train models for all products (batch operation)"""
         products = ProductModel.get_all_products()
-        results = {}
-        
-        for product in products:
-            try:
-                result = self.ml_engine.train_product_model(product['sku'])
-                results[product['sku']] = result
-            except Exception as e:
-                results[product['sku']] = {'status': 'error', 'reason': str(e)}
-        
-        return results
+        # One sales query for the whole catalog instead of one per SKU
+        return self.ml_engine.train_all(product['sku'] for product in products)
@@ -96,6 +96,6 @@ class ProductService:
         """Get inventory statistics"""
         return {
             'active_products': ProductModel.get_product_count(),
-            'low_stock_items': len(ProductModel.get_low_stock_items()),
+            'low_stock_items': ProductModel.get_low_stock_count(),
             'total_inventory_value': ProductModel.get_total_inventory_value()
         }
@@ -112,6 +112,7 @@ class SettingsService:
             Updated settings with new opening hours, or None if store not found.
 
         Raises:
+            ValueError: If the opening hours payload is not valid.
             Exception: If database operation fails.
         """
         store = StoreModel.get_store_by_user_id(user_id)
@@ -121,18 +122,8 @@ class SettingsService:
 
         store_id = store["store_id"]
 
-        for day, hours_data in opening_hours.items():
-            is_closed = hours_data.get("closed", False)
-            open_time = hours_data.get("open", "00:00")
-            close_time = hours_data.get("close", "00:00")
-
-            StoreModel.set_opening_hours(
-                store_id,
-                day,
-                open_time,
-                close_time,
-                is_closed,
-            )
+        # Validated as a whole and written in one transaction
+        StoreModel.save_settings(store_id, opening_hours=opening_hours)
 
         updated_hours = StoreModel.get_opening_hours(store_id)
 
@@ -161,9 +152,9 @@ class SettingsService:
             Complete updated settings dictionary, or None if store not found.
 
         Raises:
+            ValueError: If the opening hours payload is not valid.
             Exception: If database operation fails.
         """
-        # Update store info
         store = StoreModel.get_store_by_user_id(user_id)
 
         if not store:
@@ -171,23 +162,9 @@ class SettingsService:
 
         store_id = store["store_id"]
 
-        if name is not None or address is not None:
-            store = StoreModel.update_store(store_id, name, address)
-
-        # Update opening hours
-        if opening_hours:
-            for day, hours_data in opening_hours.items():
-                is_closed = hours_data.get("closed", False)
-                open_time = hours_data.get("open", "00:00")
-                close_time = hours_data.get("close", "00:00")
-
-                StoreModel.set_opening_hours(
-                    store_id,
-                    day,
-                    open_time,
-                    close_time,
-                    is_closed,
-                )
+        # Store info and every day's hours commit together, and only after
+        # the whole opening hours payload has been validated
+        store = StoreModel.save_settings(store_id, name, address, opening_hours)
 
         current_hours = StoreModel.get_opening_hours(store_id)
 
@@ -1,5 +1,4 @@
 from models.transaction_model import TransactionModel
-from models.product_model import ProductModel
 
 class TransactionService:
     """Business logic layer for transaction operations"""
@@ -10,6 +9,16 @@ class TransactionService:
         # Data dari model sudah dalam format dictionary yang benar (tanggal sudah string)
         return TransactionModel.get_all_transactions(limit)
     
+    @staticmethod
+    def get_all_transactions_json(limit=100):
+        """Get recent transactions as a JSON array string built by the database"""
+        return TransactionModel.get_all_transactions_json(limit)
+    
+    @staticmethod
+    def iter_transactions():
+        """Stream all transactions (for exports) without loading them at once"""
+        return TransactionModel.iter_transactions()
+    
     @staticmethod
     def create_transaction(data):
         """Create a new transaction with validation"""
@@ -19,35 +28,46 @@ class TransactionService:
         if 'quantity' not in data:
             raise ValueError("Quantity is required")
         
-        # Get product
-        product = ProductModel.get_product_by_sku(data['product_sku'])
-        if not product:
-            raise ValueError(f"Product with SKU {data['product_sku']} not found")
-        
         quantity = int(data['quantity'])
         
-        # Check stock availability
-        if product['stock'] < quantity:
-            raise ValueError(
-                f"Insufficient stock. Available: {product['stock']}, Requested: {quantity}"
-            )
-        
-        # Create transaction
-        transaction = TransactionModel.create_transaction(
-            product_id=product['product_id'],
+        # Lookup, stock check, insert and stock update run in one DB transaction
+        transaction = TransactionModel.record_sale(
+            sku=data['product_sku'],
             quantity_sold=quantity,
-            price_per_unit=product['price'],
             is_promo=data.get('is_promo', False)
         )
+        if not transaction:
+            raise ValueError(f"Product with SKU {data['product_sku']} not found")
+        
+        return TransactionService._format_transaction(transaction)
+    
+    @staticmethod
+    def create_transactions_bulk(items):
+        """
+        Create several transactions atomically (e.g. a checkout cart).
         
-        # Update product stock
-        ProductModel.update_product_stock(product['product_id'], -quantity)
+        Args:
+            items: List of dicts with 'product_sku', 'quantity' and optional 'is_promo'
         
-        # Add product name to response
-        transaction['product_name'] = product['name']
-        transaction['product_sku'] = product['sku']
+        Returns:
+            List of formatted transactions, in cart order
+        """
+        cart = []
+        for item in items:
+            if not item.get('product_sku'):
+                raise ValueError("Product SKU is required")
+            quantity = int(item.get('quantity', 0))
+            if quantity <= 0:
+                raise ValueError("Invalid quantity for product")
+            cart.append({
+                'sku': item['product_sku'],
+                'quantity': quantity,
+                'is_promo': item.get('is_promo', False),
+            })
         
-        return TransactionService._format_transaction(transaction)
+        # The whole cart is one statement: every line is recorded or none is
+        transactions = TransactionModel.record_sales_bulk(cart)
+        return TransactionService._format_transactions(transactions)
     
     @staticmethod
     def get_transaction_by_id(transaction_id):
@@ -64,38 +84,8 @@ class TransactionService:
     
     @staticmethod
     def get_dashboard_stats():
-        """Get dashboard statistics"""
-        sales_trend = TransactionModel.get_sales_trend(days=7)
-        
-        # Format sales trend for Recharts
-        formatted_trend = []
-        for row in sales_trend:
-            # Handle date formatting safely
-            date_val = row['date']
-            # Jika date_val masih objek date/datetime (tergantung driver DB), ubah ke string
-            if hasattr(date_val, 'strftime'):
-                date_str = date_val.strftime('%a')
-            else:
-                # Jika sudah string, parse dulu atau ambil substring (asumsi 'YYYY-MM-DD')
-                try:
-                    from datetime import datetime
-                    dt = datetime.strptime(str(date_val), '%Y-%m-%d')
-                    date_str = dt.strftime('%a')
-                except:
-                    date_str = str(date_val)
-
-            formatted_trend.append({
-                'date': date_str,
-                'sales': int(row['sales'])
-            })
-        
-        stock_comparison = TransactionModel.get_stock_comparison(limit=5)
-        
-        return {
-            'daily_transactions': TransactionModel.get_daily_transaction_count(),
-            'sales_trend': formatted_trend,
-            'stock_comparison': stock_comparison
-        }
+        """Get dashboard statistics (aggregated and formatted in one query)"""
+        return TransactionModel.get_dashboard_summary(days=7, limit=5)
     
     @staticmethod
     def _format_transaction(transaction):
@@ -54,13 +54,61 @@ if command -v psql &> /dev/null; then
 -- Create indexes if they don't exist
 CREATE INDEX IF NOT EXISTS idx_products_sku ON products(sku);
 CREATE INDEX IF NOT EXISTS idx_products_category ON products(category);
-CREATE INDEX IF NOT EXISTS idx_transactions_product_date ON transactions(product_id, transaction_date);
+CREATE INDEX IF NOT EXISTS idx_products_stock ON products(stock) INCLUDE (name);
+-- Older installs have a non-covering index under this name; rebuild it
+DO \$\$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_indexes
+               WHERE indexname = 'idx_transactions_product_date' AND indexdef NOT LIKE '%INCLUDE%') THEN
+        DROP INDEX idx_transactions_product_date;
+    END IF;
+END
+\$\$;
+CREATE INDEX IF NOT EXISTS idx_transactions_product_date ON transactions(product_id, transaction_date) INCLUDE (quantity_sold, is_promo);
+DROP INDEX IF EXISTS idx_transactions_product_date_covering;
+-- Unused YYYYMM bucket: monthly partitions already prune month ranges
+DROP INDEX IF EXISTS idx_tx_month_product;
+ALTER TABLE transactions DROP COLUMN IF EXISTS transaction_month;
 CREATE INDEX IF NOT EXISTS idx_transactions_is_promo ON transactions(is_promo);
 CREATE INDEX IF NOT EXISTS idx_transactions_date_range ON transactions(transaction_date DESC);
 CREATE INDEX IF NOT EXISTS idx_events_date ON events(event_date);
 CREATE INDEX IF NOT EXISTS idx_events_type ON events(type);
+CREATE INDEX IF NOT EXISTS idx_events_predict ON events(event_date) INCLUDE (event_name) WHERE include_in_prediction;
+DROP INDEX IF EXISTS idx_include_prediction;
 CREATE INDEX IF NOT EXISTS idx_users_created_at ON users(created_at);
+-- Older installs store opening hours as "Monday"/"HH:MM" strings; convert
+-- them to the SMALLINT day index (0=Monday) and minutes since midnight
+DO \$\$
+BEGIN
+    IF EXISTS (SELECT 1 FROM information_schema.columns
+               WHERE table_name = 'opening_hours' AND column_name = 'day_of_week'
+                 AND data_type = 'character varying') THEN
+        ALTER TABLE opening_hours
+            ALTER COLUMN day_of_week TYPE smallint USING (
+                array_position(ARRAY['Monday','Tuesday','Wednesday','Thursday','Friday','Saturday','Sunday'],
+                               initcap(day_of_week)) - 1);
+    END IF;
+    IF EXISTS (SELECT 1 FROM information_schema.columns
+               WHERE table_name = 'opening_hours' AND column_name = 'open_time'
+                 AND data_type = 'character varying') THEN
+        ALTER TABLE opening_hours
+            ALTER COLUMN open_time TYPE smallint USING (
+                split_part(NULLIF(open_time, ''), ':', 1)::int * 60 + split_part(NULLIF(open_time, ''), ':', 2)::int),
+            ALTER COLUMN close_time TYPE smallint USING (
+                split_part(NULLIF(close_time, ''), ':', 1)::int * 60 + split_part(NULLIF(close_time, ''), ':', 2)::int);
+    END IF;
+    IF to_regclass('opening_hours') IS NOT NULL THEN
+        CREATE INDEX IF NOT EXISTS idx_opening_hours_store_day ON opening_hours(store_id, day_of_week);
+    END IF;
+END
+\$\$;
 CREATE INDEX IF NOT EXISTS idx_transactions_quantity_date ON transactions(quantity_sold, transaction_date) WHERE quantity_sold > 0;
+CREATE MATERIALIZED VIEW IF NOT EXISTS daily_sales_by_product AS
+SELECT product_id, transaction_date::date AS ds, SUM(quantity_sold) AS y,
+       MAX(CASE WHEN is_promo THEN 1 ELSE 0 END) AS promo
+FROM transactions
+GROUP BY product_id, transaction_date::date;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_daily_sales_product_ds ON daily_sales_by_product(product_id, ds);
 EOF
         echo -e "${GREEN}✓ Database indexes created${NC}"
     } || {
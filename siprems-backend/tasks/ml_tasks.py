@@ -1,18 +1,14 @@
 from celery import shared_task
 from celery_app import celery_app
 import os
-import json
 import logging
 import pandas as pd
-import numpy as np
 from datetime import datetime
-from prophet import Prophet
-from prophet.serialize import model_to_json, model_from_json
-from sklearn.metrics import mean_absolute_error, mean_absolute_percentage_error
 
 from utils.config import get_config
-from utils.db import get_db_connection, db_query
-from models.product_model import ProductModel
+from utils.db import borrow, db_query, db_copy_to_dataframe
+from utils.partitions import ensure_transaction_partitions
+from ml_engine import MLEngine, SALES_DTYPES, get_shared_holidays, resolve_product_id
 
 logger = logging.getLogger(__name__)
 config = get_config()
@@ -22,53 +18,109 @@ os.makedirs(config.MODELS_DIR, exist_ok=True)
 os.makedirs(config.MODELS_META_DIR, exist_ok=True)
 
 
-def get_sales_data_for_task(product_sku):
-    """Fetch sales data for a product"""
-    query = """
-        SELECT
-            DATE(t.transaction_date) as ds,
-            SUM(t.quantity_sold) as y,
-            MAX(CASE WHEN t.is_promo THEN 1 ELSE 0 END) as promo
-        FROM transactions t
-        JOIN products p ON t.product_id = p.product_id
-        WHERE p.sku = %s
-        GROUP BY DATE(t.transaction_date)
-        ORDER BY ds ASC;
-    """
+SALES_VIEW_QUERY = """
+    SELECT ds, y, promo
+    FROM daily_sales_by_product
+    WHERE product_id = %s
+    ORDER BY ds
+"""
+
+SALES_AGGREGATE_QUERY = """
+    SELECT
+        transaction_date::date as ds,
+        SUM(quantity_sold) as y,
+        MAX(CASE WHEN is_promo THEN 1 ELSE 0 END) as promo
+    FROM transactions
+    WHERE product_id = %s
+    GROUP BY 1
+    ORDER BY 1
+"""
+
+def get_sales_data_for_task(product_sku, conn=None):
+    """Fetch sales data for a product (optionally on a borrowed connection)"""
+    # The materialized view is an index seek on (product_id, ds); it is at
+    # most one refresh interval behind the live aggregate
+    query = SALES_VIEW_QUERY if config.SALES_MATVIEW_ENABLED else SALES_AGGREGATE_QUERY
     try:
-        result = db_query(query, (product_sku,), fetch_all=True)
-        df = pd.DataFrame(result) if result else pd.DataFrame()
-
-        if not df.empty:
-            df['ds'] = pd.to_datetime(df['ds'])
-            df['y'] = pd.to_numeric(df['y'], errors='coerce').fillna(0).astype(int)
-            df['promo'] = pd.to_numeric(df['promo'], errors='coerce').fillna(0).astype(int)
-
-        return df
+        product_id = resolve_product_id(
+            product_sku,
+            lambda: (db_query(
+                "SELECT product_id FROM products WHERE sku = %s",
+                (product_sku,), fetch_all=False, conn=conn, as_dict=False, read_only=True,
+                prepare='product_id_by_sku'
+            ) or (None,))[0]
+        )
+        if product_id is None:
+            return pd.DataFrame()
+
+        # COPY streams the aggregate as CSV straight into pandas
+        # y and promo are never NULL (SUM/MAX over at least one row), so the
+        # CSV reader can parse them straight to their narrow integer dtypes
+        return db_copy_to_dataframe(
+            query, (product_id,), columns=['ds', 'y', 'promo'], parse_dates=['ds'],
+            conn=conn, dtype=SALES_DTYPES
+        )
     except Exception as e:
         logger.error(f"Error fetching sales data for {product_sku}: {e}")
         return pd.DataFrame()
 
 
-def get_holidays_for_task():
-    """Fetch holiday/event data"""
+def get_holidays_for_task(conn=None):
+    """Fetch holiday/event data through the process-wide holidays cache"""
+    # Bare boolean predicate matches idx_events_predict's WHERE clause;
+    # ds comes back as a DATE even on ORM-created (timestamp) tables
     query = """
-        SELECT event_name as holiday, event_date as ds 
-        FROM events 
-        WHERE include_in_prediction = TRUE
-        AND event_type IN ('holiday', 'promotion', 'seasonal');
+        SELECT event_name as holiday, event_date::date as ds
+        FROM events
+        WHERE include_in_prediction
+        ORDER BY event_date
     """
-    try:
-        result = db_query(query, fetch_all=True)
-        df = pd.DataFrame(result) if result else pd.DataFrame()
-        if not df.empty:
-            df['ds'] = pd.to_datetime(df['ds'])
-            df['lower_window'] = -2
-            df['upper_window'] = 1
-        return df if not df.empty else None
-    except Exception as e:
-        logger.error(f"Error fetching holidays: {e}")
-        return None
+
+    def fetch_rows():
+        return db_query(
+            query, fetch_all=True, conn=conn, as_dict=False, read_only=True,
+            prepare='prediction_holidays'
+        )
+
+    return get_shared_holidays(fetch_rows)
+
+
+def train_product_model_for_task(product_sku):
+    """
+    Train and save a Prophet model for a product.
+
+    Sales and holidays are read on the Celery side (the materialized view
+    when enabled); the fit itself is MLEngine.train_product_model, so the
+    nightly run and this task share one trainer and one meta data_hash.
+
+    Args:
+        product_sku: SKU of the product to train model for
+
+    Returns:
+        dict with training status and results
+
+    Raises:
+        Exception: Database, fit or save errors
+    """
+    logger.info(f"Starting model training for product {product_sku}")
+
+    # Both fetches share one pooled, autocommit (read-only) connection
+    with borrow(autocommit=True) as conn:
+        df = get_sales_data_for_task(product_sku, conn=conn)
+        holidays = get_holidays_for_task(conn=conn)
+
+    result = _get_prediction_service().ml_engine.train_product_model(
+        product_sku, sales_df=df, holidays=holidays
+    )
+    if result["status"] == "error":
+        # Let the task retry instead of reporting a failed fit as done
+        raise RuntimeError(result["reason"])
+
+    return {
+        **result,
+        "product_sku": product_sku,
+        "timestamp": datetime.utcnow().isoformat()
+    }
 
 
 @celery_app.task(bind=True, max_retries=3)
@@ -83,228 +135,105 @@ def train_product_model_task(self, product_sku):
         dict with training status and results
     """
     try:
-        logger.info(f"Starting model training for product {product_sku}")
-        
-        df = get_sales_data_for_task(product_sku)
-        holidays = get_holidays_for_task()
-
-        if df.empty or len(df) < 5:
-            logger.warning(f"Insufficient data for {product_sku}: {len(df)} records")
-            return {
-                "status": "skipped",
-                "reason": "Not enough data",
-                "product_sku": product_sku,
-                "timestamp": datetime.utcnow().isoformat()
-            }
-
-        # Log transform
-        df['y_log'] = np.log1p(df['y'])
-
-        # Outlier removal (3.5 sigma)
-        mu = df['y_log'].mean()
-        std = df['y_log'].std()
-        if std > 0:
-            df = df[np.abs(df['y_log'] - mu) <= (3.5 * std)].copy()
-
-        if len(df) < 5:
-            logger.warning(f"Insufficient data after outlier removal for {product_sku}")
-            return {
-                "status": "skipped",
-                "reason": "Not enough data after outlier removal",
-                "product_sku": product_sku,
-                "timestamp": datetime.utcnow().isoformat()
-            }
-
-        # Configure Prophet model
-        model = Prophet(
-            yearly_seasonality=True,
-            weekly_seasonality=True,
-            daily_seasonality=False,
-            seasonality_mode='multiplicative',
-            changepoint_prior_scale=0.05,
-            holidays=holidays,
-            holidays_prior_scale=10.0,
-            interval_width=0.95
-        )
-
-        model.add_seasonality(name='monthly', period=30.5, fourier_order=15)
-        model.add_regressor('promo')
-
-        # Prepare data and fit
-        df_fit = df[['ds', 'y_log', 'promo']].rename(columns={'y_log': 'y'})
-
-        # Suppress Prophet warnings
-        import warnings
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            model.fit(df_fit)
-
-        # Evaluate model
-        forecast = model.predict(df_fit)
-        y_pred = np.expm1(forecast['yhat'].values)
-        y_true = np.expm1(df_fit['y'].values)
-
-        # Calculate correction factor
-        ratios = y_true / (y_pred + 1e-6)
-        correction_factor = float(np.median(ratios))
-        correction_factor = max(0.85, min(1.15, correction_factor))
-
-        # Calculate accuracy metrics
-        mae = mean_absolute_error(y_true, y_pred)
-        mape = mean_absolute_percentage_error(y_true, y_pred)
-        accuracy_score = max(0, 100 * (1 - min(mape, 1.0)))
-
-        # Save model
-        model_path = os.path.join(config.MODELS_DIR, f"model_{product_sku}.json")
-        with open(model_path, "w") as f:
-            f.write(model_to_json(model))
-
-        # Save metadata
-        meta_path = os.path.join(config.MODELS_META_DIR, f"meta_{product_sku}.json")
-        with open(meta_path, "w") as f:
-            json.dump({
-                "correction_factor": correction_factor,
-                "mae": float(mae),
-                "mape_percent": float(mape * 100),
-                "accuracy_score": float(accuracy_score),
-                "trained_at": datetime.utcnow().isoformat(),
-                "training_samples": len(df)
-            }, f, indent=2)
-
-        logger.info(f"Model trained for {product_sku}: accuracy={accuracy_score:.1f}%")
-
-        return {
-            "status": "success",
-            "product_sku": product_sku,
-            "accuracy": accuracy_score,
-            "correction_factor": correction_factor,
-            "mae": float(mae),
-            "mape_percent": float(mape * 100),
-            "timestamp": datetime.utcnow().isoformat()
-        }
-
+        return train_product_model_for_task(product_sku)
     except Exception as exc:
         logger.error(f"Error training model for {product_sku}: {exc}", exc_info=True)
         # Retry with exponential backoff
         raise self.retry(exc=exc, countdown=min(2 ** self.request.retries, 600))
 
 
+_prediction_service = None
+
+
+def _get_prediction_service():
+    """Per-worker PredictionService, so async predictions share the sync code path."""
+    global _prediction_service
+    if _prediction_service is None:
+        from services.prediction_service import PredictionService
+        from utils.db_session import get_db_engine
+        _prediction_service = PredictionService(MLEngine(get_db_engine))
+    return _prediction_service
+
+
 @celery_app.task(bind=True, max_retries=3)
-def predict_stock_task(self, product_sku, forecast_days=7):
+def predict_stock_task(self, product_sku, forecast_days=7, fast=False, cache_key=None):
     """
-    Celery task for async stock prediction.
-    
-    Args:
-        product_sku: SKU of the product to predict
-        forecast_days: Number of days to forecast
-        
-    Returns:
-        dict with prediction results
+    Async task for stock prediction.
+
+    Returns the same {chartData, recommendations, accuracy} payload as the
+    synchronous /predict route and, when cache_key is given, stores it under
+    the route's cache key so the next sync request is served from Redis.
     """
     try:
-        logger.info(f"Starting prediction for {product_sku} (days: {forecast_days})")
-        
-        model_path = os.path.join(config.MODELS_DIR, f"model_{product_sku}.json")
-        meta_path = os.path.join(config.MODELS_META_DIR, f"meta_{product_sku}.json")
-
-        # Train if model doesn't exist
-        if not os.path.exists(model_path):
-            logger.info(f"Model not found for {product_sku}, training...")
-            train_result = train_product_model_task(product_sku)
-            if train_result.get('status') != 'success':
-                raise Exception(f"Failed to train model: {train_result.get('reason')}")
-
-        # Load model
-        with open(model_path, 'r') as f:
-            model = model_from_json(f.read())
-
-        # Load metadata
-        correction_factor = 1.0
-        accuracy_score = 0.0
-
-        if os.path.exists(meta_path):
-            try:
-                with open(meta_path, 'r') as f:
-                    meta = json.load(f)
-                    correction_factor = float(meta.get('correction_factor', 1.0))
-                    accuracy_score = float(meta.get('accuracy_score', 0.0))
-            except Exception as e:
-                logger.warning(f"Could not load metadata for {product_sku}: {e}")
-
-        # Create future dataframe
-        future = model.make_future_dataframe(periods=forecast_days)
-
-        # Handle promo status
-        df_history = get_sales_data_for_task(product_sku)
-        if not df_history.empty and 'promo' in df_history.columns:
-            promo_map = dict(zip(df_history['ds'], df_history['promo']))
-            future['promo'] = future['ds'].map(promo_map).fillna(0)
-        else:
-            future['promo'] = 0
-
-        # Run prediction
-        import warnings
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            forecast = model.predict(future)
-
-        # Apply correction factor
-        forecast['yhat_corrected'] = np.expm1(forecast['yhat'].values) * correction_factor
-        forecast['yhat_lower_corrected'] = np.expm1(forecast['yhat_lower'].values) * correction_factor
-        forecast['yhat_upper_corrected'] = np.expm1(forecast['yhat_upper'].values) * correction_factor
-
-        # Ensure no negative values
-        cols = ['yhat_corrected', 'yhat_lower_corrected', 'yhat_upper_corrected']
-        for col in cols:
-            forecast[col] = forecast[col].clip(lower=0)
-
-        # Get actual historical data
-        actual_df = get_sales_data_for_task(product_sku)
-        if not actual_df.empty:
-            actual_df['ds'] = pd.to_datetime(actual_df['ds'])
-
-        # Determine earliest date
-        if not actual_df.empty:
-            earliest_actual = actual_df['ds'].min()
-        else:
-            earliest_actual = forecast['ds'].min() - pd.Timedelta(days=30)
-
-        # Build chart data
-        chart_df = forecast[forecast['ds'] >= earliest_actual].copy()
-        actual_map = {}
-        if not actual_df.empty:
-            actual_map = {
-                d.strftime('%Y-%m-%d'): val
-                for d, val in zip(actual_df['ds'], actual_df['y'])
-            }
-
-        chart_data = []
-        for _, row in chart_df.iterrows():
-            date_str = row['ds'].strftime('%Y-%m-%d')
-            actual_val = actual_map.get(date_str, None)
-
-            chart_data.append({
-                'date': date_str,
-                'actual': actual_val,
-                'predicted': float(row['yhat_corrected']),
-                'lower': float(row['yhat_lower_corrected']),
-                'upper': float(row['yhat_upper_corrected'])
-            })
-
-        logger.info(f"Prediction completed for {product_sku}")
+        result = _get_prediction_service().predict_stock({
+            'product_sku': product_sku,
+            'days': forecast_days,
+            'fast': fast,
+        })
+
+        if cache_key:
+            from utils.cache_service import get_cache_service
+            cache_service = get_cache_service()
+            cache_service.set(cache_key, result, ttl=cache_service.TTL_POLICIES.get('prediction_result', 7200))
+
+        return result
+
+    except ValueError:
+        # Bad input or unknown product: retrying will not help
+        raise
+    except Exception as exc:
+        logger.error(f"Error predicting for {product_sku}: {exc}", exc_info=True)
+        raise self.retry(exc=exc, countdown=min(2 ** self.request.retries, 600))
+
+
+@celery_app.task
+def refresh_sales_view():
+    """
+    Scheduled task to refresh the daily_sales_by_product materialized view.
+    Runs CONCURRENTLY so readers are never blocked.
+    """
+    if not config.SALES_MATVIEW_ENABLED:
+        return {"status": "skipped", "reason": "SALES_MATVIEW_ENABLED is off"}
+
+    try:
+        # REFRESH ... CONCURRENTLY cannot run inside a transaction block
+        with borrow(autocommit=True) as conn:
+            with conn.cursor() as cur:
+                cur.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY daily_sales_by_product")
 
+        return {"status": "success", "timestamp": datetime.utcnow().isoformat()}
+    except Exception as e:
+        logger.error(f"Error refreshing sales view: {e}", exc_info=True)
         return {
-            "status": "success",
-            "product_sku": product_sku,
-            "forecast_days": forecast_days,
-            "chart_data": chart_data,
-            "accuracy": accuracy_score,
+            "status": "error",
+            "reason": str(e),
             "timestamp": datetime.utcnow().isoformat()
         }
 
-    except Exception as exc:
-        logger.error(f"Error predicting for {product_sku}: {exc}", exc_info=True)
-        raise self.retry(exc=exc, countdown=min(2 ** self.request.retries, 600))
+
+@celery_app.task
+def create_transaction_partitions():
+    """
+    Scheduled task that creates upcoming monthly transactions partitions.
+    Idempotent; see utils.partitions for how stranded DEFAULT rows are moved.
+    """
+    try:
+        with borrow() as conn:
+            created = ensure_transaction_partitions(
+                conn, months_ahead=config.TRANSACTION_PARTITIONS_AHEAD
+            )
+            conn.commit()
+
+        if created:
+            logger.info(f"Created transactions partitions: {', '.join(created)}")
+        return {"status": "success", "created": created, "timestamp": datetime.utcnow().isoformat()}
+    except Exception as e:
+        logger.error(f"Error creating transactions partitions: {e}", exc_info=True)
+        return {
+            "status": "error",
+            "reason": str(e),
+            "timestamp": datetime.utcnow().isoformat()
+        }
 
 
 @celery_app.task
@@ -315,21 +244,14 @@ def train_all_models():
     """
     try:
         logger.info("Starting nightly training for all products")
-        products = ProductModel.get_all_products()
-        results = {}
-
-        for product in products:
-            try:
-                result = train_product_model_task(product['sku'])
-                results[product['sku']] = result
-                logger.info(f"Training result for {product['sku']}: {result['status']}")
-            except Exception as e:
-                logger.error(f"Error training {product['sku']}: {e}")
-                results[product['sku']] = {
-                    'status': 'error',
-                    'reason': str(e),
-                    'timestamp': datetime.utcnow().isoformat()
-                }
+        # Keep the view current for the per-SKU tasks; the batch below reads
+        # transactions directly
+        refresh_sales_view()
+        # One get_sales_data_bulk query for the whole catalogue, then the fits
+        # fan out over MLEngine's process pool
+        results = _get_prediction_service().train_all_models()
+        for sku, result in results.items():
+            logger.info(f"Training result for {sku}: {result['status']}")
 
         logger.info(f"Nightly training completed. Processed {len(results)} products")
         
@@ -0,0 +1,593 @@
+#!/usr/bin/env python
+"""
+API contract tests for behaviour the performance work changed.
+
+Pure-Python checks run anywhere the app's dependencies are installed;
+checks that need PostgreSQL are skipped when it cannot be reached.
+
+Run with: python -m pytest -q test_api_contracts.py
+"""
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def flask_app():
+    """App from the factory; routes that never touch the database work as is."""
+    pytest.importorskip("flask")
+    pytest.importorskip("sqlalchemy")
+    from app import create_app
+
+    return create_app()
+
+
+@pytest.fixture(scope="module")
+def app(flask_app):
+    """The same app, skipping the test if PostgreSQL is unreachable."""
+    from sqlalchemy import text
+
+    try:
+        with flask_app.get_db_session() as session:
+            session.execute(text("SELECT 1"))
+    except Exception as e:
+        pytest.skip(f"PostgreSQL not reachable: {e}")
+    return flask_app
+
+
+@pytest.fixture
+def client(flask_app):
+    """Test client speaking HTTPS, so Talisman does not redirect."""
+    client = flask_app.test_client()
+    client.environ_base["wsgi.url_scheme"] = "https"
+    return client
+
+
+@pytest.fixture
+def auth_headers():
+    """Bearer header for a synthetic user id."""
+    pytest.importorskip("jwt")
+    from utils.jwt_handler import JWTHandler
+
+    token = JWTHandler.generate_access_token(4242, "contract-test@example.com")
+    return {"Authorization": f"Bearer {token}"}
+
+
+class FakeCache:
+    """In-memory stand-in for CacheService get/set and version counters."""
+
+    TTL_POLICIES = {"prediction_result": 7200}
+
+    def __init__(self):
+        self.store = {}
+        self.versions = {}
+
+    def is_available(self):
+        return True
+
+    def get_version(self, name):
+        return self.versions.get(name, 0)
+
+    def bump_version(self, name):
+        self.versions[name] = self.get_version(name) + 1
+        return self.versions[name]
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ttl=None):
+        self.store[key] = value
+        return True
+
+
+# --- events partitioned by type (chunk8-22) ---------------------------------
+
+def test_event_id_is_serial_in_composite_key():
+    """event_id keeps its sequence although (event_id, type) is the key."""
+    pytest.importorskip("sqlalchemy")
+    from sqlalchemy.dialects import postgresql
+    from sqlalchemy.schema import CreateTable
+    from models.orm.event import Event
+
+    table = Event.__table__
+    assert [c.name for c in table.primary_key.columns] == ["event_id", "type"]
+    assert table.autoincrement_column is table.c.event_id
+
+    ddl = str(CreateTable(table).compile(dialect=postgresql.dialect()))
+    assert "event_id SERIAL NOT NULL" in ddl
+    assert "PARTITION BY LIST (type)" in ddl
+
+
+def test_create_event_returns_generated_id(app):
+    """POST /events relies on create_event returning the new event_id."""
+    from models.event_model import EventModel
+
+    with app.test_request_context():
+        event = EventModel.create_event(
+            event_name="contract-test event",
+            event_date="2099-01-01",
+            event_type="promotion",
+            include_in_prediction=False,
+        )
+        try:
+            assert isinstance(event["event_id"], int)
+            assert EventModel.get_event_by_id(event["event_id"])["event_name"] == "contract-test event"
+        finally:
+            EventModel.delete_event(event["event_id"])
+
+
+# --- Prefer: respond-async on /api/predict (chunk6-20) ----------------------
+
+def test_predict_task_matches_sync_shape_and_fills_cache(monkeypatch):
+    """The Celery task returns the sync payload and caches it under the route's key."""
+    pytest.importorskip("celery")
+    pytest.importorskip("prophet")
+    import tasks.ml_tasks as ml_tasks
+    import utils.cache_service as cache_module
+
+    seen = {}
+    payload = {"chartData": [], "recommendations": [], "accuracy": 91.5}
+
+    class FakePredictionService:
+        def predict_stock(self, data):
+            seen.update(data)
+            return payload
+
+    cache = FakeCache()
+    monkeypatch.setattr(ml_tasks, "_prediction_service", FakePredictionService())
+    monkeypatch.setattr(cache_module, "get_cache_service", lambda: cache)
+
+    result = ml_tasks.predict_stock_task.run("SKU-1", 14, True, "prediction:key")
+
+    assert result == payload
+    assert seen == {"product_sku": "SKU-1", "days": 14, "fast": True}
+    assert cache.store["prediction:key"] == payload
+
+
+def test_respond_async_passes_fast_and_cache_key(app, client, auth_headers, monkeypatch):
+    """A 202 hands the task the same fast flag and cache key the sync path uses."""
+    import routes.prediction_routes as prediction_routes
+
+    calls = []
+
+    class FakeResult:
+        id = "task-123"
+
+    def fake_delay(*args):
+        calls.append(args)
+        return FakeResult()
+
+    cache = FakeCache()
+    monkeypatch.setattr(prediction_routes, "get_cache_service", lambda: cache)
+    monkeypatch.setattr(prediction_routes.predict_stock_task, "delay", fake_delay)
+
+    response = client.post(
+        "/api/predict",
+        json={"product_sku": "SKU-ASYNC", "days": 10, "fast": True},
+        headers={**auth_headers, "Prefer": "respond-async"},
+    )
+
+    assert response.status_code == 202
+    assert response.headers["Preference-Applied"] == "respond-async"
+    assert response.get_json()["status_url"] == "/api/predict/task/task-123"
+
+    sku, days, fast, cache_key = calls[0]
+    assert (sku, days, fast) == ("SKU-ASYNC", 10, True)
+    with app.test_request_context():
+        from models.transaction_model import TransactionModel
+        last_sale = TransactionModel.get_last_transaction_dates([sku]).get(sku)
+    assert cache_key == prediction_routes._prediction_cache_key(sku, days, fast, last_sale)
+
+
+# --- chat sessions scoped to the token's user (chunk6-19) -------------------
+
+class FakeChatService:
+    """Records which user every chat call was scoped to."""
+
+    def __init__(self):
+        self.users = []
+
+    def is_available(self):
+        return True
+
+    def send_message(self, message, user_id, session_id):
+        self.users.append(user_id)
+        return "ok"
+
+    def get_conversation_history(self, user_id, session_id):
+        self.users.append(user_id)
+        return []
+
+    def clear_session(self, user_id, session_id):
+        self.users.append(user_id)
+        return True
+
+
+def test_chat_ignores_client_supplied_user_id(flask_app, client, auth_headers, monkeypatch):
+    chat = FakeChatService()
+    monkeypatch.setattr(flask_app, "chat_service", chat, raising=False)
+
+    assert client.post("/api/chat", json={"message": "hi", "user_id": 1, "session_id": "s"},
+                       headers=auth_headers).status_code == 200
+    assert client.get("/api/chat/history/s?user_id=1", headers=auth_headers).status_code == 200
+    assert client.delete("/api/chat/s?user_id=1", headers=auth_headers).status_code == 200
+
+    assert chat.users == [4242, 4242, 4242]
+
+
+def test_chat_without_user_in_token_is_unauthorized(flask_app, client, monkeypatch):
+    from utils.jwt_handler import JWTHandler
+
+    chat = FakeChatService()
+    monkeypatch.setattr(flask_app, "chat_service", chat, raising=False)
+    headers = {"Authorization": f"Bearer {JWTHandler.generate_access_token(None, 'x@example.com')}"}
+
+    assert client.post("/api/chat", json={"message": "hi", "user_id": 1}, headers=headers).status_code == 401
+    assert client.get("/api/chat/history/s?user_id=1", headers=headers).status_code == 401
+    assert client.delete("/api/chat/s?user_id=1", headers=headers).status_code == 401
+    assert chat.users == []
+
+
+# --- holidays revalidated by ETag (chunk8-19) -------------------------------
+
+def test_holidays_revalidate_with_304(client, auth_headers, monkeypatch):
+    from services.event_service import EventService
+
+    builds = []
+
+    def fake_holidays():
+        builds.append(1)
+        return [{"event_id": 1, "event_name": "New Year", "event_date": "2026-01-01"}]
+
+    monkeypatch.setattr(EventService, "get_holidays_etag", staticmethod(lambda: "holiday-v1"))
+    monkeypatch.setattr(EventService, "get_holidays", staticmethod(fake_holidays))
+
+    first = client.get("/api/events/holidays", headers=auth_headers)
+    assert first.status_code == 200
+    assert first.get_json()[0]["event_name"] == "New Year"
+    assert first.headers["ETag"] == 'W/"holiday-v1"'
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    again = client.get("/api/events/holidays",
+                       headers={**auth_headers, "If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+    assert again.data == b""
+    assert builds == [1]
+
+    monkeypatch.setattr(EventService, "get_holidays_etag", staticmethod(lambda: "holiday-v2"))
+    changed = client.get("/api/events/holidays",
+                         headers={**auth_headers, "If-None-Match": first.headers["ETag"]})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] == 'W/"holiday-v2"'
+    assert builds == [1, 1]
+
+
+# --- opening hours written atomically (chunk8-18) ---------------------------
+
+def test_parse_opening_hours_validates_every_day():
+    pytest.importorskip("sqlalchemy")
+    from models.store_model import StoreModel
+
+    rows = StoreModel.parse_opening_hours({
+        "monday": {"open": "09:00", "close": "17:30"},
+        "Sunday": {"closed": True},
+    })
+    assert rows == [(0, 540, 1050, False), (6, None, None, True)]
+
+    for payload in (
+        {"Monday": {"open": "09:00", "close": "18:00"}, "Funday": {"closed": True}},
+        {"Monday": {"open": "9am", "close": "18:00"}},
+        {"Monday": "09:00-18:00"},
+        ["Monday"],
+    ):
+        with pytest.raises(ValueError):
+            StoreModel.parse_opening_hours(payload)
+
+
+def test_save_all_with_bad_hours_changes_nothing(app, client, auth_headers):
+    from models.store_model import StoreModel
+
+    created = client.post("/api/settings/store", json={"name": "Before"}, headers=auth_headers)
+    assert created.status_code == 201
+    store_id = created.get_json()["store"]["store_id"]
+    try:
+        response = client.put("/api/settings/save-all", headers=auth_headers, json={
+            "name": "After",
+            "opening_hours": {
+                "Monday": {"open": "08:00", "close": "16:00"},
+                "Tuesday": {"open": "25:00", "close": "16:00"},
+            },
+        })
+        assert response.status_code == 400
+
+        settings = client.get("/api/settings/store", headers=auth_headers).get_json()
+        assert settings["store"]["name"] == "Before"
+        assert settings["opening_hours"] == {}
+    finally:
+        with app.test_request_context():
+            StoreModel.delete_store(store_id)
+
+
+# --- request-scoped DB session (chunk8-16) ----------------------------------
+
+@pytest.fixture
+def pooled_engine(monkeypatch, tmp_path):
+    """SQLite-backed session factory whose pool checkouts can be inspected."""
+    pytest.importorskip("flask")
+    pytest.importorskip("sqlalchemy")
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import QueuePool
+    import utils.db_session as db_session
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool)
+    monkeypatch.setattr(db_session, "_SessionLocal", db_session.create_session_factory(engine))
+    yield engine
+    engine.dispose()
+
+
+def _pool_probe_app(pooled_engine, view_decorator=None):
+    """Bare app whose one view runs two session blocks and records the pool."""
+    from flask import Flask
+    from sqlalchemy import text
+    from utils.db_session import close_request_session, get_db_session
+
+    app = Flask(__name__)
+    app.teardown_request(close_request_session)
+    seen = {"connections": [], "checked_out": []}
+
+    def two_blocks():
+        for _ in range(2):
+            with get_db_session() as session:
+                session.execute(text("SELECT 1"))
+                seen["connections"].append(session.connection().connection.dbapi_connection)
+            seen["checked_out"].append(pooled_engine.pool.checkedout())
+        return "ok"
+
+    app.add_url_rule("/two-blocks", view_func=view_decorator(two_blocks) if view_decorator else two_blocks)
+    return app, seen
+
+
+def test_request_blocks_share_a_connection_until_teardown(pooled_engine):
+    app, seen = _pool_probe_app(pooled_engine)
+
+    assert app.test_client().get("/two-blocks").status_code == 200
+
+    first, second = seen["connections"]
+    assert first is second
+    assert seen["checked_out"] == [1, 1]
+    assert pooled_engine.pool.checkedout() == 0
+
+
+def test_without_request_session_returns_connection_after_each_block(pooled_engine):
+    from utils.db_session import without_request_session
+
+    app, seen = _pool_probe_app(pooled_engine, without_request_session)
+
+    assert app.test_client().get("/two-blocks").status_code == 200
+
+    assert seen["checked_out"] == [0, 0]
+    assert pooled_engine.pool.checkedout() == 0
+
+
+# --- SKU -> product_id cache (chunk5-18) ------------------------------------
+
+def test_deleting_a_product_drops_cached_product_ids(monkeypatch):
+    pytest.importorskip("prophet")
+    import ml_engine
+    from utils.cache_service import PRODUCTS_VERSION_NAME
+
+    cache = FakeCache()
+    monkeypatch.setattr(ml_engine, "get_cache_service", lambda: cache)
+    ids = iter([11, 12])
+
+    assert ml_engine.resolve_product_id("SKU-DEL", lambda: next(ids)) == 11
+    assert ml_engine.resolve_product_id("SKU-DEL", lambda: next(ids)) == 11
+
+    cache.bump_version(PRODUCTS_VERSION_NAME)
+    assert ml_engine.resolve_product_id("SKU-DEL", lambda: next(ids)) == 12
+
+
+def test_covering_index_has_one_name():
+    pytest.importorskip("sqlalchemy")
+    from pathlib import Path
+    from models.orm.transaction import Transaction
+
+    name = "idx_transactions_product_date"
+    assert name in {index.name for index in Transaction.__table__.indexes}
+    here = Path(__file__).parent
+    assert f"CREATE INDEX {name} ON" in (here / "schema.sql").read_text()
+    assert f"CREATE INDEX IF NOT EXISTS {name} ON" in (here / "setup_optimization.sh").read_text()
+
+
+
+# --- product reads memoized per version (chunk9-1) --------------------------
+
+def test_product_writes_invalidate_reads_with_one_version_bump(monkeypatch):
+    """Writes bump a counter instead of scanning Redis for product_model:* keys."""
+    pytest.importorskip("sqlalchemy")
+    import contextlib
+    import models.product_model as product_model
+    import utils.cache_service as cache_module
+    from models.product_model import PRODUCT_CACHE_VERSION_NAME, ProductModel
+
+    counts = iter([3, 4])
+
+    class FakeSession:
+        def query(self, *columns):
+            return self
+
+        def scalar(self):
+            return next(counts)
+
+    cache = FakeCache()  # no delete_pattern: a SCAN-based invalidation would fail
+    monkeypatch.setattr(cache_module, "get_cache_service", lambda: cache)
+    monkeypatch.setattr(product_model, "get_db_session", lambda: contextlib.nullcontext(FakeSession()))
+
+    assert ProductModel.get_product_count() == 3
+    assert ProductModel.get_product_count() == 3
+
+    cache_module.bumps_version(PRODUCT_CACHE_VERSION_NAME)(lambda: None)()
+    assert cache.versions == {PRODUCT_CACHE_VERSION_NAME: 1}
+    assert ProductModel.get_product_count() == 4
+
+# --- transactions partitioned by month (chunk5-24) --------------------------
+
+def test_transaction_model_matches_partitioned_schema():
+    pytest.importorskip("sqlalchemy")
+    from sqlalchemy.dialects import postgresql
+    from sqlalchemy.schema import CreateTable
+    from models.orm.transaction import Transaction
+
+    table = Transaction.__table__
+    assert [c.name for c in table.primary_key.columns] == ["transaction_id", "transaction_date"]
+    assert table.autoincrement_column is table.c.transaction_id
+
+    ddl = str(CreateTable(table).compile(dialect=postgresql.dialect()))
+    assert "transaction_id SERIAL NOT NULL" in ddl
+    assert "PARTITION BY RANGE (transaction_date)" in ddl
+
+
+def test_create_all_builds_the_sales_view():
+    """The ORM path creates daily_sales_by_product, which the trainers read by default."""
+    pytest.importorskip("sqlalchemy")
+    from sqlalchemy import create_mock_engine
+    from models.orm.base import Base
+    from models.orm import event, product, transaction, user  # noqa: F401
+
+    statements = []
+    engine = create_mock_engine(
+        "postgresql://", lambda sql, *a, **kw: statements.append(str(sql.compile(dialect=engine.dialect)))
+    )
+    Base.metadata.create_all(engine, checkfirst=False)
+
+    tables = next(i for i, s in enumerate(statements) if "CREATE TABLE transactions (" in s)
+    view = next(i for i, s in enumerate(statements) if "MATERIALIZED VIEW daily_sales_by_product" in s)
+    index = next(i for i, s in enumerate(statements) if "UNIQUE INDEX idx_daily_sales_product_ds" in s)
+    assert tables < view < index
+
+
+def test_partitions_are_planned_month_by_month():
+    pytest.importorskip("psycopg2")
+    from datetime import date
+    from utils.partitions import _month_start, partition_name
+
+    starts = [_month_start(date(2026, 11, 17), offset) for offset in range(4)]
+    assert [partition_name(start) for start in starts] == [
+        "transactions_2026_11", "transactions_2026_12", "transactions_2027_01", "transactions_2027_02",
+    ]
+
+
+# --- nightly training (chunk7-5, chunk7-6) ----------------------------------
+
+def _no_db_engine():
+    """Engine factory for training tests whose sales and holidays are faked."""
+    return None
+
+
+@pytest.fixture
+def fake_training_data(monkeypatch):
+    """Serve every SKU's sales from one fake bulk query; return its call log."""
+    pytest.importorskip("prophet")
+    import pandas as pd
+    import ml_engine
+
+    bulk_calls = []
+
+    def fake_bulk(self, skus):
+        skus = list(skus)
+        bulk_calls.append(skus)
+        return {sku: pd.DataFrame() for sku in skus}
+
+    def per_sku(self, product_sku):
+        raise AssertionError(f"per-SKU sales query for {product_sku}")
+
+    monkeypatch.setattr(ml_engine.MLEngine, "get_sales_data_bulk", fake_bulk)
+    monkeypatch.setattr(ml_engine.MLEngine, "get_sales_data", per_sku)
+    monkeypatch.setattr(ml_engine.MLEngine, "get_holidays", lambda self: None)
+    return bulk_calls
+
+
+def test_nightly_training_uses_one_bulk_sales_query(fake_training_data, monkeypatch):
+    """train_all_models fetches every SKU's sales in one query and trains them in a pool."""
+    pytest.importorskip("celery")
+    import ml_engine
+    import tasks.ml_tasks as ml_tasks
+    from models.product_model import ProductModel
+    from services.prediction_service import PredictionService
+
+    monkeypatch.setattr(ml_engine.os, "cpu_count", lambda: 2)
+    monkeypatch.setattr(ProductModel, "get_all_products", staticmethod(lambda: [{"sku": "A"}, {"sku": "B"}]))
+    monkeypatch.setattr(ml_tasks, "refresh_sales_view", lambda: {"status": "skipped"})
+    monkeypatch.setattr(ml_tasks, "_prediction_service", PredictionService(ml_engine.MLEngine(_no_db_engine)))
+
+    result = ml_tasks.train_all_models.run()
+
+    assert result["status"] == "completed"
+    assert fake_training_data == [["A", "B"]]
+    assert {sku: r["status"] for sku, r in result["results"].items()} == {"A": "skipped", "B": "skipped"}
+
+
+
+def test_train_task_uses_the_engine_trainer_on_unfiltered_sales(monkeypatch):
+    """The per-SKU task and the nightly run share one trainer, so their data_hash agrees."""
+    pytest.importorskip("celery")
+    pytest.importorskip("prophet")
+    import contextlib
+    import pandas as pd
+    import ml_engine
+    import tasks.ml_tasks as ml_tasks
+    from services.prediction_service import PredictionService
+
+    # Day 4 is a far outlier; dropping it is the trainer's job, not the query's
+    sales = pd.DataFrame({
+        "ds": pd.date_range("2026-01-01", periods=6),
+        "y": [5, 6, 5, 5000, 6, 5],
+        "promo": [0] * 6,
+    })
+    seen = []
+
+    def fake_train(self, product_sku, sales_df=None, holidays=None):
+        seen.append(sales_df)
+        return {"status": "success", "factor": 1.0, "accuracy": 90.0}
+
+    monkeypatch.setattr(ml_tasks, "borrow", lambda **kw: contextlib.nullcontext())
+    monkeypatch.setattr(ml_tasks, "get_sales_data_for_task", lambda sku, conn=None: sales.copy())
+    monkeypatch.setattr(ml_tasks, "get_holidays_for_task", lambda conn=None: None)
+    monkeypatch.setattr(ml_engine.MLEngine, "train_product_model", fake_train)
+    monkeypatch.setattr(ml_tasks, "_prediction_service", PredictionService(ml_engine.MLEngine(_no_db_engine)))
+
+    result = ml_tasks.train_product_model_task.run("A")
+
+    assert result["status"] == "success" and result["product_sku"] == "A"
+    assert len(seen) == 1
+    assert ml_engine.MLEngine._training_data_hash(seen[0], None) == \
+        ml_engine.MLEngine._training_data_hash(sales, None)
+
+def _train_all_in_daemon(queue):
+    import ml_engine
+
+    try:
+        results = ml_engine.MLEngine(_no_db_engine).train_all(["A", "B"], workers=2)
+        queue.put({sku: r["status"] for sku, r in results.items()})
+    except BaseException as e:
+        queue.put(repr(e))
+
+
+def test_train_all_runs_inside_a_daemonic_worker(fake_training_data):
+    """Celery prefork workers are daemonic; train_all must not fork a pool there."""
+    import multiprocessing
+
+    if "fork" not in multiprocessing.get_all_start_methods():
+        pytest.skip("needs the fork start method")
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    worker = context.Process(target=_train_all_in_daemon, args=(queue,), daemon=True)
+    worker.start()
+    try:
+        outcome = queue.get(timeout=60)
+    finally:
+        worker.join(timeout=10)
+
+    assert outcome == {"A": "skipped", "B": "skipped"}
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""
+Checks that the numba kernels and their numpy fallbacks agree.
+
+Run with: python -m pytest -q test_ml_kernels.py
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import ml_kernels  # noqa: E402
+
+
+SALES = np.array([3, 5, 4, 6, 5, 4, 80, 5, 6, 4, 5, 3, 0, 4], dtype=np.float64)
+
+
+def test_log_sigma_filter_fallback():
+    y_log, keep = ml_kernels._log_sigma_filter_numpy(SALES, 2.0)
+
+    np.testing.assert_allclose(y_log, np.log1p(SALES))
+    mu, sd = y_log.mean(), y_log.std(ddof=1)
+    np.testing.assert_array_equal(keep, np.abs(y_log - mu) <= 2.0 * sd)
+    assert not keep[6]
+
+
+def test_log_sigma_filter_constant_series_keeps_everything():
+    _, keep = ml_kernels._log_sigma_filter_numpy(np.full(5, 7.0), 3.5)
+    assert keep.all()
+
+
+def test_correction_metrics_fallback():
+    actual = np.array([10.0, 20.0, 30.0, 0.0])
+    pred = np.array([8.0, 25.0, 30.0, 1.0])
+    factor, mae, mape = ml_kernels._correction_metrics_numpy(
+        np.log1p(actual), np.log1p(pred), 0.5, 2.0
+    )
+
+    assert factor == pytest.approx(np.median(actual / (pred + 1e-6)))
+    assert mae == pytest.approx(np.abs(actual - pred).mean())
+    eps = np.finfo(np.float64).eps
+    assert mape == pytest.approx((np.abs(actual - pred) / np.maximum(actual, eps)).mean())
+
+
+def test_correction_factor_is_clamped():
+    factor, _, _ = ml_kernels._correction_metrics_numpy(
+        np.log1p(np.array([100.0, 100.0])), np.log1p(np.array([1.0, 1.0])), 0.5, 2.0
+    )
+    assert factor == 2.0
+
+
+def test_holt_winters_fit_fallback_matches_grid_loop():
+    rng = np.random.default_rng(7)
+    y = 10 + 3 * np.sin(np.arange(42) * 2 * np.pi / 7) + rng.normal(0, 1, 42)
+    alphas, betas, gammas = np.array([0.1, 0.3, 0.5]), np.array([0.01, 0.1]), np.array([0.1, 0.3])
+
+    best = None
+    for a in alphas:
+        for b in betas:
+            for g in gammas:
+                fitted, _ = ml_kernels.holt_winters_additive(y, 0, 7, a, b, g, 0.9)
+                sse = ((y[7:] - fitted[7:]) ** 2).sum()
+                if best is None or sse < best[0]:
+                    best = (sse, a, b, g)
+    ref_fitted, ref_forecast = ml_kernels.holt_winters_additive(y, 10, 7, *best[1:], 0.9)
+
+    fitted, forecast, alpha = ml_kernels._holt_winters_fit_numpy(y, 10, 7, alphas, betas, gammas, 0.9)
+
+    assert alpha == best[1]
+    np.testing.assert_allclose(fitted, ref_fitted)
+    np.testing.assert_allclose(forecast, ref_forecast)
+
+
+@pytest.mark.skipif(not ml_kernels.HAVE_NUMBA, reason="numba not installed")
+def test_jitted_kernels_match_fallbacks():
+    y_log, keep = ml_kernels.log_sigma_filter(SALES, 2.0)
+    ref_log, ref_keep = ml_kernels._log_sigma_filter_numpy(SALES, 2.0)
+    np.testing.assert_allclose(y_log, ref_log)
+    np.testing.assert_array_equal(keep, ref_keep)
+
+    true_log, pred_log = np.log1p(SALES), np.log1p(SALES[::-1].copy())
+    np.testing.assert_allclose(
+        ml_kernels.correction_metrics(true_log, pred_log, 0.5, 2.0),
+        ml_kernels._correction_metrics_numpy(true_log, pred_log, 0.5, 2.0),
+    )
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -1,5 +1,5 @@
 from utils.config import get_config, Config, DevelopmentConfig, ProductionConfig, TestingConfig
-from utils.db import get_db_connection, get_db_cursor, db_query, db_execute
+from utils.db import get_db_connection, release_db_connection, borrow, get_db_cursor, db_query, db_execute, db_copy_to_dataframe
 from utils.jwt_handler import JWTHandler, require_auth, optional_auth
 from utils.password_handler import PasswordHandler
 from utils.validators import (
@@ -20,9 +20,12 @@ __all__ = [
     'ProductionConfig',
     'TestingConfig',
     'get_db_connection',
+    'release_db_connection',
+    'borrow',
     'get_db_cursor',
     'db_query',
     'db_execute',
+    'db_copy_to_dataframe',
     'JWTHandler',
     'require_auth',
     'optional_auth',
@@ -1,14 +1,27 @@
 import redis
-import json
+import orjson
 import hashlib
 import time
 import logging
 from functools import wraps
 from typing import Any, Optional, Callable
 from utils.config import get_config
+from utils.json_provider import orjson_dumps
 
 logger = logging.getLogger(__name__)
 
+# Shared version counter bumped whenever events change, so every process
+# drops its cached prediction holidays
+HOLIDAYS_VERSION_NAME = 'holidays'
+# Without Redis there is no version, so cached holidays get a short TTL;
+# with it they are still reloaded after HOLIDAYS_MAX_AGE in case events
+# changed outside the API
+HOLIDAYS_CACHE_TTL = 60
+HOLIDAYS_MAX_AGE = 300
+# Bumped when a product is deleted or its SKU renamed, so every process
+# drops its cached SKU -> product_id mappings
+PRODUCTS_VERSION_NAME = 'products'
+
 class CacheService:
     """Redis-based caching service with TTL policies"""
     
@@ -56,7 +69,7 @@ class CacheService:
             value = self.client.get(key)
             if value:
                 logger.debug(f"Cache HIT: {key}")
-                return json.loads(value)
+                return orjson.loads(value)
             logger.debug(f"Cache MISS: {key}")
             return None
         except Exception as e:
@@ -69,7 +82,8 @@ class CacheService:
             return False
         
         try:
-            json_value = json.dumps(value)
+            # Same encoder as the API responses (numpy, Decimal, datetime)
+            json_value = orjson_dumps(value)
             if ttl is None:
                 ttl = self.TTL_POLICIES.get('short_lived', 300)
             
@@ -99,16 +113,92 @@ class CacheService:
             return 0
         
         try:
-            keys = self.client.keys(pattern)
-            if keys:
-                deleted = self.client.delete(*keys)
+            # SCAN instead of KEYS so Redis is never blocked walking the
+            # whole keyspace; matches are unlinked in pipelined batches
+            deleted = 0
+            batch = []
+            for key in self.client.scan_iter(match=pattern, count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    deleted += self._unlink(batch)
+                    batch = []
+            if batch:
+                deleted += self._unlink(batch)
+            if deleted:
                 logger.debug(f"Cache DELETE PATTERN: {pattern} ({deleted} keys)")
-                return deleted
-            return 0
+            return deleted
         except Exception as e:
             logger.warning(f"Cache delete pattern error for {pattern}: {e}")
             return 0
     
+    def _unlink(self, keys: list) -> int:
+        """Unlink keys in one pipelined round trip; returns how many existed"""
+        pipe = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.unlink(key)
+        return sum(pipe.execute())
+    
+    def get_version(self, name: str) -> Optional[int]:
+        """Get a shared version counter (None if Redis is unavailable)"""
+        if not self.is_available():
+            return None
+        
+        try:
+            value = self.client.get(f"version:{name}")
+            return int(value) if value else 0
+        except Exception as e:
+            logger.warning(f"Cache version get error for {name}: {e}")
+            return None
+    
+    def bump_version(self, name: str) -> Optional[int]:
+        """Increment a shared version counter so other processes reload"""
+        if not self.is_available():
+            return None
+        
+        try:
+            version = self.client.incr(f"version:{name}")
+            logger.debug(f"Cache VERSION BUMP: {name} -> {version}")
+            return version
+        except Exception as e:
+            logger.warning(f"Cache version bump error for {name}: {e}")
+            return None
+    
+    def publish(self, channel: str, message: str) -> bool:
+        """Publish a message to other processes (False if Redis is unavailable)"""
+        if not self.is_available():
+            return False
+        
+        try:
+            self.client.publish(channel, message)
+            return True
+        except Exception as e:
+            logger.warning(f"Cache publish error on {channel}: {e}")
+            return False
+    
+    def subscribe(self, channel: str, handler: Callable[[str], None]) -> Optional[Any]:
+        """
+        Call handler(message) for every message on channel.
+        
+        Messages are read on a daemon thread; returns that thread, or None
+        if Redis is unavailable.
+        """
+        if not self.is_available():
+            return None
+        
+        def on_message(message):
+            try:
+                handler(message['data'])
+            except Exception as e:
+                logger.warning(f"Cache subscriber error on {channel}: {e}")
+        
+        try:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{channel: on_message})
+            return pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+        except Exception as e:
+            logger.warning(f"Cache subscribe error on {channel}: {e}")
+            return None
+    
     def clear(self) -> bool:
         """Clear all cache"""
         if not self.is_available():
@@ -157,7 +247,8 @@ def generate_cache_key(*args, prefix: str = '', **kwargs) -> str:
 def cached_result(
     ttl_policy: str = 'short_lived',
     key_prefix: str = '',
-    invalidate_patterns: Optional[list] = None
+    invalidate_patterns: Optional[list] = None,
+    version_name: Optional[str] = None
 ) -> Callable:
     """
     Decorator for caching function results.
@@ -166,6 +257,8 @@ def cached_result(
         ttl_policy: Key from TTL_POLICIES dict
         key_prefix: Custom prefix for cache key
         invalidate_patterns: List of cache patterns to invalidate on this call
+        version_name: Shared version counter folded into the key; writers
+            invalidate every entry at once with bump_version (see bumps_version)
     """
     def decorator(func: Callable) -> Callable:
         @wraps(func)
@@ -178,6 +271,13 @@ def cached_result(
             # Generate cache key
             func_name = func.__name__
             prefix = key_prefix or func_name
+            if version_name:
+                # Entries under an older version are never read again and
+                # expire by TTL, so invalidation is a single INCR
+                version = cache_service.get_version(version_name)
+                if version is None:
+                    return func(*args, **kwargs)
+                prefix = f"{prefix}:v{version}"
             cache_key = generate_cache_key(*args, prefix=prefix, **kwargs)
             
             # Try to get from cache
@@ -201,6 +301,30 @@ def cached_result(
     return decorator
 
 
+def bumps_version(*names: str) -> Callable:
+    """
+    Decorator for writes that invalidates version-keyed cached_result entries.
+
+    Bumps the counters after the wrapped function returns, i.e. after its
+    get_db_session() block has committed, so a concurrent read cannot
+    re-cache the old rows. Nothing is bumped if the function raises.
+    
+    Args:
+        names: Version counters to bump (cached_result's version_name)
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            result = func(*args, **kwargs)
+            cache_service = get_cache_service()
+            for name in names:
+                cache_service.bump_version(name)
+            return result
+        
+        return wrapper
+    return decorator
+
+
 # Global cache instance
 _cache_instance: Optional[CacheService] = None
 
@@ -15,8 +15,29 @@ class Config:
     DB_PASSWORD = os.getenv('DB_PASSWORD', 'mysecretpassword')
     DB_PORT = os.getenv('DB_PORT', '5432')
 
+    # Connection pool sizing (per process). Keep
+    # workers * (DB_POOL_MAX_CONN + DB_POOL_SIZE + DB_MAX_OVERFLOW) below
+    # PostgreSQL's max_connections (or pgbouncer's pool size)
+    DB_POOL_MIN_CONN = int(os.getenv('DB_POOL_MIN_CONN', '5'))
+    DB_POOL_MAX_CONN = int(os.getenv('DB_POOL_MAX_CONN', '25'))
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '20'))
+    # Recycle pooled SQLAlchemy connections before idle timeouts on the
+    # server or a proxy drop them
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+    # Compiled-statement LRU per engine; sized to hold every ORM statement
+    DB_QUERY_CACHE_SIZE = int(os.getenv('DB_QUERY_CACHE_SIZE', '2000'))
+    # Count compiled-cache hits/misses per process (see statement_cache_stats)
+    DB_CACHE_STATS = os.getenv('DB_CACHE_STATS', 'false').lower() == 'true'
+    # PREPARE hot psycopg2 queries once per connection; only safe when
+    # connecting to PostgreSQL directly (not via pgbouncer transaction pooling)
+    DB_PREPARED_STATEMENTS = os.getenv('DB_PREPARED_STATEMENTS', 'false').lower() == 'true'
+
     # Gemini AI Configuration
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
+    # Seconds before a Gemini call gives up, so a slow upstream cannot pin
+    # a gunicorn worker thread indefinitely
+    GEMINI_REQUEST_TIMEOUT = float(os.getenv('GEMINI_REQUEST_TIMEOUT', '30'))
 
     # JWT Configuration
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', None)
@@ -44,6 +65,13 @@ class Config:
     # Flask Configuration
     JSON_SORT_KEYS = False
 
+    # Response compression (Flask-Compress): brotli for clients that accept
+    # it, gzip otherwise; tiny bodies are not worth the CPU
+    COMPRESS_ALGORITHM = ['br', 'gzip']
+    COMPRESS_MIN_SIZE = 500
+    COMPRESS_BR_LEVEL = 4
+    COMPRESS_LEVEL = 6
+
     # API Configuration
     API_MAX_FORECAST_DAYS = 365
     API_MIN_FORECAST_DAYS = 1
@@ -63,6 +91,8 @@ class Config:
     # Model Storage Configuration
     MODELS_DIR = os.getenv('MODELS_DIR', '/app/models')
     MODELS_META_DIR = os.path.join(MODELS_DIR, 'meta')
+    # Finished Prophet forecasts, shared by all workers on the host
+    FORECAST_CACHE_DIR = os.path.join(MODELS_DIR, 'forecasts')
 
     # Scheduled Tasks Configuration
     from celery.schedules import crontab
@@ -71,8 +101,23 @@ class Config:
             'task': 'tasks.ml_tasks.train_all_models',
             'schedule': crontab(hour=2, minute=0),  # Run at 2:00 AM UTC
         },
+        'refresh-daily-sales-view': {
+            'task': 'tasks.ml_tasks.refresh_sales_view',
+            'schedule': crontab(minute='*/5'),  # Every 5 minutes
+        },
+        'create-transaction-partitions': {
+            'task': 'tasks.ml_tasks.create_transaction_partitions',
+            'schedule': crontab(hour=1, minute=0),  # Daily at 1:00 AM UTC
+        },
     }
 
+    # Monthly transactions partitions kept ready beyond the current month
+    TRANSACTION_PARTITIONS_AHEAD = int(os.getenv('TRANSACTION_PARTITIONS_AHEAD', '3'))
+
+    # Read Celery-side sales history from the daily_sales_by_product
+    # materialized view instead of aggregating transactions every time
+    SALES_MATVIEW_ENABLED = os.getenv('SALES_MATVIEW_ENABLED', 'true').lower() == 'true'
+
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
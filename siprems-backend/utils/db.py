@@ -1,38 +1,142 @@
+import io
+import re
+import threading
+import weakref
+import pandas as pd
 import psycopg2
 import psycopg2.extras
-from contextlib import contextmanager
+import psycopg2.pool
+from contextlib import contextmanager, nullcontext
 from utils.config import get_config
 
 config = get_config()
 
+# Sized for up to ~100 request threads per process (override via env)
+POOL_MIN_CONN = config.DB_POOL_MIN_CONN
+POOL_MAX_CONN = config.DB_POOL_MAX_CONN
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Server-side prepared statements are per connection, so they only work
+# when each pooled connection maps to one backend (not through pgbouncer in
+# transaction mode); off unless DB_PREPARED_STATEMENTS is set
+PREPARED_STATEMENTS_ENABLED = config.DB_PREPARED_STATEMENTS
+
+# connection -> names already PREPAREd on it
+_prepared = weakref.WeakKeyDictionary()
+_prepared_lock = threading.Lock()
+
+
+def get_db_pool():
+    """Get the process-wide connection pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = psycopg2.pool.ThreadedConnectionPool(
+                    minconn=POOL_MIN_CONN,
+                    maxconn=POOL_MAX_CONN,
+                    host=config.DB_HOST,
+                    port=config.DB_PORT,
+                    database=config.DB_NAME,
+                    user=config.DB_USER,
+                    password=config.DB_PASSWORD
+                )
+    return _pool
+
+def reset_db_pool():
+    """
+    Forget the inherited pool in a freshly forked worker.
+
+    The parent's sockets are left untouched (closing them here would
+    terminate the parent's sessions); the worker lazily builds its own pool.
+    """
+    global _pool
+    _pool = None
+
 def get_db_connection():
-    """Get a database connection with current configuration"""
-    conn = psycopg2.connect(
-        host=config.DB_HOST,
-        database=config.DB_NAME,
-        user=config.DB_USER,
-        password=config.DB_PASSWORD
-    )
-    return conn
+    """
+    Borrow a pooled database connection.
+
+    Callers must hand it back with release_db_connection(); prefer borrow().
+    """
+    return get_db_pool().getconn()
+
+def release_db_connection(conn):
+    """Return a connection to the pool, discarding it if it was closed"""
+    get_db_pool().putconn(conn, close=bool(conn.closed))
 
 @contextmanager
-def get_db_cursor(commit=True):
-    """Context manager for database operations"""
+def borrow(autocommit=False):
+    """
+    Context manager that borrows a pooled connection and always returns it.
+
+    With autocommit=True each statement runs on its own, so read-only work
+    skips the BEGIN/ROLLBACK round trips; the flag is reset before the
+    connection goes back to the pool.
+    """
     conn = get_db_connection()
     try:
-        cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        yield cur
-        if commit:
-            conn.commit()
-    except Exception as e:
-        if commit:
-            conn.rollback()
-        raise e
+        if autocommit:
+            conn.autocommit = True
+        yield conn
     finally:
-        cur.close()
-        conn.close()
+        if not conn.closed:
+            if autocommit:
+                conn.autocommit = False
+            conn.rollback()
+        release_db_connection(conn)
+
+@contextmanager
+def get_db_cursor(commit=True, conn=None, cursor_factory=psycopg2.extras.RealDictCursor, read_only=False):
+    """
+    Context manager for database operations.
 
-def db_query(query, params=None, fetch_all=True, commit=False):
+    Pass an already borrowed `conn` to run several helpers on one connection,
+    cursor_factory=None for a plain tuple cursor, and read_only=True to run
+    a freshly borrowed connection in autocommit mode.
+    """
+    if read_only:
+        commit = False
+    with (borrow(autocommit=read_only) if conn is None else nullcontext(conn)) as conn:
+        cur = conn.cursor(cursor_factory=cursor_factory)
+        try:
+            yield cur
+            if commit:
+                conn.commit()
+        except Exception as e:
+            if commit:
+                conn.rollback()
+            raise e
+        finally:
+            cur.close()
+
+def _execute_prepared(cur, name, query, params):
+    """
+    Run query as the prepared statement `name`, preparing it on first use.
+
+    The %s placeholders are rewritten to $1..$n for PREPARE, so callers keep
+    a single query string either way.
+    """
+    conn = cur.connection
+    with _prepared_lock:
+        names = _prepared.setdefault(conn, set())
+        is_prepared = name in names
+
+    if not is_prepared:
+        counter = iter(range(1, query.count('%s') + 1))
+        positional = re.sub(r'%s', lambda _: f'${next(counter)}', query)
+        cur.execute(f"PREPARE {name} AS {positional}")
+        with _prepared_lock:
+            names.add(name)
+
+    if params:
+        cur.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+    else:
+        cur.execute(f"EXECUTE {name}")
+
+def db_query(query, params=None, fetch_all=True, commit=False, conn=None, as_dict=True, read_only=False, prepare=None):
     """
     Execute a database query and return results.
     
@@ -41,26 +145,36 @@ def db_query(query, params=None, fetch_all=True, commit=False):
         params: Query parameters tuple
         fetch_all: If True, fetch all rows; if False, fetch one row
         commit: If True, commit the transaction
+        conn: Optional connection from borrow() to reuse
+        as_dict: If False, use a tuple cursor and return plain tuples,
+            skipping the per-row dict for hot or wide queries
+        read_only: If True, run in autocommit mode (no BEGIN/ROLLBACK)
+        prepare: Statement name; when prepared statements are enabled the
+            query is PREPAREd once per connection and then EXECUTEd
     
     Returns:
-        List of dicts (if fetch_all=True) or single dict (if fetch_all=False)
+        List of dicts/tuples (if fetch_all=True) or a single dict/tuple
+        (if fetch_all=False)
     
     Raises:
         Exception: Database error
     """
-    with get_db_cursor(commit=commit) as cur:
+    cursor_factory = psycopg2.extras.RealDictCursor if as_dict else None
+    with get_db_cursor(commit=commit, conn=conn, cursor_factory=cursor_factory, read_only=read_only) as cur:
         try:
-            if params:
+            if prepare and PREPARED_STATEMENTS_ENABLED:
+                _execute_prepared(cur, prepare, query, params)
+            elif params:
                 cur.execute(query, params)
             else:
                 cur.execute(query)
             
             if fetch_all:
                 result = cur.fetchall()
-                return [dict(row) for row in result]
+                return [dict(row) for row in result] if as_dict else result
             else:
                 result = cur.fetchone()
-                return dict(result) if result else None
+                return dict(result) if result and as_dict else result
         except Exception as e:
             raise e
 
@@ -90,3 +204,34 @@ def db_execute(query, params=None):
             return dict(result) if result else None
         except Exception as e:
             raise e
+
+def db_copy_to_dataframe(query, params=None, columns=None, parse_dates=None, conn=None, dtype=None):
+    """
+    Stream a SELECT through COPY ... TO STDOUT straight into a DataFrame.
+    
+    Avoids building a dict per row for large result sets.
+    
+    Args:
+        query: SELECT statement (without trailing semicolon)
+        params: Query parameters tuple
+        columns: Column names for the resulting DataFrame
+        parse_dates: Columns to parse as datetimes
+        conn: Optional connection from borrow() to reuse
+        dtype: Optional column -> dtype mapping, parsed directly by the CSV reader
+    
+    Returns:
+        pandas DataFrame (empty, with `columns`, if no rows)
+    
+    Raises:
+        Exception: Database error
+    """
+    with (borrow(autocommit=True) if conn is None else nullcontext(conn)) as conn:
+        with conn.cursor() as cur:
+            bound = cur.mogrify(query, params).decode('utf-8')
+            buf = io.StringIO()
+            cur.copy_expert(f"COPY ({bound}) TO STDOUT WITH (FORMAT CSV)", buf)
+    
+    buf.seek(0)
+    if not buf.getvalue():
+        return pd.DataFrame(columns=columns)
+    return pd.read_csv(buf, names=columns, parse_dates=parse_dates, dtype=dtype)
@@ -1,8 +1,12 @@
 """Database session management with SQLAlchemy ORM."""
 
-from typing import Generator
+import threading
+from collections import Counter
+from functools import wraps
+from typing import Callable, Dict, Generator, Optional
 from contextlib import contextmanager
 
+from flask import g, has_request_context
 from sqlalchemy import create_engine, event
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
@@ -35,10 +39,15 @@ def create_db_engine(config=None) -> Engine:
     engine = create_engine(
         database_url,
         poolclass=QueuePool,
-        pool_size=10,
-        max_overflow=20,
-        pool_recycle=3600,
+        pool_size=getattr(config, 'DB_POOL_SIZE', 10),
+        max_overflow=getattr(config, 'DB_MAX_OVERFLOW', 20),
+        pool_recycle=getattr(config, 'DB_POOL_RECYCLE', 1800),
         pool_pre_ping=True,
+        query_cache_size=getattr(config, 'DB_QUERY_CACHE_SIZE', 2000),
+        # Multi-row INSERTs go out as paged VALUES lists and other
+        # executemany calls through psycopg2's execute_batch
+        executemany_mode="values_plus_batch",
+        executemany_batch_page_size=500,
         echo=False,
     )
 
@@ -47,9 +56,47 @@ def create_db_engine(config=None) -> Engine:
         """Set connection defaults for PostgreSQL."""
         pass
 
+    if getattr(config, 'DB_CACHE_STATS', False):
+        event.listen(engine, "after_cursor_execute", _count_cache_outcome)
+
     return engine
 
 
+# Compiled-cache outcomes for this process, counted only when DB_CACHE_STATS is on
+_cache_stats: Counter = Counter()
+_cache_stats_lock = threading.Lock()
+
+
+def _count_cache_outcome(conn, cursor, statement, parameters, context, executemany) -> None:
+    """after_cursor_execute hook: record whether the statement's compilation was cached."""
+    dialect = context.dialect
+    outcome = {
+        dialect.CACHE_HIT: "hit",
+        dialect.CACHE_MISS: "miss",
+    }.get(context.cache_hit, "uncached")
+    with _cache_stats_lock:
+        _cache_stats[outcome] += 1
+
+
+def statement_cache_stats() -> Dict[str, float]:
+    """
+    Compiled-statement cache counters since process start.
+
+    Returns:
+        Dictionary with hit, miss and uncached counts and the hit ratio of
+        cacheable statements (empty counts unless DB_CACHE_STATS is on).
+    """
+    with _cache_stats_lock:
+        hits, misses = _cache_stats["hit"], _cache_stats["miss"]
+        uncached = _cache_stats["uncached"]
+    return {
+        "hit": hits,
+        "miss": misses,
+        "uncached": uncached,
+        "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+    }
+
+
 def create_session_factory(engine: Engine = None) -> sessionmaker:
     """
     Create a SQLAlchemy session factory.
@@ -63,7 +110,9 @@ def create_session_factory(engine: Engine = None) -> sessionmaker:
     if engine is None:
         engine = create_db_engine()
 
-    return sessionmaker(bind=engine, expire_on_commit=False)
+    # Writers flush explicitly before reading back, so skip the implicit
+    # flush check on every query
+    return sessionmaker(bind=engine, expire_on_commit=False, autoflush=False)
 
 
 # Global session factory
@@ -103,11 +152,73 @@ def get_session() -> Session:
     return _SessionLocal()
 
 
+def _request_session() -> Optional[Session]:
+    """
+    Session shared by every get_db_session() block in the current request.
+
+    Created on first use and bound to one pooled connection that stays
+    checked out until close_request_session() runs at request teardown.
+    Outside a Flask request (Celery, scripts, worker threads) or in a view
+    marked with without_request_session, returns None.
+    """
+    if not has_request_context() or g.get("_db_session_disabled"):
+        return None
+    session = g.get("_db_session")
+    if session is None:
+        if _SessionLocal is None:
+            raise RuntimeError(
+                "Database session not initialized. Call init_db_session() first."
+            )
+        connection = _SessionLocal.kw["bind"].connect()
+        session = g._db_session = _SessionLocal(bind=connection)
+    return session
+
+
+def close_request_session(exc: Optional[BaseException] = None) -> None:
+    """
+    Release the request's session and return its connection to the pool.
+
+    Registered with Flask's teardown_request. Every get_db_session() block
+    has already committed or rolled back, so there is nothing to flush.
+    """
+    session = g.pop("_db_session", None)
+    if session is None:
+        return
+    connection = session.bind
+    try:
+        session.close()
+    finally:
+        connection.close()
+
+
+def without_request_session(view: Callable) -> Callable:
+    """
+    Route decorator: give each get_db_session() block its own session.
+
+    For long-running views (ML forecasts) a request-scoped session would keep
+    its pooled connection checked out, idle, for the whole computation. Here
+    every block checks a connection out and returns it as soon as it ends.
+    """
+    @wraps(view)
+    def decorated_function(*args, **kwargs):
+        # Hand back anything an outer decorator already checked out
+        close_request_session()
+        g._db_session_disabled = True
+        return view(*args, **kwargs)
+
+    return decorated_function
+
+
 @contextmanager
 def get_db_session() -> Generator[Session, None, None]:
     """
     Context manager for database sessions with automatic cleanup.
 
+    Inside a Flask request the request's session is reused, so consecutive
+    calls share one connection instead of checking one out each time. Each
+    block still commits on success, rolls back on error and ends with a
+    clean session, exactly like a fresh one.
+
     Yields:
         SQLAlchemy Session instance.
 
@@ -118,7 +229,9 @@ def get_db_session() -> Generator[Session, None, None]:
         with get_db_session() as session:
             user = session.query(User).filter_by(id=1).first()
     """
-    session = get_session()
+    session = _request_session()
+    if session is None:
+        session = get_session()
     try:
         yield session
         session.commit()
@@ -126,6 +239,8 @@ def get_db_session() -> Generator[Session, None, None]:
         session.rollback()
         raise
     finally:
+        # For the request session this expunges and resets it; the bound
+        # connection stays checked out for the next block
         session.close()
 
 
@@ -144,3 +259,16 @@ def get_db_engine() -> Engine:
             "Database not initialized. Call init_db_session() first."
         )
     return _SessionLocal.kw["bind"]
+
+
+def dispose_engine_after_fork() -> None:
+    """
+    Drop pooled connections inherited from the parent process.
+
+    Call in each forked worker (e.g. gunicorn post_fork) so workers never
+    share a PostgreSQL socket with the master or each other. The inherited
+    connections are discarded without being closed, leaving the parent's
+    sessions intact.
+    """
+    if _SessionLocal is not None:
+        _SessionLocal.kw["bind"].dispose(close=False)
@@ -0,0 +1,140 @@
+import hashlib
+import logging
+import os
+import threading
+from functools import wraps
+from typing import Any, Callable, Optional
+
+from cachetools import TTLCache
+from flask import jsonify, request, make_response
+
+from utils.cache_service import get_cache_service
+
+logger = logging.getLogger(__name__)
+
+# Redis channel used to tell every worker process to drop its microcaches
+INVALIDATION_CHANNEL = 'microcache:invalidate'
+
+# One TTLCache per decorated view; kept so writes can invalidate them all
+_microcaches = []
+_lock = threading.Lock()
+
+# PID that owns the running invalidation listener (reset by fork)
+_listener_pid = None
+
+
+def microcache(ttl: int = 10, maxsize: int = 128) -> Callable:
+    """
+    Decorator for short-lived in-process caching of GET responses.
+
+    Repeats within `ttl` seconds are served from memory, and requests whose
+    If-None-Match matches the cached ETag get a 304 with no body. Place it
+    below @require_auth so unauthenticated requests never reach the cache.
+
+    Example:
+        @product_bp.route('', methods=['GET'])
+        @require_auth
+        @microcache(ttl=10)
+        def get_products():
+            ...
+    """
+    def decorator(func: Callable) -> Callable:
+        cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        _microcaches.append(cache)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            _ensure_listener()
+            key = (request.path, request.query_string)
+
+            with _lock:
+                entry = cache.get(key)
+
+            if entry is None:
+                response = make_response(func(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+                body = response.get_data()
+                etag = hashlib.blake2s(body).hexdigest()
+                entry = (body, etag, response.mimetype)
+                with _lock:
+                    cache[key] = entry
+            else:
+                logger.debug(f"Microcache HIT: {request.path}")
+
+            body, etag, mimetype = entry
+            if request.if_none_match.contains(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(body, 200)
+                response.mimetype = mimetype
+            response.set_etag(etag)
+            return response
+
+        return wrapper
+    return decorator
+
+
+def etag_response(etag: str, build: Callable[[], Any]):
+    """
+    Answer a GET from a precomputed validator.
+
+    Clients holding a matching (weak) ETag get a 304 without build() ever
+    running, so a revalidation costs only whatever produced `etag`.
+    Responses stay private (they are per-user, behind auth) and are
+    revalidated on every use.
+
+    Example:
+        return etag_response(EventModel.get_etag(), EventModel.get_holidays)
+    """
+    if request.if_none_match.contains_weak(etag):
+        response = make_response('', 304)
+    else:
+        response = make_response(jsonify(build()), 200)
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def _clear_local(path_prefix: Optional[str] = None) -> None:
+    """Drop this process's microcached responses"""
+    with _lock:
+        for cache in _microcaches:
+            if path_prefix is None:
+                cache.clear()
+                continue
+            for key in [k for k in cache.keys() if k[0].startswith(path_prefix)]:
+                cache.pop(key, None)
+
+
+def _ensure_listener() -> None:
+    """
+    Subscribe this process to invalidation broadcasts, once per PID.
+
+    Started lazily from the first cached request so each forked worker gets
+    its own subscriber thread (threads do not survive fork).
+    """
+    global _listener_pid
+    pid = os.getpid()
+    if _listener_pid == pid:
+        return
+    with _lock:
+        if _listener_pid == pid:
+            return
+        _listener_pid = pid
+    get_cache_service().subscribe(
+        INVALIDATION_CHANNEL, lambda message: _clear_local(message or None)
+    )
+
+
+def invalidate_microcache(path_prefix: Optional[str] = None) -> None:
+    """
+    Drop microcached responses, optionally only those under path_prefix.
+
+    Clears this process immediately and broadcasts over Redis pub/sub so
+    the other workers drop theirs too instead of serving stale data until
+    their TTL runs out.
+    """
+    _clear_local(path_prefix)
+    get_cache_service().publish(INVALIDATION_CHANNEL, path_prefix or '')
@@ -0,0 +1,51 @@
+"""orjson-backed JSON provider for Flask's jsonify."""
+
+import decimal
+import uuid
+from typing import Any, Union
+
+import orjson
+from flask.json.provider import JSONProvider
+
+
+def _default(obj: Any) -> Any:
+    """Handle types orjson does not serialize natively."""
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# numpy values and non-str dict keys are encoded natively
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def orjson_dumps(obj: Any) -> bytes:
+    """Serialize obj to JSON bytes with the app-wide orjson options."""
+    return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS)
+
+
+class ORJSONProvider(JSONProvider):
+    """
+    JSON provider that encodes with orjson.
+
+    numpy scalars/arrays and datetimes are serialized directly in C, so
+    forecast payloads no longer need per-value conversion to be encodable.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serialize obj to a JSON string."""
+        return orjson_dumps(obj).decode("utf-8")
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        """Deserialize a JSON string or bytes."""
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        """Build a JSON response without the intermediate str round-trip."""
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson_dumps(obj)
+        return self._app.response_class(body, mimetype="application/json")
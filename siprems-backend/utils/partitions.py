@@ -0,0 +1,144 @@
+"""
+Monthly partition maintenance for the transactions table.
+
+schema.sql creates transactions range-partitioned by transaction_date with
+monthly partitions up to the end of next year, plus a DEFAULT partition that
+catches anything outside them. Run this ahead of time (the Celery beat task
+create_transaction_partitions does so daily, or `python -m utils.partitions`
+by hand) so new months always get their own partition.
+
+If rows for a month already landed in DEFAULT, PostgreSQL refuses to create
+that month's partition. In that case, inside one transaction:
+
+    1. ALTER TABLE transactions DETACH PARTITION transactions_default;
+    2. CREATE TABLE transactions_YYYY_MM PARTITION OF transactions
+           FOR VALUES FROM ('YYYY-MM-01') TO ('<next month>-01');
+    3. move the month's rows: DELETE them from transactions_default and
+       INSERT them through the parent, which routes them to the new partition;
+    4. ALTER TABLE transactions ATTACH PARTITION transactions_default DEFAULT;
+
+Both ALTERs take an ACCESS EXCLUSIVE lock on transactions, so writers wait
+until the move commits.
+"""
+
+import logging
+import sys
+from datetime import date
+
+from psycopg2 import sql
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARTITION = "transactions_default"
+
+# Explicit list so the row move never depends on the table's column order
+_MOVED_COLUMNS = sql.SQL(", ").join(
+    sql.Identifier(name)
+    for name in (
+        "transaction_id",
+        "product_id",
+        "quantity_sold",
+        "price_per_unit",
+        "transaction_date",
+        "is_promo",
+    )
+)
+
+
+def _month_start(day, offset=0):
+    """First day of the month `offset` months after the one containing `day`."""
+    index = day.year * 12 + day.month - 1 + offset
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month_start):
+    """Name of the transactions partition for the month starting at month_start."""
+    return f"transactions_{month_start:%Y_%m}"
+
+
+def ensure_transaction_partitions(conn, months_ahead=3, today=None):
+    """
+    Create any missing monthly partitions from this month to months_ahead.
+
+    Rows already sitting in the DEFAULT partition for one of those months are
+    moved into the new partition (see the module docstring). The caller
+    commits.
+
+    Args:
+        conn: psycopg2 connection (not in autocommit mode)
+        months_ahead: How many months after the current one to cover
+        today: Reference date (defaults to date.today())
+
+    Returns:
+        list: Names of the partitions created
+    """
+    today = today or date.today()
+    created = []
+
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass(%s) IS NOT NULL", (DEFAULT_PARTITION,))
+        has_default = cur.fetchone()[0]
+
+        for offset in range(months_ahead + 1):
+            start, end = _month_start(today, offset), _month_start(today, offset + 1)
+            name = partition_name(start)
+            cur.execute("SELECT to_regclass(%s) IS NOT NULL", (name,))
+            if cur.fetchone()[0]:
+                continue
+
+            bounds = (start.isoformat(), end.isoformat())
+            stranded = False
+            if has_default:
+                cur.execute(
+                    sql.SQL(
+                        "SELECT EXISTS (SELECT 1 FROM {} "
+                        "WHERE transaction_date >= %s AND transaction_date < %s)"
+                    ).format(sql.Identifier(DEFAULT_PARTITION)),
+                    bounds,
+                )
+                stranded = cur.fetchone()[0]
+
+            if stranded:
+                cur.execute(
+                    sql.SQL("ALTER TABLE transactions DETACH PARTITION {}").format(
+                        sql.Identifier(DEFAULT_PARTITION)
+                    )
+                )
+
+            cur.execute(
+                sql.SQL(
+                    "CREATE TABLE {} PARTITION OF transactions FOR VALUES FROM (%s) TO (%s)"
+                ).format(sql.Identifier(name)),
+                bounds,
+            )
+
+            if stranded:
+                cur.execute(
+                    sql.SQL(
+                        "WITH moved AS ("
+                        " DELETE FROM {default} WHERE transaction_date >= %s AND transaction_date < %s"
+                        " RETURNING {columns}"
+                        ") INSERT INTO transactions ({columns}) SELECT {columns} FROM moved"
+                    ).format(default=sql.Identifier(DEFAULT_PARTITION), columns=_MOVED_COLUMNS),
+                    bounds,
+                )
+                logger.info("Moved %s rows from %s into %s", cur.rowcount, DEFAULT_PARTITION, name)
+                cur.execute(
+                    sql.SQL("ALTER TABLE transactions ATTACH PARTITION {} DEFAULT").format(
+                        sql.Identifier(DEFAULT_PARTITION)
+                    )
+                )
+
+            created.append(name)
+
+    return created
+
+
+if __name__ == "__main__":
+    from utils.db import borrow
+
+    months = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    with borrow() as connection:
+        names = ensure_transaction_partitions(connection, months_ahead=months)
+        connection.commit()
+    print(f"Created {len(names)} partition(s): {', '.join(names) or 'none needed'}")
@@ -0,0 +1,6 @@
+"""WSGI entry point for production servers (gunicorn)."""
+
+from app import app as application
+
+# Alias for servers that look up ``app`` by default
+app = application